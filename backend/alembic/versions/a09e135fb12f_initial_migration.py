@@ -106,3 +106,6 @@ def downgrade() -> None:
     op.drop_index(op.f('ix_aircraft_id'), table_name='aircraft')
     op.drop_table('aircraft')
     # ### end Alembic commands ###
+    # drop_table() leaves the column enums behind, and upgrade() creates them again
+    op.execute("DROP TYPE IF EXISTS flighttype")
+    op.execute("DROP TYPE IF EXISTS flightstatus")
@@ -0,0 +1,93 @@
+"""roll completed flights into aircraft.total_time and aircraft_daily_usage
+
+Revision ID: add_aircraft_usage
+Revises: add_logbook_totals
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_aircraft_usage'
+down_revision = 'add_logbook_totals'
+branch_labels = None
+depends_on = None
+
+AIRCRAFT_USAGE_TRIGGERS = {
+    'flights_aircraft_usage_insert': ('INSERT', "NEW.status = 'completed'"),
+    'flights_aircraft_usage_update': (
+        'UPDATE',
+        "(OLD.status = 'completed' OR NEW.status = 'completed') AND "
+        "(OLD.status, OLD.aircraft_id, OLD.start_time, OLD.duration) IS DISTINCT FROM "
+        "(NEW.status, NEW.aircraft_id, NEW.start_time, NEW.duration)",
+    ),
+    'flights_aircraft_usage_delete': ('DELETE', "OLD.status = 'completed'"),
+}
+
+def upgrade() -> None:
+    # One row per aircraft and day flown: GET /reports/utilization reads these, not flights
+    op.create_table(
+        'aircraft_daily_usage',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('aircraft_id', sa.Integer(), nullable=False),
+        sa.Column('hours', sa.Numeric(), nullable=False),
+        sa.Column('flights', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['aircraft_id'], ['aircraft.id']),
+        sa.PrimaryKeyConstraint('day', 'aircraft_id'),
+    )
+    op.execute(
+        "CREATE OR REPLACE FUNCTION maintain_aircraft_usage() RETURNS trigger AS $$ "
+        "BEGIN "
+        "IF TG_OP <> 'INSERT' AND OLD.status = 'completed' AND OLD.aircraft_id IS NOT NULL THEN "
+        "UPDATE aircraft "
+        "SET total_time = (COALESCE(total_time, 0)::numeric - COALESCE(OLD.duration, 0)::numeric)::float8, "
+        "updated_at = clock_timestamp() AT TIME ZONE 'UTC' "
+        "WHERE id = OLD.aircraft_id; "
+        "IF OLD.start_time IS NOT NULL THEN "
+        "UPDATE aircraft_daily_usage "
+        "SET hours = hours - COALESCE(OLD.duration, 0)::numeric, flights = flights - 1 "
+        "WHERE day = OLD.start_time::date AND aircraft_id = OLD.aircraft_id AND flights > 1; "
+        "IF NOT FOUND THEN "
+        "DELETE FROM aircraft_daily_usage WHERE day = OLD.start_time::date AND aircraft_id = OLD.aircraft_id; "
+        "END IF; "
+        "END IF; "
+        "END IF; "
+        "IF TG_OP <> 'DELETE' AND NEW.status = 'completed' AND NEW.aircraft_id IS NOT NULL THEN "
+        "UPDATE aircraft "
+        "SET total_time = (COALESCE(total_time, 0)::numeric + COALESCE(NEW.duration, 0)::numeric)::float8, "
+        "updated_at = clock_timestamp() AT TIME ZONE 'UTC' "
+        "WHERE id = NEW.aircraft_id; "
+        "IF NEW.start_time IS NOT NULL THEN "
+        "INSERT INTO aircraft_daily_usage (day, aircraft_id, hours, flights) "
+        "VALUES (NEW.start_time::date, NEW.aircraft_id, COALESCE(NEW.duration, 0)::numeric, 1) "
+        "ON CONFLICT (day, aircraft_id) DO UPDATE "
+        "SET hours = aircraft_daily_usage.hours + EXCLUDED.hours, flights = aircraft_daily_usage.flights + 1; "
+        "END IF; "
+        "END IF; "
+        "RETURN NULL; "
+        "END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    # Existing completed flights fill the daily rollups before the triggers take over. total_time
+    # is left as entered: it may already include them. The lock keeps writes from landing between
+    # the backfill and the triggers
+    op.execute("LOCK TABLE flights IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        "INSERT INTO aircraft_daily_usage (day, aircraft_id, hours, flights) "
+        "SELECT start_time::date, aircraft_id, SUM(COALESCE(duration, 0)::numeric), COUNT(*) "
+        "FROM flights "
+        "WHERE status = 'completed' AND aircraft_id IS NOT NULL AND start_time IS NOT NULL "
+        "GROUP BY 1, 2"
+    )
+    for name, (event, condition) in AIRCRAFT_USAGE_TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON flights "
+            f"FOR EACH ROW WHEN ({condition}) EXECUTE FUNCTION maintain_aircraft_usage()"
+        )
+
+def downgrade() -> None:
+    for name in AIRCRAFT_USAGE_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON flights")
+    op.execute("DROP FUNCTION IF EXISTS maintain_aircraft_usage()")
+    op.drop_table('aircraft_daily_usage')
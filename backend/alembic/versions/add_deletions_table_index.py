@@ -0,0 +1,30 @@
+"""add a (table_name, id) index on deletions for the collection ETags
+
+Revision ID: add_deletions_table_index
+Revises: add_last_maintenance_time
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_deletions_table_index'
+down_revision = 'add_last_maintenance_time'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # max(id) per table_name: the latest deletion from a table, read off the end of the index
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_deletions_table_name_id',
+            'deletions',
+            ['table_name', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_deletions_table_name_id', table_name='deletions', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,38 @@
+"""add entity cache notify triggers
+
+Revision ID: add_entity_cache_triggers
+Revises: add_flight_overlap_constraints
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_entity_cache_triggers'
+down_revision = 'add_flight_overlap_constraints'
+branch_labels = None
+depends_on = None
+
+CACHED_TABLES = ('users', 'aircraft', 'instructors')
+
+def upgrade() -> None:
+    # Workers LISTEN on entity_cache and evict "<table>:<id>" from their in-process cache
+    op.execute(
+        "CREATE OR REPLACE FUNCTION notify_entity_cache() RETURNS trigger AS $$ "
+        "BEGIN "
+        "PERFORM pg_notify('entity_cache', TG_TABLE_NAME || ':' || OLD.id); "
+        "RETURN NULL; "
+        "END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    for table in CACHED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_entity_cache AFTER UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION notify_entity_cache()"
+        )
+
+def downgrade() -> None:
+    for table in CACHED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_entity_cache ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_entity_cache()")
@@ -0,0 +1,41 @@
+"""add flight indexes
+
+Revision ID: add_flight_indexes
+Revises: update_enums
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_flight_indexes'
+down_revision = 'update_enums'
+branch_labels = None
+depends_on = None
+
+COMPOSITE_INDEXES = {
+    'ix_flights_aircraft_id_start_time': ['aircraft_id', 'start_time'],
+    'ix_flights_instructor_id_start_time': ['instructor_id', 'start_time'],
+    'ix_flights_student_id_start_time': ['student_id', 'start_time'],
+}
+
+def upgrade() -> None:
+    # Build the indexes concurrently so a large flights table stays writable
+    with op.get_context().autocommit_block():
+        for name, columns in COMPOSITE_INDEXES.items():
+            op.create_index(name, 'flights', columns, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            'ix_flights_scheduled_start_time',
+            'flights',
+            ['start_time'],
+            postgresql_where=sa.text("status = 'scheduled'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_flights_scheduled_start_time', table_name='flights', postgresql_concurrently=True, if_exists=True)
+        for name in COMPOSITE_INDEXES:
+            op.drop_index(name, table_name='flights', postgresql_concurrently=True, if_exists=True)
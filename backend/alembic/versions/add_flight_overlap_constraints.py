@@ -0,0 +1,43 @@
+"""add flight overlap constraints
+
+Revision ID: add_flight_overlap_constraints
+Revises: add_flight_sort_index
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_flight_overlap_constraints'
+down_revision = 'add_flight_sort_index'
+branch_labels = None
+depends_on = None
+
+OVERLAP_CONSTRAINTS = {
+    'ex_flights_aircraft_overlap': 'aircraft_id',
+    'ex_flights_instructor_overlap': 'instructor_id',
+}
+
+def upgrade() -> None:
+    op.add_column('flights', sa.Column(
+        'period',
+        postgresql.TSRANGE(),
+        sa.Computed("tsrange(start_time, end_time, '[)')", persisted=True),
+        nullable=True,
+    ))
+
+    # Existing overlapping bookings must be cancelled or moved before this runs
+    for name, column in OVERLAP_CONSTRAINTS.items():
+        op.execute(
+            f"ALTER TABLE flights ADD CONSTRAINT {name} "
+            f"EXCLUDE USING gist (int4range({column}, {column}, '[]') WITH &&, period WITH &&) "
+            f"WHERE ({column} IS NOT NULL AND status IS DISTINCT FROM 'cancelled')"
+        )
+
+def downgrade() -> None:
+    for name in OVERLAP_CONSTRAINTS:
+        # drop_constraint() has no exclusion constraint type
+        op.execute(f"ALTER TABLE flights DROP CONSTRAINT IF EXISTS {name}")
+    op.drop_column('flights', 'period')
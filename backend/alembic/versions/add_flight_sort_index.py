@@ -0,0 +1,30 @@
+"""add flight sort index
+
+Revision ID: add_flight_sort_index
+Revises: add_flight_indexes
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_flight_sort_index'
+down_revision = 'add_flight_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # (start_time, id) is the keyset the flights list endpoint seeks on
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_flights_start_time_id',
+            'flights',
+            ['start_time', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_flights_start_time_id', table_name='flights', postgresql_concurrently=True, if_exists=True)
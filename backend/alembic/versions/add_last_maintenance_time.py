@@ -0,0 +1,32 @@
+"""add aircraft.last_maintenance_time for the maintenance forecast
+
+Revision ID: add_last_maintenance_time
+Revises: add_aircraft_usage
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_last_maintenance_time'
+down_revision = 'add_aircraft_usage'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # total_time at the last inspection: the 100-hour inspection is counted from it
+    op.add_column('aircraft', sa.Column('last_maintenance_time', sa.Float(), nullable=True))
+    # Estimated for aircraft with a recorded inspection, from the hours flown since its day
+    # (the whole day counts, erring towards an earlier inspection)
+    op.execute(
+        "UPDATE aircraft "
+        "SET last_maintenance_time = (total_time::numeric - COALESCE(("
+        "SELECT SUM(hours) FROM aircraft_daily_usage "
+        "WHERE aircraft_id = aircraft.id AND day >= aircraft.last_maintenance::date"
+        "), 0))::float8 "
+        "WHERE last_maintenance IS NOT NULL AND total_time IS NOT NULL"
+    )
+
+def downgrade() -> None:
+    op.drop_column('aircraft', 'last_maintenance_time')
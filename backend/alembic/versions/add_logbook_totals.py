@@ -0,0 +1,98 @@
+"""add logbook_totals, kept by triggers on flights
+
+Revision ID: add_logbook_totals
+Revises: add_sync_support
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_logbook_totals'
+down_revision = 'add_sync_support'
+branch_labels = None
+depends_on = None
+
+LOGBOOK_TRIGGERS = {
+    'flights_logbook_insert': ('INSERT', "NEW.status = 'completed'"),
+    'flights_logbook_update': (
+        'UPDATE',
+        "(OLD.status = 'completed' OR NEW.status = 'completed') AND "
+        "(OLD.status, OLD.student_id, OLD.flight_type, OLD.start_time, OLD.duration) IS DISTINCT FROM "
+        "(NEW.status, NEW.student_id, NEW.flight_type, NEW.start_time, NEW.duration)",
+    ),
+    'flights_logbook_delete': ('DELETE', "OLD.status = 'completed'"),
+}
+
+def upgrade() -> None:
+    # One row per student, month and flight type: GET /users/{id}/logbook reads these, not flights
+    op.create_table(
+        'logbook_totals',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('flight_type', postgresql.ENUM(name='flighttype', create_type=False), nullable=True),
+        sa.Column('hours', sa.Numeric(), nullable=False),
+        sa.Column('flights', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'student_id', 'month', 'flight_type',
+            name='uq_logbook_totals_student_month_type',
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.execute(
+        "CREATE OR REPLACE FUNCTION maintain_logbook_totals() RETURNS trigger AS $$ "
+        "BEGIN "
+        "IF TG_OP <> 'INSERT' AND OLD.status = 'completed' AND OLD.student_id IS NOT NULL "
+        "AND OLD.start_time IS NOT NULL THEN "
+        "UPDATE logbook_totals "
+        "SET hours = hours - COALESCE(OLD.duration, 0)::numeric, flights = flights - 1 "
+        "WHERE student_id = OLD.student_id "
+        "AND month = date_trunc('month', OLD.start_time)::date "
+        "AND flight_type IS NOT DISTINCT FROM OLD.flight_type "
+        "AND flights > 1; "
+        "IF NOT FOUND THEN "
+        "DELETE FROM logbook_totals "
+        "WHERE student_id = OLD.student_id "
+        "AND month = date_trunc('month', OLD.start_time)::date "
+        "AND flight_type IS NOT DISTINCT FROM OLD.flight_type; "
+        "END IF; "
+        "END IF; "
+        "IF TG_OP <> 'DELETE' AND NEW.status = 'completed' AND NEW.student_id IS NOT NULL "
+        "AND NEW.start_time IS NOT NULL THEN "
+        "INSERT INTO logbook_totals (student_id, month, flight_type, hours, flights) "
+        "VALUES (NEW.student_id, date_trunc('month', NEW.start_time)::date, NEW.flight_type, "
+        "COALESCE(NEW.duration, 0)::numeric, 1) "
+        "ON CONFLICT (student_id, month, flight_type) DO UPDATE "
+        "SET hours = logbook_totals.hours + EXCLUDED.hours, flights = logbook_totals.flights + 1; "
+        "END IF; "
+        "RETURN NULL; "
+        "END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    # Existing completed flights, before the triggers take over; the lock keeps writes
+    # from landing between the backfill and the triggers
+    op.execute("LOCK TABLE flights IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        "INSERT INTO logbook_totals (student_id, month, flight_type, hours, flights) "
+        "SELECT student_id, date_trunc('month', start_time)::date, flight_type, "
+        "SUM(COALESCE(duration, 0)::numeric), COUNT(*) "
+        "FROM flights "
+        "WHERE status = 'completed' AND student_id IS NOT NULL AND start_time IS NOT NULL "
+        "GROUP BY 1, 2, 3"
+    )
+    for name, (event, condition) in LOGBOOK_TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON flights "
+            f"FOR EACH ROW WHEN ({condition}) EXECUTE FUNCTION maintain_logbook_totals()"
+        )
+
+def downgrade() -> None:
+    for name in LOGBOOK_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON flights")
+    op.execute("DROP FUNCTION IF EXISTS maintain_logbook_totals()")
+    op.drop_table('logbook_totals')
@@ -0,0 +1,64 @@
+"""add updated_at indexes and the deletion log for delta sync
+
+Revision ID: add_sync_support
+Revises: add_entity_cache_triggers
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_sync_support'
+down_revision = 'add_entity_cache_triggers'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ('users', 'aircraft', 'instructors', 'flights')
+
+def upgrade() -> None:
+    # Tombstones for GET /sync: hard deletes otherwise leave no trace
+    op.create_table(
+        'deletions',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_deletions_deleted_at_id', 'deletions', ['deleted_at', 'id'])
+    op.execute(
+        "CREATE OR REPLACE FUNCTION log_deletion() RETURNS trigger AS $$ "
+        "BEGIN "
+        "INSERT INTO deletions (table_name, row_id, deleted_at) "
+        "VALUES (TG_TABLE_NAME, OLD.id, clock_timestamp() AT TIME ZONE 'UTC'); "
+        "RETURN NULL; "
+        "END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    for table in SYNCED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_log_deletion AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION log_deletion()"
+        )
+
+    # (updated_at, id) is the order GET /sync reads changes in
+    with op.get_context().autocommit_block():
+        for table in SYNCED_TABLES:
+            op.create_index(
+                f'ix_{table}_updated_at_id',
+                table,
+                ['updated_at', 'id'],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in SYNCED_TABLES:
+            op.drop_index(f'ix_{table}_updated_at_id', table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table in SYNCED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_log_deletion ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS log_deletion()")
+    op.drop_index('ix_deletions_deleted_at_id', table_name='deletions')
+    op.drop_table('deletions')
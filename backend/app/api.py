@@ -1,40 +1,232 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Callable, List, Literal, Optional
+from datetime import date, datetime, timedelta
+import json
 
-from .database import get_db
-from . import crud, models, schemas
+from .config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_async_db, get_db, get_stream_db
+from . import async_crud, availability, bulk, crud, export, http_cache, logbook, maintenance, models, pagination, schedule_feed, schemas, security, serializers, sync, utilization
 
 router = APIRouter(prefix="/api/v1")
+# Unversioned routes still called by the legacy booking page (static/js/booking.js)
+legacy_router = APIRouter(prefix="/api")
+# Async (asyncpg) versions of the read routes; main.py mounts it ahead of `router` when ASYNC_READ_ROUTES is set
+async_router = APIRouter(prefix="/api/v1")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+def _decode_cursor(after: Optional[str], decoder: Callable):
+    if after is None:
+        return None
+    try:
+        return decoder(after)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def _set_next_cursor(response: Response, items: list, limit: int, sort_key: Callable) -> None:
+    # A short page means there is nothing left to seek to
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = pagination.encode_cursor(*sort_key(items[-1]))
+
+def _id_key(row) -> tuple:
+    return (row.id,)
+
+def _flight_key(flight: models.Flight) -> tuple:
+    return (flight.start_time, flight.id)
+
+def _fieldset(schema) -> Callable:
+    """Dependency parsing `?fields=a,b` into the requested subset of `schema`'s fields, in schema order."""
+    def parse_fields(
+        fields: Optional[str] = Query(None, description="Comma-separated subset of the response fields")
+    ) -> Optional[tuple[str, ...]]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - schema.model_fields.keys())
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}. "
+                       f"Allowed: {', '.join(schema.model_fields)}"
+            )
+        return tuple(name for name in schema.model_fields if name in requested)
+    return parse_fields
+
+def _render(
+    content,
+    serializer: serializers.RowSerializer,
+    response: Optional[Response] = None,
+    fields: Optional[tuple[str, ...]] = None,
+):
+    # Trusted crud rows skip response_model validation when FAST_JSON_RESPONSES is on
+    # or a sparse fieldset was asked for (app/serializers.py)
+    if fields is not None:
+        serializer = serializer.only(fields)
+    elif not settings.FAST_JSON_RESPONSES:
+        return content
+    body = serializer.many(content) if isinstance(content, list) else serializer(content)
+    return serializers.render(body, response)
+
+def _check_freshness(request: Request, response: Response, validators: http_cache.Validators) -> None:
+    """Answer 304 if the client's copy is current, otherwise send the validators with the response."""
+    headers = http_cache.headers(request, validators)
+    if http_cache.not_modified(request, validators):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=headers
+        )
+    response.headers.update(headers)
+
+def _precheck_collection(request: Request, response: Response, state: tuple) -> None:
+    # `state` is from get_collection_state: a 304 is answered before any rows are loaded
+    _check_freshness(request, response, http_cache.for_collection(request, *state))
+
+def _precheck_resource(request: Request, response: Response, state) -> None:
+    # `state` is the (updated_at,) row from get_updated_at; a missing row falls through to the 404
+    if state is not None:
+        _check_freshness(request, response, http_cache.for_resource(request, *state))
+
+# Bulk endpoints (registered before the /{id} routes so "bulk" is not taken for an id)
+async def _bulk_items(request: Request) -> list:
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        items, pending = [], b""
+        async for chunk in request.stream():
+            *lines, pending = (pending + chunk).split(b"\n")
+            items.extend(bulk.parse_ndjson_line(line) for line in lines if line.strip())
+        if pending.strip():
+            items.append(bulk.parse_ndjson_line(pending))
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            items = None
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Request body must be a JSON array or NDJSON"
+            )
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per request"
+        )
+    return items
+
+def _add_bulk_routes(path: str, resource: bulk.BulkResource) -> None:
+    @router.post(f"/{path}/bulk", response_model=schemas.BulkResult, name=f"bulk_create_{path}")
+    def bulk_create_endpoint(items: list = Depends(_bulk_items), db: Session = Depends(get_db)):
+        return bulk.bulk_create(db, resource, items)
+
+    @router.put(f"/{path}/bulk", response_model=schemas.BulkResult, name=f"bulk_update_{path}")
+    def bulk_update_endpoint(items: list = Depends(_bulk_items), db: Session = Depends(get_db)):
+        return bulk.bulk_update(db, resource, items)
+
+    @router.delete(f"/{path}/bulk", response_model=schemas.BulkResult, name=f"bulk_delete_{path}")
+    def bulk_delete_endpoint(items: list = Depends(_bulk_items), db: Session = Depends(get_db)):
+        return bulk.bulk_delete(db, resource, items)
+
+for path, resource in bulk.RESOURCES.items():
+    _add_bulk_routes(path, resource)
+
+# Password endpoints hash on the dedicated pool (app/security.py) and only
+# borrow a threadpool worker for the database calls
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password operations in progress",
+        headers={"Retry-After": "1"}
+    )
+
+async def _hash_password(password: Optional[str]) -> Optional[str]:
+    if password is None:
+        return None
+    try:
+        return await security.hash_password(password)
+    except security.HashingBusyError:
+        raise _hashing_busy()
 
 # User endpoints
 @router.post("/users/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    return crud.create_user(db=db, user=user)
+    hashed_password = await _hash_password(user.password)
+    return await run_in_threadpool(crud.create_user, db=db, user=user, hashed_password=hashed_password)
+
+@router.post("/users/login", response_model=schemas.User)
+async def login_user(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=credentials.email)
+    try:
+        verified, new_hash = await security.verify_password(
+            credentials.password, db_user.hashed_password if db_user else None
+        )
+    except security.HashingBusyError:
+        raise _hashing_busy()
+    if not verified or not db_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    if new_hash:
+        # Stored with a different bcrypt cost than PASSWORD_HASH_ROUNDS
+        await run_in_threadpool(crud.set_password_hash, db, db_user, new_hash)
+    return db_user
 
 @router.get("/users/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_users(db, skip=skip, limit=limit)
+def read_users(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.User)),
+    db: Session = Depends(get_db),
+):
+    after_id = _decode_cursor(after, pagination.decode_id_cursor)
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, crud.get_collection_state(db, models.User))
+    items = crud.get_users(db, skip=skip, limit=limit, after_id=after_id, fields=fields, with_state=True)
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _id_key)
+    return _render(items, serializers.user, response, fields)
 
 @router.get("/users/{user_id}", response_model=schemas.User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = crud.get_user(db, user_id=user_id)
+def read_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.User)),
+    db: Session = Depends(get_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, crud.get_updated_at(db, models.User, user_id))
+    db_user = crud.get_user(db, user_id=user_id, fields=fields)
     if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return db_user
+    _check_freshness(request, response, http_cache.for_resource(request, db_user.updated_at))
+    return _render(db_user, serializers.user, response, fields)
 
 @router.put("/users/{user_id}", response_model=schemas.User)
-def update_user_endpoint(user_id: int, user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.update_user(db=db, user_id=user_id, user=user)
+async def update_user_endpoint(user_id: int, user: schemas.UserCreate, db: Session = Depends(get_db)):
+    hashed_password = await _hash_password(user.password)
+    db_user = await run_in_threadpool(crud.update_user, db=db, user_id=user_id, user=user, hashed_password=hashed_password)
     if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,6 +244,20 @@ def delete_user_endpoint(user_id: int, db: Session = Depends(get_db)):
         )
     return db_user
 
+# Logbook totals (app/logbook.py)
+@router.get("/users/{user_id}/logbook", response_model=schemas.Logbook)
+def read_logbook(
+    user_id: int,
+    period: logbook.Period = Query("month", description="Group the totals by calendar month or year"),
+    db: Session = Depends(get_db),
+):
+    if crud.get_user(db, user_id=user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return serializers.render(logbook.summarize(user_id, crud.get_logbook_totals(db, user_id), period))
+
 # Aircraft endpoints
 @router.post("/aircraft/", response_model=schemas.Aircraft, status_code=status.HTTP_201_CREATED)
 def create_aircraft_endpoint(aircraft: schemas.AircraftCreate, db: Session = Depends(get_db)):
@@ -64,18 +270,41 @@ def create_aircraft_endpoint(aircraft: schemas.AircraftCreate, db: Session = Dep
     return crud.create_aircraft(db=db, aircraft=aircraft)
 
 @router.get("/aircraft/", response_model=List[schemas.Aircraft])
-def read_aircrafts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_aircrafts(db, skip=skip, limit=limit)
+def read_aircrafts(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Aircraft)),
+    db: Session = Depends(get_db),
+):
+    after_id = _decode_cursor(after, pagination.decode_id_cursor)
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, crud.get_collection_state(db, models.Aircraft))
+    items = crud.get_aircrafts(db, skip=skip, limit=limit, after_id=after_id, fields=fields, with_state=True)
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _id_key)
+    return _render(items, serializers.aircraft, response, fields)
 
 @router.get("/aircraft/{aircraft_id}", response_model=schemas.Aircraft)
-def read_aircraft(aircraft_id: int, db: Session = Depends(get_db)):
-    db_aircraft = crud.get_aircraft(db, aircraft_id=aircraft_id)
+def read_aircraft(
+    aircraft_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Aircraft)),
+    db: Session = Depends(get_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, crud.get_updated_at(db, models.Aircraft, aircraft_id))
+    db_aircraft = crud.get_aircraft(db, aircraft_id=aircraft_id, fields=fields)
     if db_aircraft is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aircraft not found"
         )
-    return db_aircraft
+    _check_freshness(request, response, http_cache.for_resource(request, db_aircraft.updated_at))
+    return _render(db_aircraft, serializers.aircraft, response, fields)
 
 @router.put("/aircraft/{aircraft_id}", response_model=schemas.Aircraft)
 def update_aircraft_endpoint(aircraft_id: int, aircraft: schemas.AircraftCreate, db: Session = Depends(get_db)):
@@ -99,32 +328,65 @@ def delete_aircraft_endpoint(aircraft_id: int, db: Session = Depends(get_db)):
 
 # Instructor endpoints
 @router.post("/instructors/", response_model=schemas.Instructor, status_code=status.HTTP_201_CREATED)
-def create_instructor_endpoint(instructor: schemas.InstructorCreate, db: Session = Depends(get_db)):
-    db_instructor = crud.get_instructor_by_email(db, email=instructor.email)
+async def create_instructor_endpoint(instructor: schemas.InstructorCreate, db: Session = Depends(get_db)):
+    db_instructor = await run_in_threadpool(crud.get_instructor_by_email, db, email=instructor.email)
     if db_instructor:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    return crud.create_instructor(db=db, instructor=instructor)
+    hashed_password = await _hash_password(instructor.password)
+    return await run_in_threadpool(
+        crud.create_instructor, db=db, instructor=instructor, hashed_password=hashed_password
+    )
 
 @router.get("/instructors/", response_model=List[schemas.Instructor])
-def read_instructors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_instructors(db, skip=skip, limit=limit)
+def read_instructors(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Instructor)),
+    db: Session = Depends(get_db),
+):
+    after_id = _decode_cursor(after, pagination.decode_id_cursor)
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, crud.get_collection_state(db, models.Instructor))
+    items = crud.get_instructors(db, skip=skip, limit=limit, after_id=after_id, fields=fields, with_state=True)
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _id_key)
+    return _render(items, serializers.instructor, response, fields)
 
 @router.get("/instructors/{instructor_id}", response_model=schemas.Instructor)
-def read_instructor(instructor_id: int, db: Session = Depends(get_db)):
-    db_instructor = crud.get_instructor(db, instructor_id=instructor_id)
+def read_instructor(
+    instructor_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Instructor)),
+    db: Session = Depends(get_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, crud.get_updated_at(db, models.Instructor, instructor_id))
+    db_instructor = crud.get_instructor(db, instructor_id=instructor_id, fields=fields)
     if db_instructor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instructor not found"
         )
-    return db_instructor
+    _check_freshness(request, response, http_cache.for_resource(request, db_instructor.updated_at))
+    return _render(db_instructor, serializers.instructor, response, fields)
 
 @router.put("/instructors/{instructor_id}", response_model=schemas.Instructor)
-def update_instructor_endpoint(instructor_id: int, instructor: schemas.InstructorCreate, db: Session = Depends(get_db)):
-    db_instructor = crud.update_instructor(db=db, instructor_id=instructor_id, instructor=instructor)
+async def update_instructor_endpoint(instructor_id: int, instructor: schemas.InstructorCreate, db: Session = Depends(get_db)):
+    hashed_password = await _hash_password(instructor.password)
+    db_instructor = await run_in_threadpool(
+        crud.update_instructor,
+        db=db,
+        instructor_id=instructor_id,
+        instructor=instructor,
+        hashed_password=hashed_password,
+    )
     if db_instructor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -145,69 +407,120 @@ def delete_instructor_endpoint(instructor_id: int, db: Session = Depends(get_db)
 # Flight endpoints
 @router.post("/flights/", response_model=schemas.Flight, status_code=status.HTTP_201_CREATED)
 def create_flight_endpoint(flight: schemas.FlightCreate, db: Session = Depends(get_db)):
-    # Verify that student, instructor, and aircraft exist
-    student = crud.get_user(db, user_id=flight.student_id)
-    if not student:
+    try:
+        return crud.create_flight(db=db, flight=flight)
+    except crud.FlightReferenceError as exc:
+        # Student, instructor and aircraft existence is checked by the foreign keys
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Student not found"
+            detail=str(exc)
         )
-    
-    instructor = crud.get_instructor(db, instructor_id=flight.instructor_id)
-    if not instructor:
+    except crud.FlightConflictError as exc:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Instructor not found"
-        )
-    
-    aircraft = crud.get_aircraft(db, aircraft_id=flight.aircraft_id)
-    if not aircraft:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Aircraft not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc)
         )
-    
-    return crud.create_flight(db=db, flight=flight)
 
 @router.get("/flights/", response_model=List[schemas.Flight])
-def read_flights(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_flights(db, skip=skip, limit=limit)
+def read_flights(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    student_id: Optional[int] = None,
+    instructor_id: Optional[int] = None,
+    aircraft_id: Optional[int] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Flight)),
+    db: Session = Depends(get_db),
+):
+    after_key = _decode_cursor(after, pagination.decode_flight_cursor)
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, crud.get_collection_state(db, models.Flight))
+    if any(value is not None for value in (start, end, student_id, instructor_id, aircraft_id)):
+        items = crud.get_flights_in_range(
+            db,
+            start=start,
+            end=end,
+            student_id=student_id,
+            instructor_id=instructor_id,
+            aircraft_id=aircraft_id,
+            skip=skip,
+            limit=limit,
+            after=after_key,
+            fields=fields,
+            with_state=True,
+        )
+    else:
+        items = crud.get_flights(db, skip=skip, limit=limit, after=after_key, fields=fields, with_state=True)
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _flight_key)
+    return _render(items, serializers.flight, response, fields)
+
+@router.get("/flights/export", response_class=StreamingResponse)
+def export_flights(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    student_id: Optional[int] = None,
+    instructor_id: Optional[int] = None,
+    aircraft_id: Optional[int] = None,
+    flight_status: Optional[models.FlightStatus] = Query(None, alias="status"),
+    db: Session = Depends(get_stream_db),
+):
+    chunks = export.stream_flights(
+        db,
+        format,
+        settings.EXPORT_BATCH_SIZE,
+        start=start,
+        end=end,
+        student_id=student_id,
+        instructor_id=instructor_id,
+        aircraft_id=aircraft_id,
+        status=flight_status,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="flights.{format}"'}
+    )
 
 @router.get("/flights/{flight_id}", response_model=schemas.Flight)
-def read_flight(flight_id: int, db: Session = Depends(get_db)):
-    db_flight = crud.get_flight(db, flight_id=flight_id)
+def read_flight(
+    flight_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Flight)),
+    db: Session = Depends(get_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, crud.get_updated_at(db, models.Flight, flight_id))
+    db_flight = crud.get_flight(db, flight_id=flight_id, fields=fields)
     if db_flight is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Flight not found"
         )
-    return db_flight
+    _check_freshness(request, response, http_cache.for_resource(request, db_flight.updated_at))
+    return _render(db_flight, serializers.flight, response, fields)
 
 @router.put("/flights/{flight_id}", response_model=schemas.Flight)
 def update_flight_endpoint(flight_id: int, flight: schemas.FlightCreate, db: Session = Depends(get_db)):
-    # Verify that student, instructor, and aircraft exist
-    student = crud.get_user(db, user_id=flight.student_id)
-    if not student:
+    try:
+        db_flight = crud.update_flight(db=db, flight_id=flight_id, flight=flight)
+    except crud.FlightReferenceError as exc:
+        # Student, instructor and aircraft existence is checked by the foreign keys
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Student not found"
+            detail=str(exc)
         )
-    
-    instructor = crud.get_instructor(db, instructor_id=flight.instructor_id)
-    if not instructor:
+    except crud.FlightConflictError as exc:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Instructor not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc)
         )
-    
-    aircraft = crud.get_aircraft(db, aircraft_id=flight.aircraft_id)
-    if not aircraft:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Aircraft not found"
-        )
-    
-    db_flight = crud.update_flight(db=db, flight_id=flight_id, flight=flight)
     if db_flight is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -223,4 +536,320 @@ def delete_flight_endpoint(flight_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Flight not found"
         )
-    return db_flight 
\ No newline at end of file
+    return db_flight
+
+# Availability endpoints
+def _availability(
+    db: Session,
+    start_time: datetime,
+    duration: timedelta,
+    search_until: Optional[datetime],
+    flight_type: Optional[models.FlightType],
+    slots: int,
+) -> dict:
+    start_time = availability.to_naive_utc(start_time)
+    if search_until is None:
+        search_until = start_time + timedelta(days=settings.AVAILABILITY_SEARCH_DAYS)
+    index = availability.get_index(db)
+    aircraft, instructors = index.check(start_time, duration, flight_type)
+    return {
+        "start_time": start_time,
+        "end_time": start_time + duration,
+        "aircraft": [
+            {**schemas.Aircraft.model_validate(a).model_dump(), "available": free} for a, free in aircraft
+        ],
+        "instructors": [
+            {**schemas.Instructor.model_validate(i).model_dump(), "available": free} for i, free in instructors
+        ],
+        "next_slots": index.next_slots(
+            start_time,
+            duration,
+            availability.to_naive_utc(search_until),
+            slots,
+            flight_type,
+            step=timedelta(minutes=settings.AVAILABILITY_SLOT_MINUTES),
+        ),
+    }
+
+@router.get("/availability", response_model=schemas.Availability)
+def read_availability(
+    start_time: datetime,
+    duration: float = Query(1.0, gt=0, description="Flight length in hours"),
+    search_until: Optional[datetime] = None,
+    flight_type: Optional[models.FlightType] = None,
+    slots: int = Query(5, ge=0, le=50),
+    db: Session = Depends(get_db),
+):
+    return _availability(db, start_time, timedelta(hours=duration), search_until, flight_type, slots)
+
+@legacy_router.post("/check-availability", response_model=schemas.Availability)
+def check_availability(check: schemas.AvailabilityCheck, db: Session = Depends(get_db)):
+    duration = check.end_time - check.start_time
+    if duration <= timedelta(0):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_time must be after start_time"
+        )
+    return _availability(db, check.start_time, duration, None, check.flight_type, slots=0)
+
+@legacy_router.get("/available-aircraft", response_model=List[schemas.AvailableAircraft])
+def read_available_aircraft(db: Session = Depends(get_db)):
+    return _availability(db, datetime.utcnow(), timedelta(hours=1), None, None, slots=0)["aircraft"]
+
+@legacy_router.get("/available-instructors", response_model=List[schemas.AvailableInstructor])
+def read_available_instructors(db: Session = Depends(get_db)):
+    return _availability(db, datetime.utcnow(), timedelta(hours=1), None, None, slots=0)["instructors"]
+
+# Delta sync (app/sync.py)
+@router.get("/sync", response_model=schemas.SyncResult)
+def read_changes(
+    since: Optional[datetime] = Query(None, description="The watermark of the previous sync; omit for a full sync"),
+    db: Session = Depends(get_db),
+):
+    if since is not None:
+        since = availability.to_naive_utc(since)
+    return serializers.render(sync.changes(db, since, settings.SYNC_MAX_ROWS))
+
+# Utilization report (app/utilization.py)
+@router.get("/reports/utilization", response_model=schemas.UtilizationReport)
+def read_utilization(
+    start: Optional[date] = Query(None, description="First day of the report (UTC)"),
+    end: Optional[date] = Query(None, description="Day after the last day of the report; defaults to tomorrow"),
+    bucket: utilization.Bucket = Query("day", description="Report hours by day or by week (starting Monday)"),
+    aircraft_id: List[int] = Query([], description="Only these aircraft (repeatable); defaults to the active fleet"),
+    min_idle_days: int = Query(1, ge=1, description="Shortest run of days without flying reported as an idle gap"),
+    db: Session = Depends(get_db),
+):
+    end = end or datetime.utcnow().date() + timedelta(days=1)
+    start = start or end - timedelta(days=settings.UTILIZATION_DEFAULT_DAYS)
+    if not 0 < (end - start).days <= settings.UTILIZATION_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"end must be after start and at most {settings.UTILIZATION_MAX_DAYS} days later"
+        )
+    return serializers.render(utilization.report(
+        crud.get_fleet(db, aircraft_id),
+        crud.get_aircraft_daily_usage(db, start, end, aircraft_id),
+        start,
+        end,
+        bucket,
+        settings.UTILIZATION_HOURS_PER_DAY,
+        min_idle_days,
+    ))
+
+# Maintenance forecast (app/maintenance.py)
+@router.get("/reports/maintenance", response_model=schemas.MaintenanceReport)
+def read_maintenance_forecast(
+    aircraft_id: List[int] = Query([], description="Only these aircraft (repeatable); defaults to the active fleet"),
+    flagged_only: bool = Query(False, description="Only aircraft with bookings past an inspection limit"),
+    db: Session = Depends(get_db),
+):
+    forecasts = maintenance.forecaster.forecasts(db)
+    if aircraft_id:
+        wanted = set(aircraft_id)
+        forecasts = [forecast for forecast in forecasts if forecast["aircraft_id"] in wanted]
+    if flagged_only:
+        forecasts = [forecast for forecast in forecasts if forecast["flagged_flights"]]
+    return serializers.render({
+        "interval_hours": settings.MAINTENANCE_INTERVAL_HOURS,
+        "horizon_days": settings.MAINTENANCE_FORECAST_DAYS,
+        "aircraft": forecasts,
+    })
+
+# Live schedule feed (app/schedule_feed.py)
+@router.get("/stream/schedule", response_class=StreamingResponse)
+async def stream_schedule(
+    aircraft_id: List[int] = Query([], description="Only flights of these aircraft (repeatable)"),
+    instructor_id: List[int] = Query([], description="Only flights of these instructors (repeatable)"),
+):
+    subscription = schedule_feed.broker.subscribe(aircraft_id, instructor_id)
+    return StreamingResponse(
+        schedule_feed.sse(subscription, settings.SCHEDULE_STREAM_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/stream/schedule")
+async def stream_schedule_websocket(
+    websocket: WebSocket,
+    aircraft_id: List[int] = Query([]),
+    instructor_id: List[int] = Query([]),
+):
+    subscription = schedule_feed.broker.subscribe(aircraft_id, instructor_id)
+    await schedule_feed.websocket(websocket, subscription, settings.SCHEDULE_STREAM_HEARTBEAT_SECONDS)
+
+# Async read endpoints
+def _not_found(resource: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"{resource} not found"
+    )
+
+@async_router.get("/users/", response_model=List[schemas.User])
+async def read_users_async(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.User)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_id = _decode_cursor(after, pagination.decode_id_cursor)
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, await async_crud.get_collection_state(db, models.User))
+    items = await async_crud.get_users(db, skip=skip, limit=limit, after_id=after_id, fields=fields, with_state=True)
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _id_key)
+    return _render(items, serializers.user, response, fields)
+
+@async_router.get("/users/{user_id}", response_model=schemas.User)
+async def read_user_async(
+    user_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.User)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, await async_crud.get_updated_at(db, models.User, user_id))
+    db_user = await async_crud.get_user(db, user_id=user_id, fields=fields)
+    if db_user is None:
+        raise _not_found("User")
+    _check_freshness(request, response, http_cache.for_resource(request, db_user.updated_at))
+    return _render(db_user, serializers.user, response, fields)
+
+@async_router.get("/aircraft/", response_model=List[schemas.Aircraft])
+async def read_aircrafts_async(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Aircraft)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_id = _decode_cursor(after, pagination.decode_id_cursor)
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, await async_crud.get_collection_state(db, models.Aircraft))
+    items = await async_crud.get_aircrafts(
+        db, skip=skip, limit=limit, after_id=after_id, fields=fields, with_state=True
+    )
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _id_key)
+    return _render(items, serializers.aircraft, response, fields)
+
+@async_router.get("/aircraft/{aircraft_id}", response_model=schemas.Aircraft)
+async def read_aircraft_async(
+    aircraft_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Aircraft)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, await async_crud.get_updated_at(db, models.Aircraft, aircraft_id))
+    db_aircraft = await async_crud.get_aircraft(db, aircraft_id=aircraft_id, fields=fields)
+    if db_aircraft is None:
+        raise _not_found("Aircraft")
+    _check_freshness(request, response, http_cache.for_resource(request, db_aircraft.updated_at))
+    return _render(db_aircraft, serializers.aircraft, response, fields)
+
+@async_router.get("/instructors/", response_model=List[schemas.Instructor])
+async def read_instructors_async(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Instructor)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_id = _decode_cursor(after, pagination.decode_id_cursor)
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, await async_crud.get_collection_state(db, models.Instructor))
+    items = await async_crud.get_instructors(
+        db, skip=skip, limit=limit, after_id=after_id, fields=fields, with_state=True
+    )
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _id_key)
+    return _render(items, serializers.instructor, response, fields)
+
+@async_router.get("/instructors/{instructor_id}", response_model=schemas.Instructor)
+async def read_instructor_async(
+    instructor_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Instructor)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, await async_crud.get_updated_at(db, models.Instructor, instructor_id))
+    db_instructor = await async_crud.get_instructor(db, instructor_id=instructor_id, fields=fields)
+    if db_instructor is None:
+        raise _not_found("Instructor")
+    _check_freshness(request, response, http_cache.for_resource(request, db_instructor.updated_at))
+    return _render(db_instructor, serializers.instructor, response, fields)
+
+@async_router.get("/flights/", response_model=List[schemas.Flight])
+async def read_flights_async(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    student_id: Optional[int] = None,
+    instructor_id: Optional[int] = None,
+    aircraft_id: Optional[int] = None,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Flight)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_key = _decode_cursor(after, pagination.decode_flight_cursor)
+    # asyncpg will not coerce aware datetimes into the naive UTC columns
+    start = availability.to_naive_utc(start) if start else None
+    end = availability.to_naive_utc(end) if end else None
+    if http_cache.is_conditional(request):
+        _precheck_collection(request, response, await async_crud.get_collection_state(db, models.Flight))
+    if any(value is not None for value in (start, end, student_id, instructor_id, aircraft_id)):
+        items = await async_crud.get_flights_in_range(
+            db,
+            start=start,
+            end=end,
+            student_id=student_id,
+            instructor_id=instructor_id,
+            aircraft_id=aircraft_id,
+            skip=skip,
+            limit=limit,
+            after=after_key,
+            fields=fields,
+            with_state=True,
+        )
+    else:
+        items = await async_crud.get_flights(
+            db, skip=skip, limit=limit, after=after_key, fields=fields, with_state=True
+        )
+    _check_freshness(request, response, http_cache.for_collection(request, *items.state))
+    _set_next_cursor(response, items, limit, _flight_key)
+    return _render(items, serializers.flight, response, fields)
+
+# The streaming export stays sync, but must be declared ahead of /flights/{flight_id}: mounted first, this
+# router would otherwise route /flights/export to read_flight_async (a 422 for flight_id="export")
+async_router.add_api_route("/flights/export", export_flights, methods=["GET"], response_class=StreamingResponse)
+
+@async_router.get("/flights/{flight_id}", response_model=schemas.Flight)
+async def read_flight_async(
+    flight_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(_fieldset(schemas.Flight)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if http_cache.is_conditional(request):
+        _precheck_resource(request, response, await async_crud.get_updated_at(db, models.Flight, flight_id))
+    db_flight = await async_crud.get_flight(db, flight_id=flight_id, fields=fields)
+    if db_flight is None:
+        raise _not_found("Flight")
+    _check_freshness(request, response, http_cache.for_resource(request, db_flight.updated_at))
+    return _render(db_flight, serializers.flight, response, fields)
@@ -0,0 +1,121 @@
+"""
+Async counterparts of the ``crud`` read functions, for routes served from an
+``AsyncSession`` (see ``database.get_async_db``). Filtering and keyset logic is
+shared with ``crud`` so both paths return the same rows in the same order.
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import entity_cache, models, pagination
+from .crud import (
+    FLIGHT_SORT_FIELDS, _collection_state_columns, _filter_scope, _filter_window, _project, _seek, _seek_flights
+)
+
+async def _page(db: AsyncSession, statement, model, skip: int, limit: int, with_state: bool = False) -> list:
+    statement = statement.offset(skip).limit(limit)
+    if not with_state:
+        return list(await db.scalars(statement))
+    rows = (await db.execute(statement.add_columns(*_collection_state_columns(model)))).all()
+    if not rows:
+        return pagination.Page([], await get_collection_state(db, model))
+    return pagination.Page([row[0] for row in rows], tuple(rows[0][1:]))
+
+async def _by_id(db: AsyncSession, model, id: int, fields: tuple[str, ...] | None = None):
+    cacheable = fields is None and model.__tablename__ in entity_cache.CACHED_MODELS
+    if cacheable:
+        # Merging a cached snapshot with load=False does no IO, so the sync session is safe here
+        cached = entity_cache.get(db.sync_session, model, id)
+        if cached is not None:
+            return cached
+    generation = entity_cache.generation()
+    row = await db.scalar(_project(select(model), model, fields).where(model.id == id))
+    if cacheable:
+        entity_cache.put(db.sync_session, row, generation)
+    return row
+
+async def get_updated_at(db: AsyncSession, model, id: int):
+    return (await db.execute(select(model.updated_at).where(model.id == id))).first()
+
+async def get_collection_state(db: AsyncSession, model) -> tuple[datetime | None, int | None]:
+    return tuple((await db.execute(select(*_collection_state_columns(model)))).one())
+
+async def get_user(db: AsyncSession, user_id: int, fields: tuple[str, ...] | None = None) -> models.User:
+    return await _by_id(db, models.User, user_id, fields)
+
+async def get_users(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.User]:
+    after = (after_id,) if after_id is not None else None
+    statement = _project(select(models.User), models.User, fields)
+    return await _page(db, _seek(statement, (models.User.id,), after), models.User, skip, limit, with_state)
+
+async def get_aircraft(db: AsyncSession, aircraft_id: int, fields: tuple[str, ...] | None = None) -> models.Aircraft:
+    return await _by_id(db, models.Aircraft, aircraft_id, fields)
+
+async def get_aircrafts(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Aircraft]:
+    after = (after_id,) if after_id is not None else None
+    statement = _project(select(models.Aircraft), models.Aircraft, fields)
+    return await _page(db, _seek(statement, (models.Aircraft.id,), after), models.Aircraft, skip, limit, with_state)
+
+async def get_instructor(db: AsyncSession, instructor_id: int, fields: tuple[str, ...] | None = None) -> models.Instructor:
+    return await _by_id(db, models.Instructor, instructor_id, fields)
+
+async def get_instructors(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Instructor]:
+    after = (after_id,) if after_id is not None else None
+    statement = _project(select(models.Instructor), models.Instructor, fields)
+    return await _page(db, _seek(statement, (models.Instructor.id,), after), models.Instructor, skip, limit, with_state)
+
+async def get_flight(db: AsyncSession, flight_id: int, fields: tuple[str, ...] | None = None) -> models.Flight:
+    return await _by_id(db, models.Flight, flight_id, fields)
+
+async def get_flights(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: tuple[datetime | None, int] | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Flight]:
+    statement = _project(select(models.Flight), models.Flight, fields, FLIGHT_SORT_FIELDS)
+    return await _page(db, _seek_flights(statement, after, skip, limit), models.Flight, skip, limit, with_state)
+
+async def get_flights_in_range(
+    db: AsyncSession,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    student_id: int | None = None,
+    instructor_id: int | None = None,
+    aircraft_id: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: tuple[datetime | None, int] | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Flight]:
+    def criteria(statement):
+        return _filter_window(_filter_scope(statement, student_id, instructor_id, aircraft_id), start, end)
+
+    statement = criteria(_project(select(models.Flight), models.Flight, fields, FLIGHT_SORT_FIELDS))
+    statement = _seek_flights(statement, after, skip, limit, criteria)
+    return await _page(db, statement, models.Flight, skip, limit, with_state)
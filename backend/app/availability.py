@@ -0,0 +1,312 @@
+"""
+In-memory availability index for aircraft and instructors.
+
+Upcoming bookings are loaded once into a per-resource timeline (parallel sorted
+lists of start/end times). The flights exclusion constraints guarantee bookings
+of one resource never overlap, so both lists are sorted and any window can be
+checked with a single bisect. The index is rebuilt lazily after a short TTL or
+as soon as this process commits a change to flights, aircraft or instructors;
+the database constraints remain the authority when a booking is written.
+"""
+import re
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import Iterable, Optional
+
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+
+UNAVAILABLE_AIRCRAFT_STATUSES = {"maintenance", "grounded", "out of service", "out_of_service", "inactive"}
+INSTRUMENT_INSTRUCTOR_RATING = "CFII"
+# Flights longer than this are not expected; it bounds the index-friendly start_time filter
+MAX_FLIGHT_LENGTH = timedelta(days=1)
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Flight times are stored as naive UTC; normalize aware datetimes to match."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class Timeline:
+    """Non-overlapping busy intervals of a single resource, sorted by start time."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts: list[datetime] = []
+        self.ends: list[datetime] = []
+
+    def add(self, start: datetime, end: datetime) -> None:
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def earliest_fit(self, start: datetime, duration: timedelta) -> datetime:
+        """Earliest time >= start at which a block of `duration` fits between bookings."""
+        # Ends are sorted too, since bookings of one resource never overlap
+        i = bisect_right(self.ends, start)
+        while i < len(self.starts) and self.starts[i] < start + duration:
+            start = max(start, self.ends[i])
+            i += 1
+        return start
+
+_DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_DAY_ALIASES = {
+    "daily": range(7),
+    "everyday": range(7),
+    "weekdays": range(5),
+    "weekends": range(5, 7),
+}
+_TIME = r"\d{1,2}(?::\d{2})?\s*(?:am|pm)?"
+_SEGMENT = re.compile(rf"^(?P<days>[a-z,\-\s]+?)\s+(?P<start>{_TIME})\s*-\s*(?P<end>{_TIME})$")
+
+def _parse_minutes(token: str) -> int:
+    token = token.replace(" ", "")
+    suffix = token[-2:] if token[-2:] in ("am", "pm") else ""
+    hours, _, minutes = token[: len(token) - len(suffix)].partition(":")
+    hour = int(hours) % 12 if suffix else int(hours)
+    if suffix == "pm":
+        hour += 12
+    return hour * 60 + int(minutes or 0)
+
+def _parse_days(text: str) -> set[int]:
+    days = set()
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        if part in _DAY_ALIASES:
+            days.update(_DAY_ALIASES[part])
+            continue
+        first, _, last = (p.strip()[:3] for p in part.partition("-"))
+        lo = _DAYS.index(first)
+        hi = _DAYS.index(last) if last else lo
+        days.update((lo + k) % 7 for k in range((hi - lo) % 7 + 1))
+    return days
+
+def parse_weekly_availability(text: Optional[str]) -> Optional[dict[int, list[tuple[int, int]]]]:
+    """Parse strings like ``"Mon-Fri 9am-5pm; Sat 08:00-12:00"`` into weekday -> [(start, end) minutes].
+
+    Returns None when the text is empty or not understood, meaning the instructor
+    is treated as having no working-hours restriction.
+    """
+    if not text or not text.strip():
+        return None
+    shifts: dict[int, list[tuple[int, int]]] = {}
+    try:
+        for segment in filter(None, (s.strip() for s in text.lower().split(";"))):
+            match = _SEGMENT.match(segment)
+            if match is None:
+                return None
+            start, end = _parse_minutes(match["start"]), _parse_minutes(match["end"])
+            if end <= start:
+                return None
+            for day in _parse_days(match["days"]):
+                shifts.setdefault(day, []).append((start, end))
+    except ValueError:
+        return None
+    for windows in shifts.values():
+        windows.sort()
+    return shifts or None
+
+def _shift_fit(shifts, start: datetime, duration: timedelta) -> Optional[datetime]:
+    """Earliest time >= start at which `duration` fits inside a working-hours window."""
+    if shifts is None:
+        return start
+    day = datetime.combine(start.date(), datetime.min.time())
+    for offset in range(8):
+        midnight = day + timedelta(days=offset)
+        for lo, hi in shifts.get(midnight.weekday(), ()):
+            candidate = max(start, midnight + timedelta(minutes=lo))
+            if candidate + duration <= midnight + timedelta(minutes=hi):
+                return candidate
+    return None
+
+class AircraftEntry:
+    __slots__ = ("aircraft", "operational", "next_maintenance", "timeline")
+
+    def __init__(self, aircraft: models.Aircraft):
+        self.aircraft = aircraft
+        status = (aircraft.status or "").strip().lower()
+        self.operational = aircraft.is_active is not False and status not in UNAVAILABLE_AIRCRAFT_STATUSES
+        self.next_maintenance = aircraft.next_maintenance
+        self.timeline = Timeline()
+
+    def earliest_fit(self, start: datetime, duration: timedelta) -> Optional[datetime]:
+        if not self.operational:
+            return None
+        start = self.timeline.earliest_fit(start, duration)
+        if self.next_maintenance is not None and start + duration > self.next_maintenance:
+            return None
+        return start
+
+class InstructorEntry:
+    __slots__ = ("instructor", "shifts", "ratings", "timeline")
+
+    def __init__(self, instructor: models.Instructor):
+        self.instructor = instructor
+        self.shifts = parse_weekly_availability(instructor.availability)
+        self.ratings = {r.strip().upper() for r in (instructor.rating or "").split(",") if r.strip()}
+        self.timeline = Timeline()
+
+    def qualified_for(self, flight_type: Optional[models.FlightType]) -> bool:
+        if self.instructor.is_active is False:
+            return False
+        if flight_type == models.FlightType.instrument:
+            return INSTRUMENT_INSTRUCTOR_RATING in self.ratings
+        return True
+
+    def earliest_fit(self, start: datetime, duration: timedelta, limit: datetime) -> Optional[datetime]:
+        while start <= limit:
+            in_shift = _shift_fit(self.shifts, start, duration)
+            if in_shift is None:
+                return None
+            free = self.timeline.earliest_fit(in_shift, duration)
+            if free == in_shift:
+                return free
+            start = free
+        return None
+
+def _round_up(value: datetime, step: timedelta) -> datetime:
+    remainder = (value - datetime.min) % step
+    return value if not remainder else value + (step - remainder)
+
+class AvailabilityIndex:
+    def __init__(
+        self,
+        aircraft: Iterable[models.Aircraft],
+        instructors: Iterable[models.Instructor],
+        bookings: Iterable[tuple[Optional[int], Optional[int], datetime, datetime]],
+    ):
+        self.aircraft = {a.id: AircraftEntry(a) for a in aircraft}
+        self.instructors = {i.id: InstructorEntry(i) for i in instructors}
+        for aircraft_id, instructor_id, start, end in bookings:
+            if aircraft_id in self.aircraft:
+                self.aircraft[aircraft_id].timeline.add(start, end)
+            if instructor_id in self.instructors:
+                self.instructors[instructor_id].timeline.add(start, end)
+
+    @classmethod
+    def load(cls, db: Session, since: datetime) -> "AvailabilityIndex":
+        """Build the index from every non-cancelled flight still running at or after `since`."""
+        bookings = (
+            db.query(
+                models.Flight.aircraft_id,
+                models.Flight.instructor_id,
+                models.Flight.start_time,
+                models.Flight.end_time,
+            )
+            .filter(
+                models.Flight.start_time >= since - MAX_FLIGHT_LENGTH,
+                models.Flight.end_time > since,
+                or_(models.Flight.status.is_(None), models.Flight.status != models.FlightStatus.cancelled),
+            )
+            .order_by(models.Flight.start_time)
+            .all()
+        )
+        # Load the cached rows through a private session so they are detached (and never
+        # refreshed) once it closes, without touching the caller's identity map
+        with Session(bind=db.connection()) as loader:
+            aircraft = loader.query(models.Aircraft).order_by(models.Aircraft.id).all()
+            instructors = loader.query(models.Instructor).order_by(models.Instructor.id).all()
+        return cls(aircraft, instructors, bookings)
+
+    def check(
+        self,
+        start: datetime,
+        duration: timedelta,
+        flight_type: Optional[models.FlightType] = None,
+    ) -> tuple[list[tuple[models.Aircraft, bool]], list[tuple[models.Instructor, bool]]]:
+        """Every aircraft and instructor, flagged with whether it is free for [start, start + duration)."""
+        aircraft = [(entry.aircraft, entry.earliest_fit(start, duration) == start) for entry in self.aircraft.values()]
+        instructors = [
+            (entry.instructor, entry.qualified_for(flight_type) and entry.earliest_fit(start, duration, start) == start)
+            for entry in self.instructors.values()
+        ]
+        return aircraft, instructors
+
+    def next_slots(
+        self,
+        start: datetime,
+        duration: timedelta,
+        until: datetime,
+        count: int,
+        flight_type: Optional[models.FlightType] = None,
+        step: timedelta = timedelta(minutes=15),
+    ) -> list[dict]:
+        """The first `count` slot starts (on a `step` grid) where an aircraft, and an instructor unless solo, are free."""
+        needs_instructor = flight_type != models.FlightType.solo
+        instructors = [e for e in self.instructors.values() if e.qualified_for(flight_type)] if needs_instructor else []
+        aircraft = list(self.aircraft.values())
+        instructor_fits = []
+        slots = []
+        t = _round_up(start, step)
+        while len(slots) < count and t + duration <= until:
+            aircraft_fits = [(e.earliest_fit(t, duration), e) for e in aircraft]
+            earliest = min((fit for fit, _ in aircraft_fits if fit is not None), default=None)
+            if needs_instructor:
+                instructor_fits = [(e.earliest_fit(t, duration, until), e) for e in instructors]
+                earliest_instructor = min((fit for fit, _ in instructor_fits if fit is not None), default=None)
+                earliest = None if earliest is None or earliest_instructor is None else max(earliest, earliest_instructor)
+            if earliest is None:
+                break
+            aligned = _round_up(earliest, step)
+            if aligned != t:
+                # Something became free later than t; jump there and re-check everything
+                t = aligned
+                continue
+            slot = {
+                "start_time": t,
+                "end_time": t + duration,
+                "aircraft_ids": [e.aircraft.id for fit, e in aircraft_fits if fit == t],
+                "instructor_ids": [e.instructor.id for fit, e in instructor_fits if fit == t],
+            }
+            slots.append(slot)
+            t += step
+        return slots
+
+_lock = threading.Lock()
+_cached_index: Optional[AvailabilityIndex] = None
+_cached_at = 0.0
+
+def invalidate() -> None:
+    global _cached_index
+    _cached_index = None
+
+def get_index(db: Session) -> AvailabilityIndex:
+    """Return the shared index, rebuilding it when invalidated or older than the configured TTL."""
+    global _cached_index, _cached_at
+    index = _cached_index
+    if index is not None and time.monotonic() - _cached_at < settings.AVAILABILITY_CACHE_TTL_SECONDS:
+        return index
+    with _lock:
+        if _cached_index is None or time.monotonic() - _cached_at >= settings.AVAILABILITY_CACHE_TTL_SECONDS:
+            _cached_index = AvailabilityIndex.load(db, datetime.utcnow())
+            _cached_at = time.monotonic()
+        return _cached_index
+
+_WATCHED_MODELS = (models.Flight, models.Aircraft, models.Instructor)
+
+@event.listens_for(Session, "after_flush")
+def _mark_index_stale(session, flush_context):
+    if any(isinstance(obj, _WATCHED_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["availability_stale"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_index_stale_on_dml(orm_execute_state):
+    # ORM-enabled INSERT/UPDATE/DELETE statements bypass the flush
+    mapper = orm_execute_state.bind_mapper
+    if not orm_execute_state.is_select and mapper is not None and mapper.class_ in _WATCHED_MODELS:
+        orm_execute_state.session.info["availability_stale"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("availability_stale", False):
+        invalidate()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_stale_flag(session, previous_transaction):
+    session.info.pop("availability_stale", None)
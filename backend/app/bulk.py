@@ -0,0 +1,243 @@
+"""
+Batched create/update/delete for the REST resources.
+
+Each batch is validated item by item with the regular ``schemas`` models and
+then written with one multi-row statement inside a single transaction. When
+the database rejects a batch (unique, foreign key or overlap constraint), the
+batch is split in halves under savepoints until the offending items are
+isolated, so a handful of bad rows costs a few extra statements instead of
+failing the whole import or forcing a round trip per row.
+"""
+import json
+from typing import Callable, Optional
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from . import crud, entity_cache, models, schedule_feed, schemas, security
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+UNIQUE_CONSTRAINT_MESSAGES = {
+    "ix_users_email": "Email already registered",
+    "ix_instructors_email": "Email already registered",
+    "ix_aircraft_registration": "Registration already registered",
+}
+
+class InvalidItem:
+    """Placeholder for an input line that could not be decoded."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+def parse_ndjson_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return InvalidItem("Invalid JSON")
+
+def _account_values(values: Callable, exclude_unset: bool) -> Callable[[list[BaseModel]], list[dict]]:
+    """Build user/instructor rows, hashing the batch's passwords in parallel on the hashing pool."""
+    def build(payloads: list[BaseModel]) -> list[dict]:
+        hashes = iter(security.hash_passwords([p.password for p in payloads if p.password is not None]))
+        return [
+            values(p, exclude_unset=exclude_unset, hashed_password=next(hashes) if p.password is not None else None)
+            for p in payloads
+        ]
+    return build
+
+def _plain_values(exclude_unset: bool) -> Callable[[list[BaseModel]], list[dict]]:
+    return lambda payloads: [p.model_dump(exclude_unset=exclude_unset) for p in payloads]
+
+class BulkResource:
+    def __init__(
+        self,
+        model,
+        create_schema: type[BaseModel],
+        update_schema: type[BaseModel],
+        create_values: Callable[[list[BaseModel]], list[dict]],
+        update_values: Callable[[list[BaseModel]], list[dict]],
+    ):
+        self.model = model
+        self.create_schema = create_schema
+        self.update_schema = update_schema
+        self.create_values = create_values
+        self.update_values = update_values
+
+RESOURCES = {
+    "users": BulkResource(
+        models.User,
+        schemas.UserCreate,
+        schemas.UserUpdate,
+        _account_values(crud.user_values, exclude_unset=False),
+        _account_values(crud.user_values, exclude_unset=True),
+    ),
+    "aircraft": BulkResource(
+        models.Aircraft,
+        schemas.AircraftCreate,
+        schemas.AircraftUpdate,
+        _plain_values(exclude_unset=False),
+        _plain_values(exclude_unset=True),
+    ),
+    "instructors": BulkResource(
+        models.Instructor,
+        schemas.InstructorCreate,
+        schemas.InstructorUpdate,
+        _account_values(crud.instructor_values, exclude_unset=False),
+        _account_values(crud.instructor_values, exclude_unset=True),
+    ),
+    "flights": BulkResource(
+        models.Flight,
+        schemas.FlightCreate,
+        schemas.FlightUpdate,
+        _plain_values(exclude_unset=False),
+        _plain_values(exclude_unset=True),
+    ),
+}
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()
+    )
+
+def _integrity_message(exc: Exception, deleting: bool = False) -> str:
+    diag = getattr(exc.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None)
+    if deleting and getattr(exc.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION:
+        return "Still referenced by flights"
+    if constraint in crud.FLIGHT_OVERLAP_CONSTRAINTS:
+        return str(crud.FlightConflictError(crud.FLIGHT_OVERLAP_CONSTRAINTS[constraint]))
+    if constraint in crud.FLIGHT_REFERENCE_CONSTRAINTS:
+        return str(crud.FlightReferenceError(crud.FLIGHT_REFERENCE_CONSTRAINTS[constraint]))
+    if constraint in UNIQUE_CONSTRAINT_MESSAGES:
+        return UNIQUE_CONSTRAINT_MESSAGES[constraint]
+    return getattr(diag, "message_primary", None) or "Rejected by the database"
+
+def _failed(index: int, error: str, id: Optional[int] = None) -> dict:
+    return {"index": index, "status": "failed", "id": id, "error": error}
+
+def _write_isolating_failures(
+    db: Session,
+    chunk: list[tuple[int, dict]],
+    write: Callable[[list[dict]], list[Optional[int]]],
+    results: dict,
+    success_status: str,
+    deleting: bool = False,
+) -> None:
+    """Write `chunk` under a savepoint; on a constraint violation, bisect to find the bad items."""
+    try:
+        with db.begin_nested():
+            ids = write([row for _, row in chunk])
+    except (IntegrityError, DataError) as exc:
+        if len(chunk) == 1:
+            index, row = chunk[0]
+            results[index] = _failed(index, _integrity_message(exc, deleting), row.get("id"))
+            return
+        middle = len(chunk) // 2
+        _write_isolating_failures(db, chunk[:middle], write, results, success_status, deleting)
+        _write_isolating_failures(db, chunk[middle:], write, results, success_status, deleting)
+        return
+    for (index, _), id in zip(chunk, ids):
+        results[index] = {"index": index, "status": success_status, "id": id, "error": None}
+
+def _summary(results: dict, total: int) -> dict:
+    ordered = [results[index] for index in range(total)]
+    failed = sum(1 for result in ordered if result["status"] == "failed")
+    return {"succeeded": total - failed, "failed": failed, "results": ordered}
+
+def _item_id(item) -> Optional[int]:
+    value = item.get("id") if isinstance(item, dict) else item
+    return value if type(value) is int else None
+
+def _commit(db: Session, resource: BulkResource, results: dict) -> None:
+    # One resync on the schedule feed instead of an event per flight, and since completed flights
+    # roll into aircraft.total_time (models.maintain_aircraft_usage), no cached aircraft survive either
+    if resource.model is models.Flight and any(result["status"] != "failed" for result in results.values()):
+        schedule_feed.emit_resync(db)
+        entity_cache.mark_changed(db, "aircraft")
+    db.commit()
+
+def bulk_create(db: Session, resource: BulkResource, items: list) -> dict:
+    results, indexes, payloads = {}, [], []
+    for index, item in enumerate(items):
+        if isinstance(item, InvalidItem):
+            results[index] = _failed(index, item.error)
+            continue
+        try:
+            payloads.append(resource.create_schema.model_validate(item))
+        except ValidationError as exc:
+            results[index] = _failed(index, _validation_message(exc))
+            continue
+        indexes.append(index)
+    valid = list(zip(indexes, resource.create_values(payloads)))
+
+    def write(rows: list[dict]) -> list[int]:
+        statement = insert(resource.model).returning(resource.model.id, sort_by_parameter_order=True)
+        return list(db.scalars(statement, rows))
+
+    if valid:
+        _write_isolating_failures(db, valid, write, results, "created")
+    _commit(db, resource, results)
+    return _summary(results, len(items))
+
+def bulk_update(db: Session, resource: BulkResource, items: list) -> dict:
+    results, keys, payloads = {}, [], []
+    for index, item in enumerate(items):
+        if isinstance(item, InvalidItem):
+            results[index] = _failed(index, item.error)
+            continue
+        id = _item_id(item)
+        if id is None:
+            results[index] = _failed(index, "id: an integer id is required")
+            continue
+        payload = {key: value for key, value in item.items() if key != "id"}
+        try:
+            payloads.append(resource.update_schema.model_validate(payload))
+        except ValidationError as exc:
+            results[index] = _failed(index, _validation_message(exc), id)
+            continue
+        keys.append((index, id))
+    valid = [(index, {"id": id, **values}) for (index, id), values in zip(keys, resource.update_values(payloads))]
+
+    existing = set(db.scalars(select(resource.model.id).where(resource.model.id.in_({row["id"] for _, row in valid}))))
+    found = []
+    for index, row in valid:
+        if row["id"] in existing:
+            found.append((index, row))
+        else:
+            results[index] = _failed(index, "Not found", row["id"])
+
+    def write(rows: list[dict]) -> list[int]:
+        # Bulk UPDATE by primary key: one executemany per distinct set of columns
+        db.execute(update(resource.model), rows)
+        return [row["id"] for row in rows]
+
+    if found:
+        _write_isolating_failures(db, found, write, results, "updated")
+    _commit(db, resource, results)
+    return _summary(results, len(items))
+
+def bulk_delete(db: Session, resource: BulkResource, items: list) -> dict:
+    results, valid = {}, []
+    for index, item in enumerate(items):
+        id = None if isinstance(item, InvalidItem) else _item_id(item)
+        if id is None:
+            results[index] = _failed(index, "id: an integer id is required")
+        else:
+            valid.append((index, {"id": id}))
+
+    def write(rows: list[dict]) -> list[Optional[int]]:
+        ids = [row["id"] for row in rows]
+        statement = delete(resource.model).where(resource.model.id.in_(ids)).returning(resource.model.id)
+        deleted = set(db.scalars(statement, execution_options={"synchronize_session": False}))
+        return [id if id in deleted else None for id in ids]
+
+    if valid:
+        _write_isolating_failures(db, valid, write, results, "deleted", deleting=True)
+    for index, row in valid:
+        if results[index]["status"] == "deleted" and results[index]["id"] is None:
+            results[index] = _failed(index, "Not found", row["id"])
+    _commit(db, resource, results)
+    return _summary(results, len(items))
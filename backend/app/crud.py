@@ -1,10 +1,9 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from datetime import datetime
-from passlib.context import CryptContext
-from . import models, schemas
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_, func, insert, select, tuple_, union_all, update
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime
+from typing import Callable
+from . import availability, entity_cache, models, pagination, schedule_feed, schemas, security
 
 def parse_datetime(date_str: str | datetime) -> datetime:
     """Parse a datetime string or datetime object into a datetime object."""
@@ -15,39 +14,137 @@ def parse_datetime(date_str: str | datetime) -> datetime:
     except (ValueError, TypeError):
         return None
 
+def _seek(query, key_columns: tuple, after: tuple | None):
+    """Order by an indexed key and resume strictly after the given key values (keyset pagination)."""
+    if after is not None:
+        query = query.filter(tuple_(*key_columns) > tuple_(*after))
+    return query.order_by(*key_columns)
+
+def _project(query, model, fields: tuple[str, ...] | None, key: tuple[str, ...] = ("id",)):
+    """Select only the named columns (plus the `key` columns paging needs) instead of whole rows.
+
+    updated_at is always loaded too, since the routes derive their ETag from it.
+    """
+    if fields is None:
+        return query
+    names = dict.fromkeys((*key, "updated_at", *fields))
+    return query.options(load_only(*(getattr(model, name) for name in names)))
+
+def _get_by_id(db: Session, model, id: int, fields: tuple[str, ...] | None = None):
+    # Whole users, aircraft and instructors are served from the entity cache when possible
+    if fields is None:
+        cached = entity_cache.get(db, model, id)
+        if cached is not None:
+            return cached
+    generation = entity_cache.generation()
+    row = _project(db.query(model), model, fields).filter(model.id == id).first()
+    if fields is None:
+        entity_cache.put(db, row, generation)
+    return row
+
+def get_updated_at(db: Session, model, id: int):
+    """The row's (updated_at,) for conditional GETs, or None when there is no such row."""
+    return db.query(model.updated_at).filter(model.id == id).first()
+
+def _collection_state_columns(model) -> tuple:
+    # Both are read off the end of an index: (updated_at, id) on the table, (table_name, id) on deletions
+    return (
+        select(func.max(model.updated_at)).scalar_subquery(),
+        select(func.max(models.Deletion.id)).where(models.Deletion.table_name == model.__tablename__).scalar_subquery(),
+    )
+
+def get_collection_state(db: Session, model) -> tuple[datetime | None, int | None]:
+    """max(updated_at) and the latest deletion logged for the table: the HTTP cache validators of a collection."""
+    return tuple(db.query(*_collection_state_columns(model)).one())
+
+def _page(query, model, skip: int, limit: int, with_state: bool = False) -> list:
+    """One page of `query`; with_state also reads the collection state in the same statement (a pagination.Page)."""
+    query = query.offset(skip).limit(limit)
+    if not with_state:
+        return query.all()
+    rows = query.add_columns(*_collection_state_columns(model)).all()
+    if not rows:
+        # No row to carry the state
+        return pagination.Page([], get_collection_state(query.session, model))
+    return pagination.Page([row[0] for row in rows], tuple(rows[0][1:]))
+
+def get_changed_rows(db: Session, model, since: datetime | None, limit: int) -> list:
+    """Rows updated after `since` (every row when it is None), oldest change first."""
+    query = db.query(model)
+    if since is not None:
+        query = query.filter(model.updated_at > since)
+    return query.order_by(model.updated_at, model.id).limit(limit).all()
+
+def get_rows_changed_at(db: Session, model, updated_at: datetime) -> list:
+    return db.query(model).filter(model.updated_at == updated_at).order_by(model.id).all()
+
+def get_deletions(db: Session, since: datetime | None, limit: int) -> list[models.Deletion]:
+    """Tombstones logged after `since`, oldest first."""
+    query = db.query(models.Deletion)
+    if since is not None:
+        query = query.filter(models.Deletion.deleted_at > since)
+    return query.order_by(models.Deletion.deleted_at, models.Deletion.id).limit(limit).all()
+
+def get_deletions_at(db: Session, deleted_at: datetime) -> list[models.Deletion]:
+    return db.query(models.Deletion).filter(models.Deletion.deleted_at == deleted_at).order_by(models.Deletion.id).all()
+
 # User CRUD operations
-def get_user(db: Session, user_id: int) -> models.User:
-    return db.query(models.User).filter(models.User.id == user_id).first()
+def get_user(db: Session, user_id: int, fields: tuple[str, ...] | None = None) -> models.User:
+    return _get_by_id(db, models.User, user_id, fields)
 
 def get_user_by_email(db: Session, email: str) -> models.User:
     return db.query(models.User).filter(models.User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> list[models.User]:
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.User]:
+    after = (after_id,) if after_id is not None else None
+    query = _seek(_project(db.query(models.User), models.User, fields), (models.User.id,), after)
+    return _page(query, models.User, skip, limit, with_state)
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    hashed_password = pwd_context.hash(user.password)
-    user_data = user.model_dump(exclude={"password"})
+def user_values(
+    user: schemas.UserCreate | schemas.UserUpdate,
+    exclude_unset: bool = False,
+    hashed_password: str | None = None,
+) -> dict:
+    """Column values for a user payload, with the plain-text password replaced by its hash."""
+    user_data = user.model_dump(exclude={"password"}, exclude_unset=exclude_unset)
+    if user.password is not None:
+        user_data["hashed_password"] = hashed_password or security.hash_passwords([user.password])[0]
     if "medical_expiry" in user_data:
         user_data["medical_expiry"] = parse_datetime(user_data["medical_expiry"])
-    db_user = models.User(hashed_password=hashed_password, **user_data)
+    return user_data
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: str | None = None) -> models.User:
+    db_user = models.User(**user_values(user, hashed_password=hashed_password))
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, user: schemas.UserUpdate) -> models.User | None:
+def update_user(
+    db: Session, user_id: int, user: schemas.UserUpdate, hashed_password: str | None = None
+) -> models.User | None:
     db_user = get_user(db, user_id)
     if db_user is None:
         return None
     
-    for key, value in user.dict(exclude_unset=True).items():
+    for key, value in user_values(user, exclude_unset=True, hashed_password=hashed_password).items():
         setattr(db_user, key, value)
     
     db.commit()
     db.refresh(db_user)
     return db_user
 
+def set_password_hash(db: Session, account: models.User | models.Instructor, hashed_password: str) -> None:
+    account.hashed_password = hashed_password
+    db.commit()
+
 def delete_user(db: Session, user_id: int) -> models.User | None:
     db_user = get_user(db, user_id)
     if db_user is None:
@@ -57,14 +154,23 @@ def delete_user(db: Session, user_id: int) -> models.User | None:
     return db_user
 
 # Aircraft CRUD operations
-def get_aircraft(db: Session, aircraft_id: int) -> models.Aircraft:
-    return db.query(models.Aircraft).filter(models.Aircraft.id == aircraft_id).first()
+def get_aircraft(db: Session, aircraft_id: int, fields: tuple[str, ...] | None = None) -> models.Aircraft:
+    return _get_by_id(db, models.Aircraft, aircraft_id, fields)
 
 def get_aircraft_by_registration(db: Session, registration: str) -> models.Aircraft:
     return db.query(models.Aircraft).filter(models.Aircraft.registration == registration).first()
 
-def get_aircrafts(db: Session, skip: int = 0, limit: int = 100) -> list[models.Aircraft]:
-    return db.query(models.Aircraft).offset(skip).limit(limit).all()
+def get_aircrafts(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Aircraft]:
+    after = (after_id,) if after_id is not None else None
+    query = _seek(_project(db.query(models.Aircraft), models.Aircraft, fields), (models.Aircraft.id,), after)
+    return _page(query, models.Aircraft, skip, limit, with_state)
 
 def create_aircraft(db: Session, aircraft: schemas.AircraftCreate) -> models.Aircraft:
     aircraft_data = aircraft.model_dump()
@@ -99,28 +205,52 @@ def delete_aircraft(db: Session, aircraft_id: int) -> models.Aircraft | None:
     return db_aircraft
 
 # Instructor CRUD operations
-def get_instructor(db: Session, instructor_id: int) -> models.Instructor:
-    return db.query(models.Instructor).filter(models.Instructor.id == instructor_id).first()
+def get_instructor(db: Session, instructor_id: int, fields: tuple[str, ...] | None = None) -> models.Instructor:
+    return _get_by_id(db, models.Instructor, instructor_id, fields)
 
 def get_instructor_by_email(db: Session, email: str) -> models.Instructor:
     return db.query(models.Instructor).filter(models.Instructor.email == email).first()
 
-def get_instructors(db: Session, skip: int = 0, limit: int = 100) -> list[models.Instructor]:
-    return db.query(models.Instructor).offset(skip).limit(limit).all()
+def get_instructors(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Instructor]:
+    after = (after_id,) if after_id is not None else None
+    query = _seek(_project(db.query(models.Instructor), models.Instructor, fields), (models.Instructor.id,), after)
+    return _page(query, models.Instructor, skip, limit, with_state)
 
-def create_instructor(db: Session, instructor: schemas.InstructorCreate) -> models.Instructor:
-    db_instructor = models.Instructor(**instructor.model_dump())
+def instructor_values(
+    instructor: schemas.InstructorCreate | schemas.InstructorUpdate,
+    exclude_unset: bool = False,
+    hashed_password: str | None = None,
+) -> dict:
+    """Column values for an instructor payload, with the plain-text password replaced by its hash."""
+    instructor_data = instructor.model_dump(exclude={"password"}, exclude_unset=exclude_unset)
+    if instructor.password is not None:
+        instructor_data["hashed_password"] = hashed_password or security.hash_passwords([instructor.password])[0]
+    return instructor_data
+
+def create_instructor(
+    db: Session, instructor: schemas.InstructorCreate, hashed_password: str | None = None
+) -> models.Instructor:
+    db_instructor = models.Instructor(**instructor_values(instructor, hashed_password=hashed_password))
     db.add(db_instructor)
     db.commit()
     db.refresh(db_instructor)
     return db_instructor
 
-def update_instructor(db: Session, instructor_id: int, instructor: schemas.InstructorUpdate) -> models.Instructor | None:
+def update_instructor(
+    db: Session, instructor_id: int, instructor: schemas.InstructorUpdate, hashed_password: str | None = None
+) -> models.Instructor | None:
     db_instructor = get_instructor(db, instructor_id)
     if db_instructor is None:
         return None
     
-    for key, value in instructor.dict(exclude_unset=True).items():
+    for key, value in instructor_values(instructor, exclude_unset=True, hashed_password=hashed_password).items():
         setattr(db_instructor, key, value)
     
     db.commit()
@@ -136,11 +266,181 @@ def delete_instructor(db: Session, instructor_id: int) -> models.Instructor | No
     return db_instructor
 
 # Flight CRUD operations
-def get_flight(db: Session, flight_id: int) -> models.Flight:
-    return db.query(models.Flight).filter(models.Flight.id == flight_id).first()
+FLIGHT_OVERLAP_CONSTRAINTS = {
+    "ex_flights_aircraft_overlap": "Aircraft",
+    "ex_flights_instructor_overlap": "Instructor",
+}
+
+# Postgres' default names for the unnamed foreign keys on flights
+FLIGHT_REFERENCE_CONSTRAINTS = {
+    "flights_student_id_fkey": "Student",
+    "flights_instructor_id_fkey": "Instructor",
+    "flights_aircraft_id_fkey": "Aircraft",
+}
+
+class FlightConflictError(Exception):
+    """A flight overlaps another non-cancelled booking of the same aircraft or instructor."""
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        super().__init__(f"{resource} is already booked for this time")
+
+class FlightReferenceError(Exception):
+    """A flight references a student, instructor or aircraft that does not exist."""
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        super().__init__(f"{resource} not found")
+
+def _mark_aircraft_usage(db: Session, flight: models.Flight, previous_aircraft_id: int | None = None) -> None:
+    # The maintain_aircraft_usage trigger may have changed these aircraft's total_time
+    aircraft_ids = {flight.aircraft_id, previous_aircraft_id} - {None}
+    if flight.status == models.FlightStatus.completed or previous_aircraft_id is not None:
+        for aircraft_id in aircraft_ids:
+            entity_cache.mark_changed(db, "aircraft", aircraft_id)
+
+def _write_flight(db: Session, statement, event: str) -> models.Flight | None:
+    """Run a single INSERT/UPDATE ... RETURNING for flights, announce it on the schedule feed and commit.
+
+    The statement returns the flight, optionally followed by its previous
+    aircraft_id and instructor_id for the feed's subscription filters.
+
+    Referenced rows are not looked up beforehand: the foreign key and overlap
+    constraints are checked by Postgres inside the same statement, and their
+    violations are translated into FlightReferenceError / FlightConflictError.
+    """
+    try:
+        row = db.execute(statement).one_or_none()
+        if row is not None:
+            schedule_feed.emit(db, event, *row)
+            _mark_aircraft_usage(db, row[0], *row[1:2])
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        constraint = getattr(getattr(exc.orig, "diag", None), "constraint_name", None)
+        if constraint in FLIGHT_OVERLAP_CONSTRAINTS:
+            raise FlightConflictError(FLIGHT_OVERLAP_CONSTRAINTS[constraint]) from exc
+        if constraint in FLIGHT_REFERENCE_CONSTRAINTS:
+            raise FlightReferenceError(FLIGHT_REFERENCE_CONSTRAINTS[constraint]) from exc
+        raise
+    return row[0] if row is not None else None
+
+def get_flight(db: Session, flight_id: int, fields: tuple[str, ...] | None = None) -> models.Flight:
+    query = _project(db.query(models.Flight), models.Flight, fields)
+    return query.filter(models.Flight.id == flight_id).first()
 
-def get_flights(db: Session, skip: int = 0, limit: int = 100) -> list[models.Flight]:
-    return db.query(models.Flight).offset(skip).limit(limit).all()
+FLIGHT_SORT_KEY = (models.Flight.start_time, models.Flight.id)
+FLIGHT_SORT_FIELDS = ("start_time", "id")
+
+def _seek_flights(query, after: tuple[datetime | None, int] | None, skip: int, limit: int, criteria: Callable = None):
+    """Order a flight query by (start_time, id), flights without a start_time last, resuming after `after`.
+
+    A row comparison never matches a NULL start_time, so seeking past a dated flight alone would drop
+    the undated ones. The page's ids come instead from two index-backed branches, each cut to the rows
+    the page can reach: the dated flights after the key, then the undated tail. `criteria` applies the
+    listing's filters to both.
+    """
+    start_time, id = FLIGHT_SORT_KEY
+    if after is not None and after[0] is None:
+        # Already in the undated tail, which is in id order
+        query = query.filter(start_time.is_(None), id > after[1])
+    elif after is not None:
+        branches = []
+        for condition in (tuple_(start_time, id) > tuple_(*after), start_time.is_(None)):
+            branch = select(id).filter(condition)
+            if criteria is not None:
+                branch = criteria(branch)
+            branches.append(branch.order_by(*FLIGHT_SORT_KEY).limit(skip + limit))
+        query = query.filter(id.in_(select(union_all(*branches).subquery().c.id)))
+    # Ascending puts NULLs last in PostgreSQL, which is also how the (start_time, id) index stores them
+    return query.order_by(*FLIGHT_SORT_KEY)
+
+def get_flights(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after: tuple[datetime | None, int] | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Flight]:
+    query = _project(db.query(models.Flight), models.Flight, fields, FLIGHT_SORT_FIELDS)
+    return _page(_seek_flights(query, after, skip, limit), models.Flight, skip, limit, with_state)
+
+def _filter_window(query, start: datetime | None, end: datetime | None):
+    if start is not None:
+        query = query.filter(models.Flight.start_time >= start)
+    if end is not None:
+        query = query.filter(models.Flight.start_time < end)
+    return query
+
+def _filter_start_window(query, start: datetime | None, end: datetime | None):
+    """Restrict a flight query to flights starting in [start, end), in (start_time, id) order."""
+    return _filter_window(query, start, end).order_by(*FLIGHT_SORT_KEY)
+
+def _filter_scope(query, student_id: int | None, instructor_id: int | None, aircraft_id: int | None):
+    if aircraft_id is not None:
+        query = query.filter(models.Flight.aircraft_id == aircraft_id)
+    if instructor_id is not None:
+        query = query.filter(models.Flight.instructor_id == instructor_id)
+    if student_id is not None:
+        query = query.filter(models.Flight.student_id == student_id)
+    return query
+
+def get_flights_in_range(
+    db: Session,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    student_id: int | None = None,
+    instructor_id: int | None = None,
+    aircraft_id: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: tuple[datetime | None, int] | None = None,
+    fields: tuple[str, ...] | None = None,
+    with_state: bool = False,
+) -> list[models.Flight]:
+    """Flights starting in [start, end), optionally scoped to one student, instructor or aircraft.
+
+    Each scope matches one of the (<fk>, start_time) composite indexes on flights, so the
+    date window is resolved as an index range scan rather than a table scan.
+    """
+    def criteria(query):
+        return _filter_window(_filter_scope(query, student_id, instructor_id, aircraft_id), start, end)
+
+    query = criteria(_project(db.query(models.Flight), models.Flight, fields, FLIGHT_SORT_FIELDS))
+    return _page(_seek_flights(query, after, skip, limit, criteria), models.Flight, skip, limit, with_state)
+
+def iter_flight_rows(
+    db: Session,
+    columns: list,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    student_id: int | None = None,
+    instructor_id: int | None = None,
+    aircraft_id: int | None = None,
+    status: models.FlightStatus | None = None,
+    batch_size: int = 1000,
+):
+    """Column tuples for flights starting in [start, end), read through a server-side cursor.
+
+    Rows come back in (start_time, id) order and only `batch_size` of them are
+    held in memory at a time.
+    """
+    query = _filter_scope(db.query(*columns), student_id, instructor_id, aircraft_id)
+    if status is not None:
+        query = query.filter(models.Flight.status == status)
+    return _filter_start_window(query, start, end).yield_per(batch_size)
+
+def get_scheduled_flights(
+    db: Session,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[models.Flight]:
+    """Scheduled flights starting in [start, end), served by the partial scheduled-flights index."""
+    query = db.query(models.Flight).filter(models.Flight.status == models.FlightStatus.scheduled)
+    return _filter_start_window(query, start, end).offset(skip).limit(limit).all()
 
 def create_flight(db: Session, flight: schemas.FlightCreate) -> models.Flight:
     flight_data = flight.model_dump()
@@ -148,28 +448,99 @@ def create_flight(db: Session, flight: schemas.FlightCreate) -> models.Flight:
         flight_data["start_time"] = parse_datetime(flight_data["start_time"])
     if "end_time" in flight_data:
         flight_data["end_time"] = parse_datetime(flight_data["end_time"])
-    db_flight = models.Flight(**flight_data)
-    db.add(db_flight)
-    db.commit()
-    db.refresh(db_flight)
-    return db_flight
+    return _write_flight(db, insert(models.Flight).values(**flight_data).returning(models.Flight), "created")
 
 def update_flight(db: Session, flight_id: int, flight: schemas.FlightUpdate) -> models.Flight | None:
-    db_flight = get_flight(db, flight_id)
-    if db_flight is None:
-        return None
-    
-    for key, value in flight.dict(exclude_unset=True).items():
-        setattr(db_flight, key, value)
-    
-    db.commit()
-    db.refresh(db_flight)
-    return db_flight
+    flight_data = flight.model_dump(exclude_unset=True)
+    if not flight_data:
+        return get_flight(db, flight_id)
+    # The pre-update assignment comes back from the same statement, for the schedule feed
+    previous = (
+        select(models.Flight.id, models.Flight.aircraft_id, models.Flight.instructor_id)
+        .where(models.Flight.id == flight_id)
+        .with_for_update()
+        .subquery("previous")
+    )
+    statement = (
+        update(models.Flight)
+        .where(models.Flight.id == previous.c.id)
+        .values(**flight_data)
+        .returning(models.Flight, previous.c.aircraft_id, previous.c.instructor_id)
+    )
+    cancelled = flight_data.get("status") == models.FlightStatus.cancelled
+    return _write_flight(db, statement, "cancelled" if cancelled else "updated")
 
 def delete_flight(db: Session, flight_id: int) -> models.Flight | None:
     db_flight = get_flight(db, flight_id)
     if db_flight is None:
         return None
     db.delete(db_flight)
+    schedule_feed.emit(db, "deleted", db_flight)
+    _mark_aircraft_usage(db, db_flight)
     db.commit()
-    return db_flight 
\ No newline at end of file
+    return db_flight
+
+# Logbook rollups (kept by the maintain_logbook_totals trigger)
+def get_logbook_totals(db: Session, student_id: int) -> list[models.LogbookTotal]:
+    return (
+        db.query(models.LogbookTotal)
+        .filter(models.LogbookTotal.student_id == student_id)
+        .order_by(models.LogbookTotal.month)
+        .all()
+    )
+
+# Aircraft utilization (aircraft_daily_usage is kept by the maintain_aircraft_usage trigger)
+def get_fleet(db: Session, aircraft_ids: list[int] | None = None) -> list[tuple[int, str | None]]:
+    """(id, registration) of the given aircraft, or of every active one."""
+    query = db.query(models.Aircraft.id, models.Aircraft.registration)
+    if aircraft_ids:
+        query = query.filter(models.Aircraft.id.in_(aircraft_ids))
+    else:
+        query = query.filter(models.Aircraft.is_active.isnot(False))
+    return [tuple(row) for row in query.order_by(models.Aircraft.id).all()]
+
+def get_aircraft_daily_usage(
+    db: Session, start: date, end: date, aircraft_ids: list[int] | None = None
+) -> list[models.AircraftDailyUsage]:
+    """Rollup rows for days in [start, end), by day then aircraft."""
+    query = db.query(models.AircraftDailyUsage).filter(
+        models.AircraftDailyUsage.day >= start, models.AircraftDailyUsage.day < end
+    )
+    if aircraft_ids:
+        query = query.filter(models.AircraftDailyUsage.aircraft_id.in_(aircraft_ids))
+    return query.order_by(models.AircraftDailyUsage.day, models.AircraftDailyUsage.aircraft_id).all()
+
+# Maintenance forecasts (app/maintenance.py)
+def get_maintenance_state(db: Session, aircraft_ids: list[int] | None = None) -> list:
+    """Hours and inspection dates of the given aircraft, or of every active one."""
+    query = db.query(
+        models.Aircraft.id,
+        models.Aircraft.registration,
+        models.Aircraft.total_time,
+        models.Aircraft.last_maintenance,
+        models.Aircraft.last_maintenance_time,
+        models.Aircraft.next_maintenance,
+    ).filter(models.Aircraft.is_active.isnot(False))
+    if aircraft_ids is not None:
+        query = query.filter(models.Aircraft.id.in_(aircraft_ids))
+    return query.order_by(models.Aircraft.id).all()
+
+def get_upcoming_bookings(db: Session, start: datetime, end: datetime, aircraft_ids: list[int] | None = None) -> list:
+    """Scheduled and in-progress flights still running at `start` and starting before `end`, by aircraft then start."""
+    query = db.query(
+        models.Flight.aircraft_id,
+        models.Flight.id,
+        models.Flight.start_time,
+        models.Flight.end_time,
+        models.Flight.duration,
+    ).filter(
+        models.Flight.start_time >= start - availability.MAX_FLIGHT_LENGTH,
+        models.Flight.start_time < end,
+        models.Flight.end_time > start,
+        models.Flight.status.in_((models.FlightStatus.scheduled, models.FlightStatus.in_progress)),
+    )
+    if aircraft_ids is not None:
+        query = query.filter(models.Flight.aircraft_id.in_(aircraft_ids))
+    else:
+        query = query.filter(models.Flight.aircraft_id.isnot(None))
+    return query.order_by(models.Flight.aircraft_id, models.Flight.start_time).all()
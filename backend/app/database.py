@@ -1,8 +1,13 @@
+from functools import lru_cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from .config import SQLALCHEMY_DATABASE_URL
+from .config import SQLALCHEMY_DATABASE_URL, settings
+from .pool import InstrumentedAsyncPool, InstrumentedQueuePool, pool_options
 
 # Import all models to ensure they are registered with Base
 from .models import User, Aircraft, Instructor, Flight
@@ -10,12 +15,13 @@ from .models import User, Aircraft, Instructor, Flight
 # Create SQLAlchemy engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args={'options': '-c timezone=utc'}
+    connect_args={'options': '-c timezone=utc'},
+    **pool_options(InstrumentedQueuePool)
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit so write paths can return RETURNING rows without a refresh
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Dependency to get DB session
 def get_db():
@@ -23,4 +29,44 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency for streaming routes, which close the session themselves: FastAPI
+# tears dependencies down before a StreamingResponse body is sent
+def get_stream_db():
+    return SessionLocal()
+
+# Async engine (asyncpg), created on first use so the sync-only deployment
+# does not need asyncpg installed
+def async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+@lru_cache
+def get_async_engine():
+    return create_async_engine(
+        async_database_url(),
+        connect_args={'server_settings': {'timezone': 'utc'}},
+        **pool_options(InstrumentedAsyncPool)
+    )
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False)
+
+async def dispose_async_engine() -> None:
+    # asyncpg connections belong to the event loop that opened them
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+def pool_stats() -> dict:
+    stats = {"sync": engine.pool.stats()}
+    if get_async_engine.cache_info().currsize:
+        stats["async"] = get_async_engine().pool.stats()
+    return stats
@@ -0,0 +1,206 @@
+"""
+Read-through cache for users, aircraft and instructors looked up by id.
+
+These reference rows change a few times a day but are read on most requests.
+``crud``/``async_crud`` look them up here before querying. The cache keeps a
+detached column snapshot of each row in a bounded LRU with a TTL. On a hit
+the snapshot is merged into the caller's session with ``load=False``, which
+returns an ordinary persistent instance without querying. Each session gets
+its own copy, so a route may modify it and commit as usual.
+
+Invalidation:
+
+* this process evicts rows it changed as soon as its session commits;
+* other workers hear about a change through the ``notify_entity_cache``
+  triggers (see ``models.ENTITY_CACHE_CHANNEL``). A ``pg_listener`` thread
+  per worker LISTENs on the channel and evicts the row. If that connection
+  drops, notifications may have been missed, so the whole cache is cleared;
+* the TTL bounds staleness if a notification is lost anyway.
+
+A load that races with an invalidation is not stored: every eviction bumps
+a generation counter, and ``put`` drops snapshots read before the last one.
+Set ``ENTITY_CACHE_ENABLED=false`` to bypass the cache entirely.
+"""
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from . import models, pg_listener
+from .config import settings
+
+CACHED_MODELS = {model.__tablename__: model for model in (models.User, models.Aircraft, models.Instructor)}
+
+class EntityCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                # Invalidated while it was being loaded
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: tuple) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.pop(key, None)
+
+    def invalidate_table(self, table: str) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for key in [key for key in self._entries if key[0] == table]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+cache = EntityCache(settings.ENTITY_CACHE_MAX_ENTRIES, settings.ENTITY_CACHE_TTL_SECONDS)
+
+def _snapshot(row):
+    """A detached copy of `row`'s column values that no session owns."""
+    mapper = inspect(row).mapper
+    copy = mapper.class_(**{attr.key: getattr(row, attr.key) for attr in mapper.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+def generation() -> int:
+    return cache.generation
+
+def get(db: Session, model, id: int):
+    """The cached row merged into `db`, or None on a miss (or when the cache is off)."""
+    if not settings.ENTITY_CACHE_ENABLED:
+        return None
+    # A row this session already holds (possibly with pending changes) wins over the snapshot
+    existing = db.identity_map.get(inspect(model).identity_key_from_primary_key((id,)))
+    if existing is not None:
+        return existing
+    snapshot = cache.get((model.__tablename__, id))
+    if snapshot is None:
+        return None
+    return db.merge(snapshot, load=False)
+
+def put(db: Session, row, generation: int) -> None:
+    """Store a row `db` loaded after `generation()` returned `generation`."""
+    if not settings.ENTITY_CACHE_ENABLED or row is None:
+        return
+    if db.info.get("entity_cache_changed"):
+        # The session has uncommitted writes to cached tables, which it may yet roll back
+        return
+    cache.put((row.__tablename__, row.id), _snapshot(row), generation)
+
+# Local invalidation: evict what this process changed as soon as it commits
+@event.listens_for(Session, "after_flush")
+def _collect_changed(session, flush_context):
+    changed = session.info.setdefault("entity_cache_changed", set())
+    for obj in chain(session.dirty, session.deleted):
+        if obj.__tablename__ in CACHED_MODELS:
+            changed.add((obj.__tablename__, obj.id))
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_changed_tables(orm_execute_state):
+    # ORM-enabled UPDATE/DELETE statements (the bulk endpoints) bypass the flush
+    mapper = orm_execute_state.bind_mapper
+    changes_rows = orm_execute_state.is_update or orm_execute_state.is_delete
+    if changes_rows and mapper is not None and mapper.class_.__tablename__ in CACHED_MODELS:
+        orm_execute_state.session.info.setdefault("entity_cache_changed", set()).add((mapper.class_.__tablename__,))
+
+def mark_changed(db: Session, table: str, id: Optional[int] = None) -> None:
+    """Treat a row (with no id, every row of `table`) as changed by `db` behind the ORM's back, e.g. by a trigger.
+
+    The session's own copies are expired now and the cached ones evicted once it commits.
+    """
+    model = CACHED_MODELS[table]
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, model) and (id is None or inspect(obj).identity == (id,)):
+            db.expire(obj)
+    db.info.setdefault("entity_cache_changed", set()).add((table,) if id is None else (table, id))
+
+@event.listens_for(Session, "after_commit")
+def _evict_on_commit(session):
+    for key in session.info.pop("entity_cache_changed", ()):
+        if len(key) == 1:
+            cache.invalidate_table(key[0])
+        else:
+            cache.invalidate(key)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changes(session, previous_transaction):
+    session.info.pop("entity_cache_changed", None)
+
+# Cross-worker invalidation
+def _on_notify(payload: str) -> None:
+    table, _, id = payload.partition(":")
+    if table in CACHED_MODELS and id.isdigit():
+        cache.invalidate((table, int(id)))
+
+class _Listener(pg_listener.Listener):
+    def __init__(self, engine):
+        # Missed notifications could leave stale rows behind, so a reset clears the cache
+        super().__init__(engine, models.ENTITY_CACHE_CHANNEL, _on_notify, cache.clear, name="entity-cache-listener")
+
+_listener: Optional[_Listener] = None
+
+def start_listener(engine) -> _Listener:
+    global _listener
+    if _listener is None:
+        _listener = _Listener(engine)
+        _listener.start()
+    return _listener
+
+def stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=2)
+        _listener = None
@@ -0,0 +1,58 @@
+"""
+Streaming flight exports (``GET /api/v1/flights/export``).
+
+Rows are read through a server-side cursor (``crud.iter_flight_rows``) and
+encoded one batch at a time, so memory stays flat however many years of
+history are exported. The first chunk goes out as soon as the first batch is
+fetched. For CSV that chunk is the header line, sent before any row is read.
+"""
+import csv
+import enum
+import io
+from datetime import datetime
+from itertools import islice
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from . import crud, models, serializers
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+FIELDS = serializers.flight.fields
+COLUMNS = [getattr(models.Flight, field) for field in FIELDS]
+
+def _batches(rows, size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+def _csv_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _ndjson(rows, batch_size: int) -> Iterator[bytes]:
+    for batch in _batches(rows, batch_size):
+        yield b"".join(serializers.dumps(dict(zip(FIELDS, row))) + b"\n" for row in batch)
+
+def _csv(rows, batch_size: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    yield buffer.getvalue().encode()
+    for batch in _batches(rows, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+
+def stream_flights(db: Session, format: str, batch_size: int, **filters) -> Iterator[bytes]:
+    """Encoded export chunks; closes `db` when the stream finishes or the client goes away."""
+    try:
+        rows = crud.iter_flight_rows(db, COLUMNS, batch_size=batch_size, **filters)
+        encode = _csv if format == "csv" else _ndjson
+        yield from encode(rows, batch_size)
+    finally:
+        db.close()
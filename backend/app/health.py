@@ -0,0 +1,156 @@
+"""
+Readiness probe for load balancers.
+
+One probe opens a connection, runs ``SELECT 1`` and reads the Alembic
+revision. It also compares pool usage with the pool's capacity. The probe
+connects outside the pool, with libpq's ``connect_timeout`` and a
+``statement_timeout`` set at connect time, so it finishes within about
+``HEALTH_PROBE_TIMEOUT_SECONDS`` even when the database hangs.
+
+Probes run one at a time on their own thread. The report, failures
+included, is cached for ``HEALTH_CACHE_TTL_SECONDS``. Callers that arrive
+while a probe is running share it rather than starting another, and
+``check`` waits for it without holding a thread. If it does not finish in
+time, the timeout is cached as the report until the probe completes. So
+frequent health checks from several balancers add at most one query per TTL
+per worker, and a hung database cannot pile them up.
+"""
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+
+from .config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_lock = threading.Lock()
+_cached: Optional[tuple[float, dict]] = None
+_running: Optional[Future] = None
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-probe")
+
+@lru_cache
+def migration_heads() -> tuple[str, ...]:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return tuple(sorted(ScriptDirectory.from_config(config).get_heads()))
+
+def _pool_saturation(engine) -> dict:
+    pool = engine.pool
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    in_use = pool.checkedout()
+    return {"in_use": in_use, "capacity": capacity, "saturation": round(in_use / capacity, 3) if capacity else 0.0}
+
+@lru_cache
+def probe_engine(engine, timeout: float):
+    """A pool-less engine on `engine`'s database whose connects and statements give up after `timeout` seconds."""
+    return create_engine(engine.url, poolclass=NullPool, connect_args={
+        # libpq takes whole seconds
+        "connect_timeout": max(math.ceil(timeout), 1),
+        "options": f"-c statement_timeout={int(timeout * 1000)}",
+    })
+
+def _probe_database(engine) -> dict:
+    try:
+        with probe_engine(engine, settings.HEALTH_PROBE_TIMEOUT_SECONDS).connect() as connection:
+            began = time.perf_counter()
+            connection.execute(text("SELECT 1"))
+            latency_ms = (time.perf_counter() - began) * 1000
+            try:
+                with connection.begin_nested():
+                    current = connection.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+            except SQLAlchemyError:
+                # Schema created without Alembic (e.g. metadata.create_all in tests)
+                current = []
+    except SQLAlchemyError as error:
+        return {"ok": False, "error": str(getattr(error, "orig", error)).strip() or type(error).__name__}
+    heads = list(migration_heads())
+    return {
+        "ok": True,
+        "latency_ms": round(latency_ms, 2),
+        "migrations": {"current": sorted(current), "head": heads, "up_to_date": sorted(current) == heads},
+    }
+
+def _evaluate(engine) -> dict:
+    pool = _pool_saturation(engine)
+    if pool["saturation"] >= settings.HEALTH_POOL_SATURATION_THRESHOLD:
+        # Waiting for a connection here would only add to the pile-up
+        database = {"ok": False, "error": "Connection pool exhausted"}
+    else:
+        database = _probe_database(engine)
+
+    reasons = []
+    if not database["ok"]:
+        reasons.append(database["error"])
+    elif database["latency_ms"] > settings.HEALTH_DB_LATENCY_THRESHOLD_MS:
+        reasons.append(f"Database latency {database['latency_ms']}ms over {settings.HEALTH_DB_LATENCY_THRESHOLD_MS}ms")
+    elif settings.HEALTH_REQUIRE_MIGRATIONS and not database["migrations"]["up_to_date"]:
+        reasons.append("Database schema is not at the migration head")
+    return {"status": "unavailable" if reasons else "ready", "reasons": reasons, "database": database, "pool": pool}
+
+def _fresh() -> Optional[dict]:
+    if _cached is not None and time.monotonic() - _cached[0] < settings.HEALTH_CACHE_TTL_SECONDS:
+        return _cached[1]
+    return None
+
+def _store(report: dict) -> None:
+    global _cached
+    _cached = (time.monotonic(), report)
+
+def _run(engine) -> dict:
+    global _running
+    try:
+        report = _evaluate(engine)
+    except Exception as error:
+        report = {"status": "unavailable", "reasons": [str(error) or type(error).__name__]}
+    with _lock:
+        _store(report)
+        _running = None
+    return report
+
+def _refresh(engine) -> Future:
+    """The cached report, or the running probe (started if there is none)."""
+    global _running
+    with _lock:
+        report = _fresh()
+        if report is not None:
+            done = Future()
+            done.set_result(report)
+            return done
+        if _running is None:
+            _running = _executor.submit(_run, engine)
+        return _running
+
+def readiness(engine) -> dict:
+    """The cached readiness report, waiting for a probe when it is stale."""
+    return _refresh(engine).result()
+
+async def check(engine) -> dict:
+    """Like `readiness`, but a probe still running after HEALTH_PROBE_TIMEOUT_SECONDS reports a timeout."""
+    try:
+        # shield: a caller timing out must not cancel the probe the others share
+        return await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(_refresh(engine))), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        report = {"status": "unavailable", "reasons": ["Database probe timed out"]}
+        with _lock:
+            # Until the probe finishes, later callers get this instead of waiting again
+            if _fresh() is None:
+                _store(report)
+        return report
+
+def reset_cache() -> None:
+    global _cached
+    with _lock:
+        _cached = None
@@ -0,0 +1,79 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304) for the read routes.
+
+Validators are built from ``updated_at`` instead of from the response body:
+
+* a collection's ETag is derived from the table's ``max(updated_at)`` and
+  the id of the latest row deleted from it (the ``deletions`` log). Both are
+  read off the end of an index, so the cost does not grow with the table.
+  They cover the whole table, not the filtered set: any change to a table
+  revalidates every listing of it;
+* a single resource's ETag is derived from its own ``updated_at``.
+
+Both also cover the path and query string, so each page or fieldset has its
+own tag. A conditional request is checked with that one small query before
+any rows are loaded, and answered with 304 when the client's copy is
+current. Otherwise the list routes read the collection state in the page's
+own statement (``with_state``), and the detail routes take it from the row.
+The ETags are weak: they identify the data, not the exact bytes.
+``Last-Modified`` cannot see deletions, so when a client sends
+``If-None-Match`` it takes precedence over ``If-Modified-Since`` (RFC 9110).
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+
+from .config import settings
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+def _etag(request: Request, *parts) -> str:
+    key = "|".join(map(str, (request.url.path, request.url.query, *parts)))
+    return f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+
+def for_collection(request: Request, updated_at: Optional[datetime], last_deletion: Optional[int]) -> Validators:
+    return Validators(_etag(request, updated_at and updated_at.isoformat(), last_deletion), updated_at)
+
+def for_resource(request: Request, updated_at: Optional[datetime]) -> Validators:
+    return Validators(_etag(request, updated_at and updated_at.isoformat()), updated_at)
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def _opaque(tag: str) -> str:
+    # Weak comparison: W/"x" and "x" match
+    return tag.strip().removeprefix("W/")
+
+def not_modified(request: Request, validators: Validators) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {_opaque(tag) for tag in if_none_match.split(",")}
+        return "*" in tags or _opaque(validators.etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision; updated_at is naive UTC
+    return validators.last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+
+def cache_control(request: Request) -> str:
+    route = request.scope.get("route")
+    template = getattr(route, "path_format", request.url.path)
+    return settings.CACHE_CONTROL_ROUTES.get(template, settings.CACHE_CONTROL_DEFAULT)
+
+def headers(request: Request, validators: Validators) -> dict:
+    values = {"ETag": validators.etag, "Cache-Control": cache_control(request)}
+    if validators.last_modified is not None:
+        values["Last-Modified"] = format_datetime(validators.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return values
@@ -0,0 +1,47 @@
+"""
+Student logbook totals (``GET /api/v1/users/{id}/logbook``).
+
+Hours come from ``logbook_totals``: one row per student, month and flight
+type, which the ``maintain_logbook_totals`` triggers on ``flights`` keep
+current as flights complete (and as completed flights are edited or
+deleted). A logbook is therefore one indexed read of at most a row per
+type per month of training, however many flights the student has flown.
+Months are those of the flights' start times (UTC). Flights without a
+type count towards the totals but not ``by_type``.
+"""
+from decimal import Decimal
+from typing import Literal
+
+from . import models
+
+Period = Literal["month", "year"]
+PERIOD_FORMATS = {"month": "%Y-%m", "year": "%Y"}
+
+def _group() -> dict:
+    return {"total": [Decimal(0), 0], "by_type": {}}
+
+def _add(group: dict, row: models.LogbookTotal) -> None:
+    buckets = [group["total"]]
+    if row.flight_type is not None:
+        buckets.append(group["by_type"].setdefault(row.flight_type.value, [Decimal(0), 0]))
+    for bucket in buckets:
+        bucket[0] += row.hours
+        bucket[1] += row.flights
+
+def _render(group: dict) -> dict:
+    def hours(bucket: list) -> dict:
+        return {"hours": float(bucket[0]), "flights": bucket[1]}
+    return {"total": hours(group["total"]), "by_type": {name: hours(b) for name, b in group["by_type"].items()}}
+
+def summarize(student_id: int, rows: list[models.LogbookTotal], period: Period = "month") -> dict:
+    """Totals overall, by flight type and by period from a student's rollup rows (oldest month first)."""
+    overall, periods = _group(), {}
+    for row in rows:
+        label = row.month.strftime(PERIOD_FORMATS[period])
+        _add(overall, row)
+        _add(periods.setdefault(label, _group()), row)
+    return {
+        "student_id": student_id,
+        **_render(overall),
+        "periods": [{"period": label, **_render(group)} for label, group in periods.items()],
+    }
@@ -1,10 +1,20 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
+from . import security
 
-from .api import router
+from .api import router, legacy_router, async_router, NEXT_CURSOR_HEADER
+from .database import dispose_async_engine, engine, get_async_engine, pool_stats
+from .pool import warm_async_pool, warm_pool
+from .query_stats import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, QueryStatsMiddleware
+from . import entity_cache, health, metrics, schedule_feed, serializers
 
-app = FastAPI(title="Flight School API")
+app = FastAPI(
+    title="Flight School API",
+    default_response_class=serializers.FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse,
+)
 
 origins = settings.CORS_ORIGINS.split(",")
 
@@ -14,10 +24,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER, QUERY_TIME_HEADER, "ETag"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+def include_routers(app: FastAPI, async_reads: bool) -> None:
+    if async_reads:
+        # Mounted first so its GET routes shadow the threadpool versions in `router`
+        app.include_router(async_router)
+    app.include_router(router)
+    app.include_router(legacy_router)
+
+include_routers(app, settings.ASYNC_READ_ROUTES)
+
+@app.on_event("startup")
+async def warm_connection_pools():
+    await run_in_threadpool(warm_pool, engine, settings.DB_POOL_WARMUP_CONNECTIONS)
+    if settings.ASYNC_READ_ROUTES:
+        await warm_async_pool(get_async_engine(), settings.DB_POOL_WARMUP_CONNECTIONS)
+
+@app.on_event("startup")
+def start_entity_cache_listener():
+    if settings.ENTITY_CACHE_ENABLED:
+        entity_cache.start_listener(engine)
+
+@app.on_event("shutdown")
+def stop_entity_cache_listener():
+    entity_cache.stop_listener()
 
-app.include_router(router)
+@app.on_event("startup")
+def start_schedule_feed_bridge():
+    if settings.SCHEDULE_STREAM_BRIDGE:
+        schedule_feed.start_bridge(engine)
+
+@app.on_event("shutdown")
+def stop_schedule_feed_bridge():
+    schedule_feed.stop_bridge()
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    security.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_async_engine():
+    await dispose_async_engine()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": "1.0.0"} 
\ No newline at end of file
+    return {"status": "healthy", "version": "1.0.0"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    report = await health.check(engine)
+    code = status.HTTP_200_OK if report["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(report, status_code=code)
+
+@app.get("/health/pool")
+async def pool_health():
+    return pool_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    # On the event loop, like the middleware: render() iterates the dicts it adds routes to
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
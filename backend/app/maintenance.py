@@ -0,0 +1,208 @@
+"""
+Maintenance forecasts (``GET /api/v1/reports/maintenance``).
+
+Each aircraft has two inspection limits:
+
+* the 100-hour inspection, due ``MAINTENANCE_INTERVAL_HOURS`` after
+  ``last_maintenance_time`` (its total_time at the last inspection). The
+  flights triggers roll every completed flight into ``total_time`` (see
+  ``models.maintain_aircraft_usage``), so the hours left are the interval
+  less ``total_time - last_maintenance_time``;
+* the annual inspection, due at ``next_maintenance``, or else
+  ``MAINTENANCE_ANNUAL_DAYS`` after ``last_maintenance``.
+
+A forecast walks the aircraft's upcoming bookings (scheduled or in progress,
+up to ``MAINTENANCE_FORECAST_DAYS`` ahead) in start order, adding up their
+durations. The aircraft is due at the earlier of the annual date and the
+point during a booking at which the booked hours use up what is left.
+Every booking that would fly past either limit is flagged.
+
+Forecasts are kept per aircraft by the process-wide ``forecaster`` and
+recomputed incrementally. A committed flight change reaches it through the
+schedule feed's broker, and an aircraft edit through the session hooks
+below. Either marks only the aircraft it touched. The next read reloads and
+re-forecasts just those (two indexed queries) and reuses the rest of the
+fleet's forecasts. A bulk flight write (a feed ``resync``) or an expired
+TTL rebuilds everything. The TTL also picks up other workers' writes when
+the schedule feed bridge is off.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import chain, groupby
+from operator import itemgetter
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import crud, models, schedule_feed
+from .config import settings
+
+def _hours(value: Optional[float]) -> Optional[Decimal]:
+    # Exact sums, so a booking that ends right on the limit is not flagged by float residue
+    return None if value is None else Decimal(repr(value))
+
+def calendar_due(aircraft, annual_days: int) -> Optional[datetime]:
+    if aircraft.next_maintenance is not None:
+        return aircraft.next_maintenance
+    if aircraft.last_maintenance is not None:
+        return aircraft.last_maintenance + timedelta(days=annual_days)
+    return None
+
+def forecast(aircraft, bookings: Iterable, now: datetime, interval_hours: float, annual_days: int) -> dict:
+    """Project `aircraft` (a crud.get_maintenance_state row) forward through its `bookings`, in start order."""
+    total_time, last_time = _hours(aircraft.total_time), _hours(aircraft.last_maintenance_time)
+    since = total_time - last_time if total_time is not None and last_time is not None else None
+    remaining = _hours(interval_hours) - since if since is not None else None
+    calendar = calendar_due(aircraft, annual_days)
+
+    hours_due_at = now if remaining is not None and remaining <= 0 else None
+    booked, flagged = Decimal(0), []
+    for booking in bookings:
+        duration = _hours(booking.duration) or Decimal(0)
+        limits, over = [], None
+        if remaining is not None and booked + duration > remaining:
+            limits.append("hours")
+            over = float(booked + duration - remaining)
+            if hours_due_at is None:
+                hours_due_at = booking.start_time + timedelta(hours=float(remaining - booked))
+        if calendar is not None and booking.end_time > calendar:
+            limits.append("calendar")
+        if limits:
+            flagged.append({
+                "flight_id": booking.id,
+                "start_time": booking.start_time,
+                "end_time": booking.end_time,
+                "limits": limits,
+                "hours_over": over,
+            })
+        booked += duration
+
+    due = min(
+        ((hours_due_at, "hours"), (calendar, "calendar")),
+        key=lambda due: due[0] or datetime.max,
+    )
+    return {
+        "aircraft_id": aircraft.id,
+        "registration": aircraft.registration,
+        "total_time": aircraft.total_time,
+        "hours_since_maintenance": float(since) if since is not None else None,
+        "hours_remaining": float(remaining) if remaining is not None else None,
+        "scheduled_hours": float(booked),
+        "calendar_due": calendar,
+        "due_at": due[0],
+        "due_reason": due[1] if due[0] is not None else None,
+        "flagged_flights": flagged,
+    }
+
+class Forecaster:
+    """Forecasts for the active fleet, recomputed only for aircraft marked stale since the last read."""
+
+    def __init__(self):
+        self._forecasts: dict[int, dict] = {}
+        self._built_at: Optional[float] = None
+        # Held while (re)forecasting, so concurrent reads share one reload
+        self._lock = threading.Lock()
+        # Guards the marks only: changes are marked without waiting for a reload
+        self._marks_lock = threading.Lock()
+        self._stale: set[int] = set()
+        self._stale_all = True
+
+    def mark_stale(self, aircraft_ids: Optional[Iterable[int]] = None) -> None:
+        """Re-forecast these aircraft (all of them with None) on the next read."""
+        with self._marks_lock:
+            if aircraft_ids is None:
+                self._stale_all = True
+            else:
+                self._stale.update(aircraft_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._forecasts = {}
+            self.mark_stale()
+
+    def _take_marks(self) -> Optional[set[int]]:
+        """The aircraft marked stale since the last call, or None when the whole fleet is."""
+        with self._marks_lock:
+            expired = (
+                self._built_at is None
+                or time.monotonic() - self._built_at >= settings.MAINTENANCE_FORECAST_TTL_SECONDS
+            )
+            stale = None if self._stale_all or expired else self._stale
+            self._stale, self._stale_all = set(), False
+            return stale
+
+    def _forecast(self, db: Session, aircraft_ids: Optional[list[int]]) -> dict[int, dict]:
+        now = datetime.utcnow()
+        bookings = crud.get_upcoming_bookings(
+            db, now, now + timedelta(days=settings.MAINTENANCE_FORECAST_DAYS), aircraft_ids
+        )
+        by_aircraft = {id: list(rows) for id, rows in groupby(bookings, key=itemgetter(0))}
+        return {
+            aircraft.id: forecast(
+                aircraft,
+                by_aircraft.get(aircraft.id, ()),
+                now,
+                settings.MAINTENANCE_INTERVAL_HOURS,
+                settings.MAINTENANCE_ANNUAL_DAYS,
+            )
+            for aircraft in crud.get_maintenance_state(db, aircraft_ids)
+        }
+
+    def forecasts(self, db: Session) -> list[dict]:
+        """Every active aircraft's forecast, by aircraft id."""
+        with self._lock:
+            # Marks are taken before querying, so a change committed meanwhile is marked again for the next read
+            stale = self._take_marks()
+            if stale is None:
+                self._forecasts = self._forecast(db, None)
+                self._built_at = time.monotonic()
+            elif stale:
+                ids = sorted(stale)
+                fresh = self._forecast(db, ids)
+                for id in ids:
+                    # Gone when the aircraft was deleted or deactivated
+                    self._forecasts.pop(id, None)
+                forecasts = {**self._forecasts, **fresh}
+                self._forecasts = {id: forecasts[id] for id in sorted(forecasts)}
+            return list(self._forecasts.values())
+
+forecaster = Forecaster()
+
+def _on_schedule_event(event: dict) -> None:
+    flight = event.get("flight")
+    if flight is None:
+        # resync (a bulk write, or a bridge reconnect that may have missed events)
+        forecaster.mark_stale()
+        return
+    previous = event.get("previous", {}).get("aircraft_id")
+    forecaster.mark_stale({flight["aircraft_id"], previous} - {None})
+
+schedule_feed.broker.observe(_on_schedule_event)
+
+# Aircraft added or edited (a recorded inspection, a deactivation) by this process
+@event.listens_for(Session, "after_flush")
+def _collect_changed_aircraft(session, flush_context):
+    changed = {obj.id for obj in chain(session.new, session.dirty, session.deleted) if isinstance(obj, models.Aircraft)}
+    stale = session.info.get("maintenance_stale", set())
+    if changed and stale is not None:
+        # None already stands for every aircraft
+        session.info["maintenance_stale"] = stale | changed
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_changed_aircraft_table(orm_execute_state):
+    # ORM-enabled INSERT/UPDATE/DELETE statements (the bulk endpoints) bypass the flush
+    mapper = orm_execute_state.bind_mapper
+    if not orm_execute_state.is_select and mapper is not None and mapper.class_ is models.Aircraft:
+        orm_execute_state.session.info["maintenance_stale"] = None
+
+@event.listens_for(Session, "after_commit")
+def _mark_stale_on_commit(session):
+    if "maintenance_stale" in session.info:
+        forecaster.mark_stale(session.info.pop("maintenance_stale"))
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changes(session, previous_transaction):
+    session.info.pop("maintenance_stale", None)
@@ -0,0 +1,185 @@
+"""
+Request metrics in the Prometheus text format, served at ``/metrics``.
+
+``MetricsMiddleware`` records every HTTP request under its route template
+(``/api/v1/flights/{flight_id}``, not the raw path), so the label set stays
+bounded. ASGI middleware runs on the event loop thread only, so the counters
+are plain ints and lists mutated without locks. ``render`` must run there
+too (``/metrics`` is an ``async def`` route), or a request recorded under a
+new route mid-render would change the dicts it iterates. Recording a request
+costs a few dict lookups and a bisect.
+
+The process gauges (RSS, GC) and the connection pool figures are read when
+``/metrics`` is scraped, not kept up to date per request. The numbers are
+per worker process; Prometheus aggregates across workers.
+"""
+import gc
+import os
+import resource
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from . import entity_cache, schedule_feed
+from .database import pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+UNMATCHED_ROUTE = "unmatched"
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str):
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+class HttpMetrics:
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.latency: dict[tuple, Histogram] = {}
+        self.sizes: dict[tuple, Histogram] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        key = (method, route)
+        self.requests[(method, route, status)] += 1
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.sizes[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.sizes[key].observe(size)
+
+http_metrics = HttpMetrics()
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: HttpMetrics = http_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        began = time.perf_counter()
+        status, size = 500, 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or UNMATCHED_ROUTE
+            metrics.observe(scope["method"], template, status, time.perf_counter() - began, size)
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def render(metrics: HttpMetrics = http_metrics) -> str:
+    lines = [
+        "# HELP http_requests_total HTTP requests by route template and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(metrics.requests.items()):
+        lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in sorted(metrics.latency.items()):
+        lines.extend(histogram.samples("http_request_duration_seconds", _labels(method=method, route=route)))
+
+    lines += [
+        "# HELP http_response_size_bytes Response body size by route template.",
+        "# TYPE http_response_size_bytes histogram",
+    ]
+    for (method, route), histogram in sorted(metrics.sizes.items()):
+        lines.extend(histogram.samples("http_response_size_bytes", _labels(method=method, route=route)))
+
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {metrics.in_flight}",
+    ]
+
+    pool_gauges = ("size", "checked_out", "checked_in", "overflow")
+    pool_counters = ("checkouts", "checkout_wait_seconds_total", "overflow_events", "timeouts")
+    pools = pool_stats()
+    for field in pool_gauges:
+        lines.append(f"# TYPE db_pool_{field} gauge")
+        lines.extend(f'db_pool_{field}{{engine="{name}"}} {stats[field]}' for name, stats in pools.items())
+    for field in pool_counters:
+        name_total = f"db_pool_{field}" if field.endswith("_total") else f"db_pool_{field}_total"
+        lines.append(f"# TYPE {name_total} counter")
+        lines.extend(f'{name_total}{{engine="{name}"}} {stats[field]}' for name, stats in pools.items())
+    lines.append("# TYPE db_pool_checkout_wait_seconds_max gauge")
+    lines.extend(f'db_pool_checkout_wait_seconds_max{{engine="{name}"}} {stats["checkout_wait_seconds_max"]}' for name, stats in pools.items())
+
+    cache_stats = entity_cache.cache.stats()
+    lines += [
+        "# TYPE entity_cache_entries gauge",
+        f"entity_cache_entries {cache_stats['entries']}",
+    ]
+    for field in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        lines.append(f"# TYPE entity_cache_{field}_total counter")
+        lines.append(f"entity_cache_{field}_total {cache_stats[field]}")
+
+    feed_stats = schedule_feed.broker.stats()
+    lines += [
+        "# TYPE schedule_stream_subscribers gauge",
+        f"schedule_stream_subscribers {feed_stats['subscribers']}",
+        "# TYPE schedule_stream_events_total counter",
+        f"schedule_stream_events_total {feed_stats['published']}",
+        "# TYPE schedule_stream_overflows_total counter",
+        f"schedule_stream_overflows_total {feed_stats['overflows']}",
+    ]
+
+    lines += [
+        "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+        "# TYPE process_resident_memory_bytes gauge",
+        f"process_resident_memory_bytes {_rss_bytes()}",
+        "# TYPE python_gc_collections_total counter",
+    ]
+    gc_stats = gc.get_stats()
+    lines.extend(f'python_gc_collections_total{{generation="{gen}"}} {stats["collections"]}' for gen, stats in enumerate(gc_stats))
+    lines.append("# TYPE python_gc_objects_collected_total counter")
+    lines.extend(f'python_gc_objects_collected_total{{generation="{gen}"}} {stats["collected"]}' for gen, stats in enumerate(gc_stats))
+    lines.append("# TYPE python_gc_objects_uncollectable_total counter")
+    lines.extend(f'python_gc_objects_uncollectable_total{{generation="{gen}"}} {stats["uncollectable"]}' for gen, stats in enumerate(gc_stats))
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, Float, Text
+from sqlalchemy import BigInteger, Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Enum, Float, Numeric, Text, Index, UniqueConstraint, Computed, DDL, event, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, TSRANGE
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -19,7 +20,10 @@ class FlightStatus(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_users_updated_at_id", "updated_at", "id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
@@ -44,7 +48,10 @@ class User(Base):
 
 class Aircraft(Base):
     __tablename__ = "aircraft"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_aircraft_updated_at_id", "updated_at", "id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     registration = Column(String, unique=True, index=True)
@@ -55,6 +62,8 @@ class Aircraft(Base):
     total_time = Column(Float)
     last_maintenance = Column(DateTime)
     next_maintenance = Column(DateTime)
+    # total_time at the last inspection, which the next 100-hour inspection counts from (app/maintenance.py)
+    last_maintenance_time = Column(Float, nullable=True)
     status = Column(String)
     category = Column(String)
     class_type = Column(String)
@@ -67,7 +76,10 @@ class Aircraft(Base):
 
 class Instructor(Base):
     __tablename__ = "instructors"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_instructors_updated_at_id", "updated_at", "id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
@@ -84,23 +96,282 @@ class Instructor(Base):
 
     flights = relationship("Flight", back_populates="instructor")
 
+def _no_overlap_constraint(name: str, column: str) -> ExcludeConstraint:
+    # Wrapping the id in a one-element int4range keeps the constraint on the built-in
+    # GiST range operator class, so no btree_gist extension is required.
+    return ExcludeConstraint(
+        (text(f"int4range({column}, {column}, '[]')"), "&&"),
+        ("period", "&&"),
+        name=name,
+        using="gist",
+        where=text(f"{column} IS NOT NULL AND status IS DISTINCT FROM 'cancelled'"),
+    )
+
 class Flight(Base):
     __tablename__ = "flights"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        _no_overlap_constraint("ex_flights_aircraft_overlap", "aircraft_id"),
+        _no_overlap_constraint("ex_flights_instructor_overlap", "instructor_id"),
+        Index("ix_flights_aircraft_id_start_time", "aircraft_id", "start_time"),
+        Index("ix_flights_instructor_id_start_time", "instructor_id", "start_time"),
+        Index("ix_flights_student_id_start_time", "student_id", "start_time"),
+        Index("ix_flights_start_time_id", "start_time", "id"),
+        Index("ix_flights_updated_at_id", "updated_at", "id"),
+        Index(
+            "ix_flights_scheduled_start_time",
+            "start_time",
+            postgresql_where=text("status = 'scheduled'"),
+        ),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"))
     instructor_id = Column(Integer, ForeignKey("instructors.id"))
     aircraft_id = Column(Integer, ForeignKey("aircraft.id"))
     flight_type = Column(Enum(FlightType))
-    status = Column(Enum(FlightStatus))
+    status = Column(Enum(FlightStatus), default=FlightStatus.scheduled)
     start_time = Column(DateTime)
     end_time = Column(DateTime)
     duration = Column(Float)
     notes = Column(Text, nullable=True)
+    period = Column(TSRANGE, Computed("tsrange(start_time, end_time, '[)')", persisted=True))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     student = relationship("User", back_populates="flights")
     instructor = relationship("Instructor", back_populates="flights")
-    aircraft = relationship("Aircraft", back_populates="flights") 
\ No newline at end of file
+    aircraft = relationship("Aircraft", back_populates="flights")
+
+# Cross-worker invalidation for app/entity_cache.py: each UPDATE or DELETE of a cached
+# row sends "<table>:<id>" on this channel when its transaction commits
+ENTITY_CACHE_CHANNEL = "entity_cache"
+ENTITY_CACHE_NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_entity_cache() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{ENTITY_CACHE_CHANNEL}', TG_TABLE_NAME || ':' || OLD.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+def _entity_cache_trigger(table: str) -> str:
+    return (
+        f"CREATE TRIGGER {table}_entity_cache AFTER UPDATE OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION notify_entity_cache()"
+    )
+
+for _table in (User.__table__, Aircraft.__table__, Instructor.__table__):
+    event.listen(_table, "after_create", DDL(ENTITY_CACHE_NOTIFY_FUNCTION))
+    event.listen(_table, "after_create", DDL(_entity_cache_trigger(_table.name)))
+
+class Deletion(Base):
+    """Tombstone of a hard-deleted row, so GET /sync can tell clients to drop it."""
+    __tablename__ = "deletions"
+    __table_args__ = (
+        Index("ix_deletions_deleted_at_id", "deleted_at", "id"),
+        # The latest deletion per table, for the collection ETags (app/http_cache.py)
+        Index("ix_deletions_table_name_id", "table_name", "id"),
+        {'extend_existing': True},
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False)
+
+# Every DELETE from a synced table, whatever issued it (crud, the bulk endpoints, psql),
+# leaves a row in `deletions`. deleted_at is naive UTC, like the updated_at columns.
+LOG_DELETION_FUNCTION = """
+CREATE OR REPLACE FUNCTION log_deletion() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO deletions (table_name, row_id, deleted_at)
+    VALUES (TG_TABLE_NAME, OLD.id, clock_timestamp() AT TIME ZONE 'UTC');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+def _log_deletion_trigger(table: str) -> str:
+    return (
+        f"CREATE TRIGGER {table}_log_deletion AFTER DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION log_deletion()"
+    )
+
+for _table in (User.__table__, Aircraft.__table__, Instructor.__table__, Flight.__table__):
+    event.listen(_table, "after_create", DDL(LOG_DELETION_FUNCTION))
+    event.listen(_table, "after_create", DDL(_log_deletion_trigger(_table.name)))
+
+class LogbookTotal(Base):
+    """A student's completed flight hours for one month and flight type, kept by the logbook triggers."""
+    __tablename__ = "logbook_totals"
+    __table_args__ = (
+        # Flights without a type share one row per month
+        UniqueConstraint(
+            "student_id", "month", "flight_type",
+            name="uq_logbook_totals_student_month_type",
+            postgresql_nulls_not_distinct=True,
+        ),
+        {'extend_existing': True},
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    month = Column(Date, nullable=False)
+    flight_type = Column(Enum(FlightType), nullable=True)
+    # Exact, so adding and later subtracting a flight's duration leaves no residue
+    hours = Column(Numeric, nullable=False)
+    flights = Column(Integer, nullable=False)
+
+# logbook_totals follows every completed flight, whatever wrote it: each INSERT, UPDATE
+# or DELETE that adds or removes a completed flight (or changes one's student, type,
+# month or duration) moves its duration between rollup rows in the same transaction.
+# The upsert's row lock serializes concurrent completions for one student.
+MAINTAIN_LOGBOOK_FUNCTION = """
+CREATE OR REPLACE FUNCTION maintain_logbook_totals() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.status = 'completed' AND OLD.student_id IS NOT NULL
+            AND OLD.start_time IS NOT NULL THEN
+        UPDATE logbook_totals
+        SET hours = hours - COALESCE(OLD.duration, 0)::numeric, flights = flights - 1
+        WHERE student_id = OLD.student_id
+            AND month = date_trunc('month', OLD.start_time)::date
+            AND flight_type IS NOT DISTINCT FROM OLD.flight_type
+            AND flights > 1;
+        IF NOT FOUND THEN
+            DELETE FROM logbook_totals
+            WHERE student_id = OLD.student_id
+                AND month = date_trunc('month', OLD.start_time)::date
+                AND flight_type IS NOT DISTINCT FROM OLD.flight_type;
+        END IF;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.status = 'completed' AND NEW.student_id IS NOT NULL
+            AND NEW.start_time IS NOT NULL THEN
+        INSERT INTO logbook_totals (student_id, month, flight_type, hours, flights)
+        VALUES (NEW.student_id, date_trunc('month', NEW.start_time)::date, NEW.flight_type,
+                COALESCE(NEW.duration, 0)::numeric, 1)
+        ON CONFLICT (student_id, month, flight_type) DO UPDATE
+        SET hours = logbook_totals.hours + EXCLUDED.hours, flights = logbook_totals.flights + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# name -> (event, WHEN condition): only writes that touch a completed flight's contribution fire
+LOGBOOK_TRIGGERS = {
+    "flights_logbook_insert": ("INSERT", "NEW.status = 'completed'"),
+    "flights_logbook_update": (
+        "UPDATE",
+        "(OLD.status = 'completed' OR NEW.status = 'completed') AND "
+        "(OLD.status, OLD.student_id, OLD.flight_type, OLD.start_time, OLD.duration) IS DISTINCT FROM "
+        "(NEW.status, NEW.student_id, NEW.flight_type, NEW.start_time, NEW.duration)",
+    ),
+    "flights_logbook_delete": ("DELETE", "OLD.status = 'completed'"),
+}
+
+# Recomputes every rollup from flights, for loads that bypass the triggers
+REBUILD_LOGBOOK_TOTALS = """
+INSERT INTO logbook_totals (student_id, month, flight_type, hours, flights)
+SELECT student_id, date_trunc('month', start_time)::date, flight_type, SUM(COALESCE(duration, 0)::numeric), COUNT(*)
+FROM flights
+WHERE status = 'completed' AND student_id IS NOT NULL AND start_time IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+event.listen(Flight.__table__, "after_create", DDL(MAINTAIN_LOGBOOK_FUNCTION))
+for _name, (_event, _condition) in LOGBOOK_TRIGGERS.items():
+    event.listen(Flight.__table__, "after_create", DDL(
+        f"CREATE TRIGGER {_name} AFTER {_event} ON flights "
+        f"FOR EACH ROW WHEN ({_condition}) EXECUTE FUNCTION maintain_logbook_totals()"
+    ))
+
+class AircraftDailyUsage(Base):
+    """An aircraft's completed flight hours on one day, kept by the aircraft usage triggers."""
+    __tablename__ = "aircraft_daily_usage"
+    __table_args__ = {'extend_existing': True}
+
+    # Day first: utilization reports read a date range for the whole fleet
+    day = Column(Date, primary_key=True)
+    aircraft_id = Column(Integer, ForeignKey("aircraft.id"), primary_key=True)
+    hours = Column(Numeric, nullable=False)
+    flights = Column(Integer, nullable=False)
+
+# Completed flights roll forward into their aircraft's total_time and into aircraft_daily_usage
+# (by the UTC day the flight started), in the same transaction as the write that completed them.
+# Un-completing, editing or deleting a completed flight moves its duration back out. The UPDATE
+# takes the aircraft's row lock, so concurrent completions on one aircraft queue behind each
+# other and each adds to the total the previous one committed: none is lost. Bumping updated_at
+# lets delta sync and the entity cache triggers see the new total.
+MAINTAIN_AIRCRAFT_USAGE_FUNCTION = """
+CREATE OR REPLACE FUNCTION maintain_aircraft_usage() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.status = 'completed' AND OLD.aircraft_id IS NOT NULL THEN
+        UPDATE aircraft
+        SET total_time = (COALESCE(total_time, 0)::numeric - COALESCE(OLD.duration, 0)::numeric)::float8,
+            updated_at = clock_timestamp() AT TIME ZONE 'UTC'
+        WHERE id = OLD.aircraft_id;
+        IF OLD.start_time IS NOT NULL THEN
+            UPDATE aircraft_daily_usage
+            SET hours = hours - COALESCE(OLD.duration, 0)::numeric, flights = flights - 1
+            WHERE day = OLD.start_time::date AND aircraft_id = OLD.aircraft_id AND flights > 1;
+            IF NOT FOUND THEN
+                DELETE FROM aircraft_daily_usage WHERE day = OLD.start_time::date AND aircraft_id = OLD.aircraft_id;
+            END IF;
+        END IF;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.status = 'completed' AND NEW.aircraft_id IS NOT NULL THEN
+        UPDATE aircraft
+        SET total_time = (COALESCE(total_time, 0)::numeric + COALESCE(NEW.duration, 0)::numeric)::float8,
+            updated_at = clock_timestamp() AT TIME ZONE 'UTC'
+        WHERE id = NEW.aircraft_id;
+        IF NEW.start_time IS NOT NULL THEN
+            INSERT INTO aircraft_daily_usage (day, aircraft_id, hours, flights)
+            VALUES (NEW.start_time::date, NEW.aircraft_id, COALESCE(NEW.duration, 0)::numeric, 1)
+            ON CONFLICT (day, aircraft_id) DO UPDATE
+            SET hours = aircraft_daily_usage.hours + EXCLUDED.hours, flights = aircraft_daily_usage.flights + 1;
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+AIRCRAFT_USAGE_TRIGGERS = {
+    "flights_aircraft_usage_insert": ("INSERT", "NEW.status = 'completed'"),
+    "flights_aircraft_usage_update": (
+        "UPDATE",
+        "(OLD.status = 'completed' OR NEW.status = 'completed') AND "
+        "(OLD.status, OLD.aircraft_id, OLD.start_time, OLD.duration) IS DISTINCT FROM "
+        "(NEW.status, NEW.aircraft_id, NEW.start_time, NEW.duration)",
+    ),
+    "flights_aircraft_usage_delete": ("DELETE", "OLD.status = 'completed'"),
+}
+
+# Recomputes the daily rollups from flights (total_time is left alone: it includes hours flown
+# before the aircraft joined the fleet)
+REBUILD_AIRCRAFT_DAILY_USAGE = """
+INSERT INTO aircraft_daily_usage (day, aircraft_id, hours, flights)
+SELECT start_time::date, aircraft_id, SUM(COALESCE(duration, 0)::numeric), COUNT(*)
+FROM flights
+WHERE status = 'completed' AND aircraft_id IS NOT NULL AND start_time IS NOT NULL
+GROUP BY 1, 2
+"""
+
+# Fills in an unknown last_maintenance_time from total_time less the hours flown since the day of
+# last_maintenance; counting that whole day errs towards an earlier inspection
+ESTIMATE_LAST_MAINTENANCE_TIME = """
+UPDATE aircraft
+SET last_maintenance_time = (total_time::numeric - COALESCE((
+    SELECT SUM(hours) FROM aircraft_daily_usage
+    WHERE aircraft_id = aircraft.id AND day >= aircraft.last_maintenance::date
+), 0))::float8
+WHERE last_maintenance_time IS NULL AND last_maintenance IS NOT NULL AND total_time IS NOT NULL
+"""
+
+event.listen(Flight.__table__, "after_create", DDL(MAINTAIN_AIRCRAFT_USAGE_FUNCTION))
+for _name, (_event, _condition) in AIRCRAFT_USAGE_TRIGGERS.items():
+    event.listen(Flight.__table__, "after_create", DDL(
+        f"CREATE TRIGGER {_name} AFTER {_event} ON flights "
+        f"FOR EACH ROW WHEN ({_condition}) EXECUTE FUNCTION maintain_aircraft_usage()"
+    ))
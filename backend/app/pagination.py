@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+class Page(list):
+    """A page of rows, plus the collection state (crud.get_collection_state) read alongside them."""
+
+    def __init__(self, rows: list, state: tuple):
+        super().__init__(rows)
+        self.state = state
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row on a page as an opaque, URL-safe cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+def decode_id_cursor(cursor: str) -> int:
+    """Decode a cursor produced for an id-ordered collection."""
+    values = _decode(cursor)
+    if len(values) != 1 or type(values[0]) is not int:
+        raise ValueError("Invalid cursor")
+    return values[0]
+
+def decode_flight_cursor(cursor: str) -> tuple[datetime | None, int]:
+    """Decode a cursor produced for the (start_time, id) ordered flights collection.
+
+    start_time is None when the page ended among the flights without one (they sort last).
+    """
+    values = _decode(cursor)
+    if len(values) != 2 or not isinstance(values[0], (str, type(None))) or type(values[1]) is not int:
+        raise ValueError("Invalid cursor")
+    if values[0] is None:
+        return None, values[1]
+    try:
+        return datetime.fromisoformat(values[0]), values[1]
+    except ValueError:
+        raise ValueError("Invalid cursor")
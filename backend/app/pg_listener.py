@@ -0,0 +1,76 @@
+"""
+A background thread per worker that LISTENs on a Postgres NOTIFY channel.
+
+It holds a dedicated DBAPI connection (outside the pool) for the life of the
+worker and hands each payload to a callback. Notifications sent while the
+connection was down are lost, so ``on_reset`` is called whenever it
+(re)connects or drops; callers use it to throw away whatever the missed
+notifications would have corrected.
+"""
+import logging
+import os
+import select
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class Listener(threading.Thread):
+    def __init__(
+        self,
+        engine,
+        channel: str,
+        on_notify: Callable[[str], None],
+        on_reset: Callable[[], None],
+        name: str,
+        reconnect_seconds: float = 1.0,
+    ):
+        super().__init__(name=name, daemon=True)
+        self.engine = engine
+        self.channel = channel
+        self.on_notify = on_notify
+        self.on_reset = on_reset
+        self.reconnect_seconds = reconnect_seconds
+        self.listening = threading.Event()
+        self._stopping = threading.Event()
+        # Written to on stop() so the select() below returns at once
+        self._wake_read, self._wake_write = os.pipe()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        os.write(self._wake_write, b"x")
+
+    def _connect(self):
+        args, kwargs = self.engine.dialect.create_connect_args(self.engine.url)
+        connection = self.engine.dialect.dbapi.connect(*args, **kwargs)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return connection
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                # Anything may have happened while nobody was listening
+                self.on_reset()
+                self.listening.set()
+                while not self._stopping.is_set():
+                    readable, _, _ = select.select([connection, self._wake_read], [], [], 5.0)
+                    if connection not in readable:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.on_notify(connection.notifies.pop(0).payload)
+            except Exception as error:
+                logger.warning("Listener on %s disconnected: %s", self.channel, error)
+                self.listening.clear()
+                self.on_reset()
+                self._stopping.wait(self.reconnect_seconds)
+            finally:
+                if connection is not None:
+                    connection.close()
+        self.listening.clear()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
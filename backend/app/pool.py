@@ -0,0 +1,121 @@
+"""
+Connection pool configuration and instrumentation.
+
+The pools report how long checkouts wait, how often they spill into overflow
+connections and how often they time out, so pool exhaustion shows up in
+``/health/pool`` (and later in metrics) before it shows up as failed requests.
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class PoolMetrics:
+    """Running totals for one pool; the live gauges are read from the pool itself."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record_checkout(self, waited: float, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self.overflow_events += overflowed
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+class _InstrumentedPool:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        began = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - began)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - began, self.overflow() > max(overflow, 0))
+        return connection
+
+    def stats(self) -> dict:
+        metrics = self.metrics
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": metrics.checkouts,
+            "checkout_wait_seconds_total": metrics.wait_seconds_total,
+            "checkout_wait_seconds_max": metrics.wait_seconds_max,
+            "overflow_events": metrics.overflow_events,
+            "timeouts": metrics.timeouts,
+        }
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+class InstrumentedAsyncPool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+def pool_options(poolclass) -> dict:
+    """Engine keyword arguments for the pool settings in ``config.Settings``."""
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        # "pessimistic" pings on every checkout; "optimistic" relies on pool_recycle and
+        # SQLAlchemy invalidating the pool when a statement hits a dropped connection
+        "pool_pre_ping": settings.DB_POOL_PING_STRATEGY == "pessimistic",
+    }
+
+def warm_pool(engine, connections: int) -> int:
+    """Open up to `connections` connections now so the first requests do not pay for the handshakes."""
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            opened.append(engine.connect())
+    except exc.OperationalError as error:
+        logger.warning("Connection pool warmup stopped after %d connections: %s", len(opened), error)
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+async def warm_async_pool(engine, connections: int) -> int:
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            opened.append(await engine.connect())
+    except (exc.OperationalError, OSError) as error:
+        logger.warning("Async connection pool warmup stopped after %d connections: %s", len(opened), error)
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
@@ -0,0 +1,96 @@
+"""
+Per-request SQL statement accounting.
+
+``QueryStatsMiddleware`` opens a ``RequestQueryStats`` for every HTTP request
+and a cursor-level event hook on all engines adds each statement to it. The
+hook finds the stats through a context variable, which follows sync routes
+into the threadpool and async routes into SQLAlchemy's greenlets. At the end
+of the request:
+
+* in debug mode the totals are returned as ``X-DB-Queries`` / ``X-DB-Time``;
+* a statement that ran ``QUERY_REPEAT_WARN_THRESHOLD`` times or more (the
+  usual signature of a lazy load inside a loop, i.e. N+1) is logged;
+* registered listeners (see the ``query_budget`` test fixture) get the stats.
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+QUERY_TIME_HEADER = "X-DB-Time"
+
+class RequestQueryStats:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+_listeners: list[Callable[[RequestQueryStats], None]] = []
+
+def add_listener(listener: Callable[[RequestQueryStats], None]) -> None:
+    _listeners.append(listener)
+
+def remove_listener(listener: Callable[[RequestQueryStats], None]) -> None:
+    _listeners.remove(listener)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None or not conn.info.get("query_started"):
+        return
+    stats.seconds += time.perf_counter() - conn.info["query_started"].pop()
+    stats.count += 1
+    stats.statements[statement] += 1
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope["method"], scope["path"])
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()),
+                    (QUERY_TIME_HEADER.lower().encode(), f"{stats.seconds * 1000:.2f}ms".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            for statement, count in stats.repeated(settings.QUERY_REPEAT_WARN_THRESHOLD):
+                logger.warning(
+                    "Possible N+1: %s %s ran the same statement %d times: %s",
+                    stats.method, stats.path, count, " ".join(statement.split())[:200]
+                )
+            for listener in _listeners:
+                listener(stats)
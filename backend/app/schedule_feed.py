@@ -0,0 +1,232 @@
+"""
+Live schedule changes pushed to dispatchers (``/api/v1/stream/schedule``).
+
+The flight writes in ``crud`` call ``emit`` before they commit. Events reach
+subscribers only once the write has committed, in one of two ways:
+
+* in-process (the default): the event waits in ``session.info`` and is
+  handed to this worker's ``broker`` from the session's ``after_commit``
+  hook; a rollback discards it;
+* with ``SCHEDULE_STREAM_BRIDGE`` on, for multi-worker deployments: the
+  event is sent with ``pg_notify`` inside the write's transaction, which
+  Postgres delivers on commit to every worker's ``pg_listener`` thread,
+  including the sender's own. After the listener reconnects, subscribers
+  get a ``resync`` event, because notifications may have been missed.
+
+Each subscriber has a bounded queue. The stream only takes the next event
+once the last one was written to the socket, so a slow client fills its own
+queue. When the queue is full its backlog is dropped, it gets a final
+``overflow`` event and the stream closes. The client reconnects and catches
+up with ``GET /api/v1/sync``, instead of growing this worker's memory.
+``resync`` asks for the same catch-up without reconnecting; the bulk
+endpoints send it in place of one event per row.
+
+In-process observers (``broker.observe``) are called with every event as
+it is published, from whichever thread publishes it; the maintenance
+forecaster uses them to re-forecast only the aircraft a change touched.
+
+Subscribers may filter by aircraft and instructor. An update is matched
+against the flight's assignment before and after the change, so a
+dispatcher watching one aircraft also sees flights move off it.
+"""
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from fastapi import WebSocket
+from sqlalchemy import event as orm_event, func, select
+from sqlalchemy.orm import Session
+
+from . import models, pg_listener, serializers
+from .config import settings
+
+SCHEDULE_CHANNEL = "schedule"
+# pg_notify payloads must be shorter than 8000 bytes
+NOTIFY_PAYLOAD_LIMIT = 7999
+# Sent instead of the full row when it does not fit in a notification (long notes)
+PARTIAL_FIELDS = ("id", "student_id", "instructor_id", "aircraft_id", "start_time", "end_time", "status")
+
+RESYNC = {"type": "resync"}
+OVERFLOW = {"type": "overflow"}
+
+def _event(type: str, flight: models.Flight, previous_aircraft_id=None, previous_instructor_id=None) -> dict:
+    event = {"type": type, "flight": serializers.flight(flight)}
+    if type == "updated" or type == "cancelled":
+        event["previous"] = {"aircraft_id": previous_aircraft_id, "instructor_id": previous_instructor_id}
+    return event
+
+def _notify(db: Session, event: dict) -> None:
+    payload = serializers.dumps(event)
+    if len(payload) > NOTIFY_PAYLOAD_LIMIT:
+        flight = event["flight"]
+        payload = serializers.dumps({**event, "flight": {name: flight[name] for name in PARTIAL_FIELDS}, "partial": True})
+    db.execute(select(func.pg_notify(SCHEDULE_CHANNEL, payload.decode())))
+
+def _emit(db: Session, event: dict) -> None:
+    if settings.SCHEDULE_STREAM_BRIDGE:
+        _notify(db, event)
+    else:
+        db.info.setdefault("schedule_events", []).append(event)
+
+def emit(
+    db: Session,
+    type: str,
+    flight: models.Flight,
+    previous_aircraft_id: Optional[int] = None,
+    previous_instructor_id: Optional[int] = None,
+) -> None:
+    """Queue a created/updated/cancelled/deleted event for `flight`, sent when `db` commits."""
+    _emit(db, _event(type, flight, previous_aircraft_id, previous_instructor_id))
+
+def emit_resync(db: Session) -> None:
+    _emit(db, RESYNC)
+
+@orm_event.listens_for(Session, "after_commit")
+def _publish_on_commit(session):
+    for event in session.info.pop("schedule_events", ()):
+        broker.publish(event)
+
+@orm_event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop("schedule_events", None)
+
+class Subscription:
+    def __init__(self, loop, aircraft_ids: frozenset, instructor_ids: frozenset, max_queued: int):
+        self.loop = loop
+        self.aircraft_ids = aircraft_ids
+        self.instructor_ids = instructor_ids
+        self.queue: asyncio.Queue = asyncio.Queue(max_queued)
+        self.overflowed = False
+
+    def wants(self, event: dict) -> bool:
+        if "flight" not in event or not (self.aircraft_ids or self.instructor_ids):
+            return True
+        flight, previous = event["flight"], event.get("previous") or {}
+        aircraft = {flight["aircraft_id"], previous.get("aircraft_id")}
+        instructors = {flight["instructor_id"], previous.get("instructor_id")}
+        return not (self.aircraft_ids.isdisjoint(aircraft) and self.instructor_ids.isdisjoint(instructors))
+
+    def offer(self, event: dict) -> None:
+        """Queue `event`; must run on the subscriber's event loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            broker.overflows += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """The next event, or None if there was none for `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class Broker:
+    def __init__(self):
+        self._subscriptions: set[Subscription] = set()
+        self._observers: list[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, aircraft_ids: Iterable[int] = (), instructor_ids: Iterable[int] = ()) -> Subscription:
+        """Register a subscriber on the running event loop."""
+        subscription = Subscription(
+            asyncio.get_running_loop(),
+            frozenset(aircraft_ids),
+            frozenset(instructor_ids),
+            settings.SCHEDULE_STREAM_QUEUE_SIZE,
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def observe(self, observer: Callable[[dict], None]) -> None:
+        """Call `observer` with every published event; it must be quick and must not raise."""
+        with self._lock:
+            self._observers.append(observer)
+
+    def publish(self, event: dict) -> None:
+        """Fan `event` out to the observers and matching subscribers; safe to call from any thread."""
+        with self._lock:
+            self.published += 1
+            subscriptions = list(self._subscriptions)
+            observers = list(self._observers)
+        for observer in observers:
+            observer(event)
+        for subscription in subscriptions:
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Its event loop has been closed
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"subscribers": len(self._subscriptions), "published": self.published, "overflows": self.overflows}
+
+broker = Broker()
+
+# Stream encodings
+async def sse(subscription: Subscription, heartbeat: float) -> AsyncIterator[bytes]:
+    """text/event-stream chunks for `subscription`; unsubscribes when the client goes away."""
+    try:
+        # Sent at once so the client knows the subscription is live
+        yield b": subscribed\n\n"
+        while True:
+            event = await subscription.next(heartbeat)
+            if event is None:
+                # Keeps proxies from timing out an idle stream and notices dead clients
+                yield b": keep-alive\n\n"
+                continue
+            yield b"event: " + event["type"].encode() + b"\ndata: " + serializers.dumps(event) + b"\n\n"
+            if event is OVERFLOW:
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+async def websocket(socket: WebSocket, subscription: Subscription, heartbeat: float) -> None:
+    """Send `subscription`'s events as JSON text frames until the client disconnects or overflows."""
+    try:
+        await socket.accept()
+        while True:
+            event = await subscription.next(heartbeat)
+            await socket.send_text(serializers.dumps(event or {"type": "keep-alive"}).decode())
+            if event is OVERFLOW:
+                await socket.close()
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+# Multi-worker bridge
+def _on_notify(payload: str) -> None:
+    broker.publish(serializers.loads(payload))
+
+_bridge: Optional[pg_listener.Listener] = None
+
+def start_bridge(engine) -> pg_listener.Listener:
+    global _bridge
+    if _bridge is None:
+        _bridge = pg_listener.Listener(
+            engine, SCHEDULE_CHANNEL, _on_notify, lambda: broker.publish(RESYNC), name="schedule-feed-bridge"
+        )
+        _bridge.start()
+    return _bridge
+
+def stop_bridge() -> None:
+    global _bridge
+    if _bridge is not None:
+        _bridge.stop()
+        _bridge.join(timeout=2)
+        _bridge = None
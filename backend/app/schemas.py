@@ -1,6 +1,8 @@
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, model_validator
+
+from .models import FlightStatus, FlightType
 
 class UserBase(BaseModel):
     email: str
@@ -30,6 +32,12 @@ class AircraftBase(BaseModel):
     type: str
     model: str
     year: int
+    # Hours at creation; completed flights are added to it from then on (see models.maintain_aircraft_usage)
+    total_time: Optional[float] = None
+    last_maintenance: Optional[datetime] = None
+    # total_time at the last inspection, and when the next annual inspection is due (app/maintenance.py)
+    last_maintenance_time: Optional[float] = None
+    next_maintenance: Optional[datetime] = None
 
 class AircraftCreate(AircraftBase):
     pass
@@ -79,8 +87,16 @@ class FlightBase(BaseModel):
     start_time: datetime
     end_time: datetime
     duration: float
+    flight_type: Optional[FlightType] = None
+    status: FlightStatus = FlightStatus.scheduled
     notes: Optional[str] = None
 
+    @model_validator(mode="after")
+    def check_time_order(self):
+        if self.start_time is not None and self.end_time is not None and self.end_time < self.start_time:
+            raise ValueError("end_time must not be before start_time")
+        return self
+
 class FlightCreate(FlightBase):
     pass
 
@@ -91,10 +107,145 @@ class FlightUpdate(FlightBase):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     duration: Optional[float] = None
+    status: Optional[FlightStatus] = None
     notes: Optional[str] = None
 
 class Flight(FlightBase):
     id: int
+    # Nullable columns: a flight may not be dated yet
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    status: Optional[FlightStatus] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class AvailableAircraft(Aircraft):
+    available: bool
+
+class AvailableInstructor(Instructor):
+    available: bool
+
+class AvailabilitySlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    aircraft_ids: list[int]
+    instructor_ids: list[int]
+
+class Availability(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    aircraft: list[AvailableAircraft]
+    instructors: list[AvailableInstructor]
+    next_slots: list[AvailabilitySlot]
+
+class AvailabilityCheck(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    flight_type: Optional[FlightType] = None
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "deleted", "failed"]
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[BulkItemResult]
+
+class SyncChanges(BaseModel):
+    users: list[User]
+    aircraft: list[Aircraft]
+    instructors: list[Instructor]
+    flights: list[Flight]
+
+class SyncDeletions(BaseModel):
+    users: list[int]
+    aircraft: list[int]
+    instructors: list[int]
+    flights: list[int]
+
+class SyncResult(BaseModel):
+    watermark: datetime
+    has_more: bool
+    changes: SyncChanges
+    deletions: SyncDeletions
+
+class LogbookHours(BaseModel):
+    hours: float
+    flights: int
+
+class LogbookPeriod(BaseModel):
+    period: str
+    total: LogbookHours
+    by_type: dict[FlightType, LogbookHours]
+
+class Logbook(BaseModel):
+    student_id: int
+    total: LogbookHours
+    by_type: dict[FlightType, LogbookHours]
+    periods: list[LogbookPeriod]
+
+class UtilizationBucket(BaseModel):
+    start: date
+    hours: float
+    flights: int
+
+class IdleGap(BaseModel):
+    start: date
+    end: date
+    days: int
+
+class AircraftUtilization(BaseModel):
+    aircraft_id: int
+    registration: Optional[str]
+    hours: float
+    flights: int
+    utilization: float
+    buckets: list[UtilizationBucket]
+    idle_gaps: list[IdleGap]
+
+class FleetUtilization(BaseModel):
+    aircraft: int
+    hours: float
+    flights: int
+    utilization: float
+
+class UtilizationReport(BaseModel):
+    start: date
+    end: date
+    bucket: Literal["day", "week"]
+    hours_per_day: float
+    fleet: FleetUtilization
+    aircraft: list[AircraftUtilization]
+
+class FlaggedFlight(BaseModel):
+    flight_id: int
+    start_time: datetime
+    end_time: datetime
+    # The limits the flight would fly past, and by how many hours over the 100-hour limit it ends
+    limits: list[Literal["hours", "calendar"]]
+    hours_over: Optional[float]
+
+class MaintenanceForecast(BaseModel):
+    aircraft_id: int
+    registration: Optional[str]
+    total_time: Optional[float]
+    hours_since_maintenance: Optional[float]
+    hours_remaining: Optional[float]
+    scheduled_hours: float
+    calendar_due: Optional[datetime]
+    due_at: Optional[datetime]
+    due_reason: Optional[Literal["hours", "calendar"]]
+    flagged_flights: list[FlaggedFlight]
+
+class MaintenanceReport(BaseModel):
+    interval_hours: float
+    horizon_days: int
+    aircraft: list[MaintenanceForecast]
+
+class UserLogin(BaseModel):
+    email: str
+    password: str
@@ -0,0 +1,99 @@
+"""
+Password hashing on a dedicated, bounded worker pool.
+
+bcrypt is deliberately slow (~250ms at cost 12), so hashing and verification
+run on their own executor instead of the request threadpool. Async endpoints
+await the result; sync callers (bulk imports) block on it. Submissions beyond
+``PASSWORD_HASH_MAX_PENDING`` are refused with ``HashingBusyError`` rather than
+queued without bound.
+
+``PASSWORD_HASH_EXECUTOR="process"`` switches to a process pool for hashing
+backends that hold the GIL; the ``bcrypt`` package releases it, so threads
+already scale with cores.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from .config import settings
+
+class HashingBusyError(Exception):
+    """Raised when the hashing pool already has its maximum of pending jobs."""
+
+@lru_cache
+def password_context(rounds: int) -> CryptContext:
+    # Pinning min/max to the configured cost makes needs_update() flag hashes made at any other cost
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+def _hash(password: str, rounds: int) -> str:
+    return password_context(rounds).hash(password)
+
+@lru_cache
+def _dummy_hash(rounds: int) -> str:
+    return password_context(rounds).hash("no such account")
+
+def _verify(password: str, hashed_password: Optional[str], rounds: int) -> tuple[bool, Optional[str]]:
+    if not hashed_password:
+        # Pay the full bcrypt cost anyway, so the response time does not reveal which accounts exist
+        password_context(rounds).verify(password, _dummy_hash(rounds))
+        return False, None
+    return password_context(rounds).verify_and_update(password, hashed_password)
+
+_lock = threading.Lock()
+_executor: Optional[Executor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+
+def get_executor() -> Executor:
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+            if settings.PASSWORD_HASH_EXECUTOR == "process":
+                _executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+        return _executor
+
+def shutdown() -> None:
+    global _executor, _slots
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor, _slots = None, None
+
+def _submit(fn, *args, block: bool = False) -> Future:
+    executor = get_executor()
+    slots = _slots
+    if not slots.acquire(blocking=block):
+        raise HashingBusyError("Password hashing is at capacity")
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+async def hash_password(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_hash, password, settings.PASSWORD_HASH_ROUNDS))
+
+async def verify_password(password: str, hashed_password: Optional[str]) -> tuple[bool, Optional[str]]:
+    """Check a password; the second item is a replacement hash when the stored one uses another cost."""
+    return await asyncio.wrap_future(_submit(_verify, password, hashed_password, settings.PASSWORD_HASH_ROUNDS))
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash a batch in parallel, waiting for pool capacity instead of failing."""
+    futures = [_submit(_hash, password, settings.PASSWORD_HASH_ROUNDS, block=True) for password in passwords]
+    return [future.result() for future in futures]
@@ -0,0 +1,81 @@
+"""
+Delta sync (``GET /api/v1/sync``) for clients that keep a local copy of the data.
+
+A client makes one full sync (no ``since``), then passes the ``watermark``
+of each response as ``since`` on the next call. It gets back the users,
+aircraft, instructors and flights whose ``updated_at`` is later than the
+watermark, and the ids of rows deleted since then (from the ``deletions``
+log the ``log_deletion`` triggers keep). Applying a response means upserting
+the changed rows by id and dropping the deleted ones. That is idempotent,
+which the watermark relies on:
+
+* ``updated_at`` is stamped when a row is written, not when its transaction
+  commits, so a slow transaction can commit a row older than a watermark
+  already handed out. The watermark therefore trails the clock by
+  ``SYNC_OVERLAP_SECONDS``, and rows changed in that window are sent again
+  on the next call;
+* each table returns at most ``SYNC_MAX_ROWS`` changes. When one is cut
+  short, ``has_more`` is set and the watermark stops at the last row sent
+  for it, so the client calls again straight away. A cut never falls inside
+  a group of rows sharing one timestamp (a bulk UPDATE stamps them all the
+  same), otherwise the rest of the group would be skipped. The overlap is
+  not applied to such a partial page, which has to move the watermark
+  forward even when all of its rows are recent.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from . import crud, models, serializers
+from .config import settings
+
+SYNCED_MODELS = {
+    "users": (models.User, serializers.user),
+    "aircraft": (models.Aircraft, serializers.aircraft),
+    "instructors": (models.Instructor, serializers.instructor),
+    "flights": (models.Flight, serializers.flight),
+}
+
+def _page(rows: list, limit: int, stamp: Callable, load_tied: Callable) -> tuple[list, Optional[datetime]]:
+    """Trim `limit` + 1 rows to whole timestamp groups; also returns the last stamp kept if cut short."""
+    if len(rows) <= limit:
+        return rows, None
+    boundary = stamp(rows[limit])
+    kept = [row for row in rows[:limit] if stamp(row) < boundary]
+    if not kept:
+        # More than `limit` rows share one timestamp: send the whole group
+        kept = load_tied(boundary)
+    return kept, stamp(kept[-1])
+
+def changes(db: Session, since: Optional[datetime], limit: int) -> dict:
+    changed, stops = {}, []
+    for name, (model, serializer) in SYNCED_MODELS.items():
+        rows, stop = _page(
+            crud.get_changed_rows(db, model, since, limit + 1),
+            limit,
+            lambda row: row.updated_at,
+            lambda updated_at: crud.get_rows_changed_at(db, model, updated_at),
+        )
+        changed[name] = serializer.many(rows)
+        stops.append(stop)
+
+    tombstones, stop = _page(
+        crud.get_deletions(db, since, limit + 1),
+        limit,
+        lambda row: row.deleted_at,
+        lambda deleted_at: crud.get_deletions_at(db, deleted_at),
+    )
+    stops.append(stop)
+    deleted = {name: [] for name in SYNCED_MODELS}
+    for tombstone in tombstones:
+        deleted[tombstone.table_name].append(tombstone.row_id)
+
+    stops = [stop for stop in stops if stop is not None]
+    if stops:
+        watermark = min(stops)
+    else:
+        watermark = datetime.utcnow() - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        if since is not None:
+            watermark = max(watermark, since)
+    return {"watermark": watermark, "has_more": bool(stops), "changes": changed, "deletions": deleted}
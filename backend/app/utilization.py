@@ -0,0 +1,92 @@
+"""
+Aircraft utilization reports (``GET /api/v1/reports/utilization``).
+
+Hours come from ``aircraft_daily_usage``: one row per aircraft per day it
+flew, which the ``maintain_aircraft_usage`` triggers on ``flights`` keep
+current as flights complete (the same triggers roll each completion into
+``aircraft.total_time``). A report over a date range is one read of the
+primary key range ``day >= start AND day < end``, at most a row per
+aircraft per day, however many flights there were.
+
+Days are those of the flights' start times (UTC); weeks start on Monday.
+Only the aircraft in ``fleet`` are reported (by default the active
+ones). Buckets without flying are left out. An idle gap is a run of at least
+``min_idle_days`` days in the range on which the aircraft did not fly.
+Utilization is the hours flown over the hours available, ``hours_per_day``
+times the days in the range, per aircraft and for the fleet as a whole.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Literal, Optional
+
+from . import models
+
+Bucket = Literal["day", "week"]
+
+def bucket_start(day: date, bucket: Bucket) -> date:
+    return day if bucket == "day" else day - timedelta(days=day.weekday())
+
+def idle_gaps(flown: list[date], start: date, end: date, min_days: int = 1) -> list[dict]:
+    """Runs of at least `min_days` days in [start, end) missing from `flown` (sorted, within the range)."""
+    gaps = []
+    for gap_start, gap_end in zip([start] + [day + timedelta(days=1) for day in flown], flown + [end]):
+        days = (gap_end - gap_start).days
+        if days >= min_days:
+            gaps.append({"start": gap_start, "end": gap_end, "days": days})
+    return gaps
+
+def _ratio(hours: Decimal, available: float) -> float:
+    return round(float(hours) / available, 4) if available else 0.0
+
+def report(
+    fleet: list[tuple[int, Optional[str]]],
+    rows: list[models.AircraftDailyUsage],
+    start: date,
+    end: date,
+    bucket: Bucket = "day",
+    hours_per_day: float = 10.0,
+    min_idle_days: int = 1,
+) -> dict:
+    """Utilization of the `fleet` (id, registration) pairs over [start, end) from their rollup rows, oldest day first."""
+    usage = {aircraft_id: [] for aircraft_id, _ in fleet}
+    for row in rows:
+        if row.aircraft_id in usage:
+            usage[row.aircraft_id].append(row)
+    registrations = dict(fleet)
+    available = (end - start).days * hours_per_day
+
+    aircraft, fleet_hours, fleet_flights = [], Decimal(0), 0
+    for aircraft_id, days in usage.items():
+        buckets = {}
+        for row in days:
+            totals = buckets.setdefault(bucket_start(row.day, bucket), [Decimal(0), 0])
+            totals[0] += row.hours
+            totals[1] += row.flights
+        hours = sum((row.hours for row in days), Decimal(0))
+        flights = sum(row.flights for row in days)
+        fleet_hours += hours
+        fleet_flights += flights
+        aircraft.append({
+            "aircraft_id": aircraft_id,
+            "registration": registrations[aircraft_id],
+            "hours": float(hours),
+            "flights": flights,
+            "utilization": _ratio(hours, available),
+            "buckets": [
+                {"start": day, "hours": float(totals[0]), "flights": totals[1]} for day, totals in buckets.items()
+            ],
+            "idle_gaps": idle_gaps([row.day for row in days], start, end, min_idle_days),
+        })
+    return {
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "hours_per_day": hours_per_day,
+        "fleet": {
+            "aircraft": len(aircraft),
+            "hours": float(fleet_hours),
+            "flights": fleet_flights,
+            "utilization": _ratio(fleet_hours, available * len(aircraft)),
+        },
+        "aircraft": aircraft,
+    }
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the flight school backend.
+
+These are standalone scripts (not collected by pytest); run them from the
+backend directory, e.g. ``python -m benchmarks.flight_indexes``.
+"""
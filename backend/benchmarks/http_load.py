@@ -0,0 +1,131 @@
+"""
+Drive load at a running API server and record throughput and latency per route.
+
+Load a dataset with ``benchmarks.generate_data`` and start the server with
+``DEBUG=true``, so each response reports its statement count in
+``X-DB-Queries``. Then run:
+
+    python -m benchmarks.http_load --base-url http://localhost:8000 --output results/branch-http.json
+    python -m benchmarks.http_load --output results/branch-http.json --baseline results/main-http.json
+
+Each route in ``ROUTES`` gets ``--requests`` requests from ``--concurrency``
+concurrent clients. The results record throughput (requests/s), the p50,
+p95 and p99 latency and statements per request. They are written as JSON
+that ``benchmarks.results`` can diff. With ``--baseline`` the run is
+compared right away and exits 1 on a regression beyond ``--threshold``.
+
+Only read routes are driven, so a run leaves the database as it found it.
+``pytest benchmarks/`` covers every route, writes included, in-process.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.query_stats import QUERY_COUNT_HEADER
+from . import results
+from .pagination import percentile
+
+UNTIL = datetime(2026, 1, 1)
+WEEK = {"from": (UNTIL - timedelta(days=7)).isoformat(), "to": UNTIL.isoformat()}
+
+# name -> (path, query parameters); ids refer to rows benchmarks.generate_data always creates
+ROUTES = {
+    "read_users": ("/api/v1/users/", {}),
+    "read_user": ("/api/v1/users/1", {}),
+    "read_logbook": ("/api/v1/users/1/logbook", {}),
+    "read_aircrafts": ("/api/v1/aircraft/", {}),
+    "read_aircraft": ("/api/v1/aircraft/1", {}),
+    "read_instructors": ("/api/v1/instructors/", {}),
+    "read_instructor": ("/api/v1/instructors/1", {}),
+    "read_flights": ("/api/v1/flights/", {}),
+    "read_flights_by_aircraft": ("/api/v1/flights/", {"aircraft_id": 1, "start": WEEK["from"], "end": WEEK["to"]}),
+    "read_flight": ("/api/v1/flights/1", {}),
+    "export_flights": ("/api/v1/flights/export", WEEK),
+    "read_availability": ("/api/v1/availability", {"start_time": UNTIL.isoformat()}),
+    "read_available_aircraft": ("/api/available-aircraft", {}),
+    "read_available_instructors": ("/api/available-instructors", {}),
+    "read_changes": ("/api/v1/sync", {"since": (UNTIL - timedelta(days=1)).isoformat()}),
+    "read_utilization": ("/api/v1/reports/utilization", {"end": UNTIL.date().isoformat(), "bucket": "week"}),
+    "read_maintenance_forecast": ("/api/v1/reports/maintenance", {}),
+}
+
+async def drive(client: httpx.AsyncClient, path: str, params: dict, concurrency: int, requests: int) -> dict:
+    latencies, statements = [], []
+    pending = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in pending:
+            began = time.perf_counter()
+            response = await client.get(path, params=params)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - began) * 1000)
+            if QUERY_COUNT_HEADER in response.headers:
+                statements.append(int(response.headers[QUERY_COUNT_HEADER]))
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - began
+    return {
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "statements": max(statements) if statements else None,
+    }
+
+async def run(base_url: str, names: list[str], concurrency: int, requests: int, warmup: int) -> dict[str, dict]:
+    limits = httpx.Limits(max_connections=concurrency)
+    measured = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        for name in names:
+            path, params = ROUTES[name]
+            if warmup:
+                await drive(client, path, params, min(concurrency, warmup), warmup)
+            measured[name] = await drive(client, path, params, concurrency, requests)
+    return measured
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1_000, help="requests per route")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per route")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    measured = asyncio.run(run(args.base_url, args.routes, args.concurrency, args.requests, args.warmup))
+
+    print(f"{'route':<30}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'stmts':>7}")
+    for name, result in measured.items():
+        statements = result["statements"]
+        print(f"{name:<30}{result['throughput']:>10.0f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+              f"{result['p99_ms']:>9.1f}{statements if statements is not None else '-':>7}")
+
+    if args.output:
+        meta = {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "datetime": datetime.utcnow().isoformat(),
+        }
+        with open(args.output, "w") as file:
+            json.dump({"meta": meta, "results": measured}, file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        regressions = results.compare(results.load(args.baseline), measured, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare two benchmark result files and fail on regressions.
+
+Reads both pytest-benchmark JSON (``pytest benchmarks/ --benchmark-json=...``)
+and the files ``benchmarks.http_load`` writes, so results from two commits
+can be diffed either way:
+
+    python -m benchmarks.results results/main.json results/branch.json --threshold 0.15
+
+A benchmark regresses when its p50, p95 or p99 latency grows, or its
+throughput drops, by more than ``--threshold`` (a fraction). Any increase
+in statements per call also counts, since that usually means a new query
+or an N+1. The exit status is 1 when anything regressed, so CI can gate
+on it.
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+def load(path: str) -> dict[str, dict]:
+    """Benchmark name -> {p50_ms, p95_ms, p99_ms, throughput, statements} from either file format."""
+    with open(path) as file:
+        data = json.load(file)
+    if "benchmarks" not in data:
+        return data["results"]
+    results = {}
+    for benchmark in data["benchmarks"]:
+        extra, stats = benchmark.get("extra_info", {}), benchmark["stats"]
+        results[benchmark["name"]] = {
+            "p50_ms": extra.get("p50_ms", stats["median"] * 1000),
+            "p95_ms": extra.get("p95_ms"),
+            "p99_ms": extra.get("p99_ms"),
+            "throughput": stats["ops"],
+            "statements": extra.get("statements"),
+        }
+    return results
+
+def _growth(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None or old <= 0:
+        return None
+    return new / old - 1
+
+def compare(baseline: dict[str, dict], current: dict[str, dict], threshold: float) -> list[str]:
+    """Descriptions of every regression beyond `threshold`; benchmarks missing from either side are skipped."""
+    regressions = []
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        for metric in LATENCY_METRICS:
+            growth = _growth(old.get(metric), new.get(metric))
+            if growth is not None and growth > threshold:
+                regressions.append(f"{name}: {metric} {old[metric]:.2f} -> {new[metric]:.2f} (+{growth:.0%})")
+        growth = _growth(old.get("throughput"), new.get("throughput"))
+        if growth is not None and growth < -threshold:
+            regressions.append(f"{name}: throughput {old['throughput']:.1f} -> {new['throughput']:.1f} ({growth:.0%})")
+        if old.get("statements") is not None and new.get("statements") is not None:
+            if new["statements"] > old["statements"]:
+                regressions.append(f"{name}: statements {old['statements']} -> {new['statements']}")
+    return regressions
+
+def report(baseline: dict[str, dict], current: dict[str, dict]) -> None:
+    print(f"{'benchmark':<60}{'p95 before':>12}{'p95 after':>12}{'stmts':>8}")
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        p95 = [value if value is not None else float("nan") for value in (old.get("p95_ms"), new.get("p95_ms"))]
+        statements = f"{old.get('statements')}->{new.get('statements')}"
+        print(f"{name[:59]:<60}{p95[0]:>12.2f}{p95[1]:>12.2f}{statements:>8}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    report(baseline, current)
+    regressions = compare(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
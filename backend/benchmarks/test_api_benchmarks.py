@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+from itertools import count
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app import api, maintenance, models
+from app.database import get_db, get_stream_db
+from app.main import app
+
+HASH = "$2b$04$" + "a" * 53
+BULK_ITEMS = 100
+# Account payloads are bcrypt-hashed per item, so bulk account writes use fewer
+BULK_ACCOUNTS = 10
+NOT_BENCHMARKED = {
+    # Long-lived streams with no response time to measure
+    "stream_schedule",
+    "stream_schedule_websocket",
+}
+
+_unique = count()
+
+def _user() -> dict:
+    n = next(_unique)
+    return {"email": f"api-bench{n}@example.com", "first_name": "B", "last_name": str(n), "phone": "1", "password": "x"}
+
+def _instructor() -> dict:
+    return {**_user(), "email": f"api-cfi{next(_unique)}@example.com", "rating": "CFI"}
+
+def _aircraft() -> dict:
+    return {"registration": f"N-A{next(_unique)}", "type": "single_engine", "model": "C172", "year": 2010}
+
+def _flight(data) -> dict:
+    # Past the generated schedule and three hours apart, so nothing overlaps
+    start = data.until + timedelta(days=400, hours=3 * next(_unique))
+    return {
+        "student_id": 1, "instructor_id": 1, "aircraft_id": 1,
+        "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat(), "duration": 1.0,
+    }
+
+def _insert(db, model, payloads: list) -> list:
+    """Insert rows directly, for the delete and update benchmarks to act on."""
+    rows = []
+    for payload in payloads:
+        row = {key: value for key, value in payload.items() if key != "password"}
+        if "email" in row:
+            row["hashed_password"] = HASH
+        if "start_time" in row:
+            row["start_time"] = datetime.fromisoformat(row["start_time"])
+            row["end_time"] = datetime.fromisoformat(row["end_time"])
+        rows.append(row)
+    return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+
+def _week(data) -> dict:
+    return {"from": (data.until - timedelta(days=7)).isoformat(), "to": data.until.isoformat()}
+
+def _get(url: str):
+    return lambda db, data: lambda: ("GET", url, {})
+
+def _reforecast(db, data):
+    def setup():
+        # As after a booking change: one aircraft is re-forecast, the rest of the fleet's forecasts reused
+        maintenance.forecaster.mark_stale({1})
+        return "GET", "/api/v1/reports/maintenance", {}
+    return setup
+
+# Bulk routes: path -> (model, JSON payload, partial update, items per request)
+BULK_RESOURCES = {
+    "users": (models.User, lambda data: _user(), lambda n: {"phone": str(n)}, BULK_ACCOUNTS),
+    "aircraft": (models.Aircraft, lambda data: _aircraft(), lambda n: {"year": 2000 + n % 20}, BULK_ITEMS),
+    "instructors": (models.Instructor, lambda data: _instructor(), lambda n: {"phone": str(n)}, BULK_ACCOUNTS),
+    "flights": (models.Flight, _flight, lambda n: {"notes": str(n)}, BULK_ITEMS),
+}
+
+def _bulk_cases() -> dict:
+    cases = {}
+    for path, (model, payload, change, size) in BULK_RESOURCES.items():
+        url = f"/api/v1/{path}/bulk"
+        cases[f"bulk_create_{path}"] = lambda db, data, url=url, payload=payload, size=size: lambda: (
+            "POST", url, {"json": [payload(data) for _ in range(size)]}
+        )
+        cases[f"bulk_update_{path}"] = lambda db, data, url=url, change=change, size=size: lambda: (
+            "PUT", url, {"json": [{"id": id, **change(next(_unique))} for id in range(1, size + 1)]}
+        )
+        cases[f"bulk_delete_{path}"] = lambda db, data, url=url, model=model, payload=payload, size=size: lambda: (
+            "DELETE", url, {"json": _insert(db, model, [payload(data) for _ in range(size)])}
+        )
+    return cases
+
+# route name -> (db, dataset) -> setup returning (method, url, request kwargs) for one round
+CASES = {
+    # Users
+    "create_user_endpoint": lambda db, data: lambda: ("POST", "/api/v1/users/", {"json": _user()}),
+    "login_user": lambda db, data: lambda: (
+        "POST", "/api/v1/users/login", {"json": {"email": "student1@example.com", "password": "password"}}
+    ),
+    "read_users": _get("/api/v1/users/"),
+    "read_user": _get("/api/v1/users/1"),
+    "update_user_endpoint": lambda db, data: lambda: ("PUT", "/api/v1/users/1", {"json": _user()}),
+    "delete_user_endpoint": lambda db, data: lambda: (
+        "DELETE", f"/api/v1/users/{_insert(db, models.User, [_user()])[0]}", {}
+    ),
+    "read_logbook": _get("/api/v1/users/1/logbook"),
+    # Aircraft
+    "create_aircraft_endpoint": lambda db, data: lambda: ("POST", "/api/v1/aircraft/", {"json": _aircraft()}),
+    "read_aircrafts": _get("/api/v1/aircraft/"),
+    "read_aircraft": _get("/api/v1/aircraft/1"),
+    "update_aircraft_endpoint": lambda db, data: lambda: ("PUT", "/api/v1/aircraft/1", {"json": _aircraft()}),
+    "delete_aircraft_endpoint": lambda db, data: lambda: (
+        "DELETE", f"/api/v1/aircraft/{_insert(db, models.Aircraft, [_aircraft()])[0]}", {}
+    ),
+    # Instructors
+    "create_instructor_endpoint": lambda db, data: lambda: ("POST", "/api/v1/instructors/", {"json": _instructor()}),
+    "read_instructors": _get("/api/v1/instructors/"),
+    "read_instructor": _get("/api/v1/instructors/1"),
+    "update_instructor_endpoint": lambda db, data: lambda: ("PUT", "/api/v1/instructors/1", {"json": _instructor()}),
+    "delete_instructor_endpoint": lambda db, data: lambda: (
+        "DELETE", f"/api/v1/instructors/{_insert(db, models.Instructor, [_instructor()])[0]}", {}
+    ),
+    # Flights
+    "create_flight_endpoint": lambda db, data: lambda: ("POST", "/api/v1/flights/", {"json": _flight(data)}),
+    "read_flights": _get("/api/v1/flights/"),
+    "export_flights": lambda db, data: lambda: ("GET", "/api/v1/flights/export", {"params": _week(data)}),
+    "read_flight": lambda db, data: lambda: ("GET", f"/api/v1/flights/{data.scale.flights // 2}", {}),
+    "update_flight_endpoint": lambda db, data: lambda: (
+        "PUT", f"/api/v1/flights/{_insert(db, models.Flight, [_flight(data)])[0]}", {"json": _flight(data)}
+    ),
+    "delete_flight_endpoint": lambda db, data: lambda: (
+        "DELETE", f"/api/v1/flights/{_insert(db, models.Flight, [_flight(data)])[0]}", {}
+    ),
+    # Availability
+    "read_availability": lambda db, data: lambda: (
+        "GET", "/api/v1/availability", {"params": {"start_time": data.until.isoformat()}}
+    ),
+    "check_availability": lambda db, data: lambda: ("POST", "/api/check-availability", {"json": {
+        "start_time": data.until.isoformat(), "end_time": (data.until + timedelta(hours=1)).isoformat()
+    }}),
+    "read_available_aircraft": _get("/api/available-aircraft"),
+    "read_available_instructors": _get("/api/available-instructors"),
+    # Delta sync
+    "read_changes": lambda db, data: lambda: (
+        "GET", "/api/v1/sync", {"params": {"since": (data.until - timedelta(days=1)).isoformat()}}
+    ),
+    # Reports
+    "read_utilization": lambda db, data: lambda: (
+        "GET", "/api/v1/reports/utilization", {"params": {"end": data.until.date().isoformat(), "bucket": "week"}}
+    ),
+    "read_maintenance_forecast": _reforecast,
+    **_bulk_cases(),
+}
+
+@pytest.fixture
+def client(db):
+    def override_get_db():
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_stream_db] = lambda: db
+    # No lifespan: the startup hooks would connect to DATABASE_URL, not the benchmark schema
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_route(name, db, dataset, client, measure):
+    def request(method: str, url: str, kwargs: dict):
+        response = client.request(method, url, **kwargs)
+        assert response.status_code < 400, response.text
+
+    measure(request, CASES[name](db, dataset))
+
+def test_every_route_is_benchmarked():
+    # The async read routes are compared against these by benchmarks/async_reads.py
+    names = {route.name for route in api.router.routes + api.legacy_router.routes}
+    assert names - NOT_BENCHMARKED == CASES.keys()
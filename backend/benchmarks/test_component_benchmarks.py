@@ -0,0 +1,153 @@
+"""
+In-process hot paths that need no database: request metrics, the
+availability search and response serialization. A round of the metrics case
+serves a batch of requests, so its percentiles (and the ``benchmarks.results``
+thresholds on them) are per batch. The serialization cases share a group per
+resource, so pytest-benchmark reports the response_model and fast paths side
+by side.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from itertools import count
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import schemas, serializers
+from app.availability import AvailabilityIndex
+from app.metrics import HttpMetrics, MetricsMiddleware
+from app.models import Aircraft, Flight, FlightStatus, FlightType, Instructor, User
+from .conftest import ROUNDS, record_percentiles
+
+ASGI_REQUESTS = 2_000
+# The cost user-011 allowed for recording one request
+METRICS_OVERHEAD_BUDGET_US = 20
+# user-004's fleet (200 aircraft, 50 instructors, 50k upcoming flights) and its single-digit milliseconds
+FLEET_AIRCRAFT, FLEET_INSTRUCTORS, FLEET_BOOKINGS = 200, 50, 50_000
+AVAILABILITY_BUDGET_MS = 10
+MONDAY = datetime(2030, 1, 7, 8, 0)
+SERIALIZED_ROWS = 1000
+
+ASGI_SCOPE = {"type": "http", "method": "GET", "path": "/x"}
+
+async def _asgi_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def _discard(message):
+    pass
+
+def _serve(loop, handler) -> None:
+    async def requests():
+        for _ in range(ASGI_REQUESTS):
+            await handler(dict(ASGI_SCOPE), None, _discard)
+    loop.run_until_complete(requests())
+
+def test_metrics_middleware(benchmark):
+    loop = asyncio.new_event_loop()
+    try:
+        bare = []
+        for _ in range(5):
+            began = time.perf_counter()
+            _serve(loop, _asgi_app)
+            bare.append(time.perf_counter() - began)
+        instrumented = MetricsMiddleware(_asgi_app, HttpMetrics())
+        benchmark.pedantic(_serve, args=(loop, instrumented), rounds=ROUNDS, warmup_rounds=1)
+    finally:
+        loop.close()
+    record_percentiles(benchmark)
+    if benchmark.stats is not None:
+        overhead_us = (benchmark.stats.stats.min - min(bare)) / ASGI_REQUESTS * 1e6
+        benchmark.extra_info["overhead_us"] = overhead_us
+        assert overhead_us < METRICS_OVERHEAD_BUDGET_US
+
+def _fleet_index() -> AvailabilityIndex:
+    aircraft = [
+        Aircraft(id=i, registration=f"N{i}", type="Cessna", model="172", year=2020, is_active=True)
+        for i in range(1, FLEET_AIRCRAFT + 1)
+    ]
+    instructors = [
+        Instructor(
+            id=i, email=f"cfi{i}@example.com", first_name="I", last_name=str(i), phone="1", rating="CFI", is_active=True
+        )
+        for i in range(1, FLEET_INSTRUCTORS + 1)
+    ]
+    spacing = timedelta(minutes=36)
+    bookings = []
+    for k in range(FLEET_BOOKINGS):
+        start = MONDAY + k * spacing
+        bookings.append((1 + k % FLEET_AIRCRAFT, 1 + k % FLEET_INSTRUCTORS, start, start + timedelta(hours=1, minutes=30)))
+    return AvailabilityIndex(aircraft, instructors, bookings)
+
+def test_availability_search(benchmark):
+    index = _fleet_index()
+    months = count()
+
+    def search(start: datetime) -> None:
+        index.check(start, timedelta(hours=2))
+        index.next_slots(start, timedelta(hours=2), start + timedelta(days=7), count=5)
+
+    def setup() -> tuple:
+        # A different month of the schedule each round
+        return (MONDAY + timedelta(days=30 * (next(months) % 20), minutes=7),), {}
+
+    benchmark.pedantic(search, setup=setup, rounds=ROUNDS, warmup_rounds=1)
+    record_percentiles(benchmark)
+    if benchmark.stats is not None:
+        assert benchmark.extra_info["p50_ms"] < AVAILABILITY_BUDGET_MS
+
+def _serializable_rows(resource: str) -> list:
+    start = datetime(2031, 3, 1, 8, 0)
+    factories = {
+        "users": lambda i: User(
+            id=i, email=f"u{i}@example.com", first_name="Ser", last_name=str(i), phone="555-0100", is_active=True
+        ),
+        "aircraft": lambda i: Aircraft(
+            id=i, registration=f"N{i}SR", type="single_engine", model="C172", year=2000 + i % 20, is_active=True
+        ),
+        "instructors": lambda i: Instructor(
+            id=i, email=f"i{i}@example.com", first_name="Ins", last_name=str(i), phone="555-0101",
+            rating="CFI", is_active=True
+        ),
+        "flights": lambda i: Flight(
+            id=i, student_id=1, instructor_id=1, aircraft_id=1,
+            start_time=start + timedelta(hours=i, microseconds=i), end_time=start + timedelta(hours=i + 1),
+            duration=1.5, flight_type=FlightType.training, status=FlightStatus.scheduled, notes=None
+        ),
+    }
+    return [factories[resource](i) for i in range(1, SERIALIZED_ROWS + 1)]
+
+SERIALIZED_RESOURCES = {
+    "users": (schemas.User, serializers.user),
+    "aircraft": (schemas.Aircraft, serializers.aircraft),
+    "instructors": (schemas.Instructor, serializers.instructor),
+    "flights": (schemas.Flight, serializers.flight),
+}
+
+@pytest.mark.parametrize("path", ["response_model", "fast"])
+@pytest.mark.parametrize("resource", SERIALIZED_RESOURCES)
+def test_serialization(benchmark, resource, path):
+    """A page of rows to response bytes: FastAPI's response_model path against serializers' fast path."""
+    schema, serializer = SERIALIZED_RESOURCES[resource]
+    rows = _serializable_rows(resource)
+    if path == "fast":
+        def render() -> bytes:
+            return serializers.render(serializer.many(rows)).body
+    else:
+        field = create_response_field(name=f"Response_{resource}", type_=List[schema])
+
+        def render() -> bytes:
+            # Validate, dump, stdlib json
+            content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=False))
+            return JSONResponse(content).body
+
+    # Each resource's two paths are reported side by side
+    benchmark.group = f"serialize {SERIALIZED_ROWS} {resource}"
+    benchmark.pedantic(render, rounds=ROUNDS, warmup_rounds=1)
+    record_percentiles(benchmark)
+    if benchmark.stats is not None:
+        benchmark.extra_info["rows_per_second"] = SERIALIZED_ROWS / benchmark.stats.stats.median
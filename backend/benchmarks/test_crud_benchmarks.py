@@ -0,0 +1,116 @@
+import inspect
+from datetime import timedelta
+from itertools import count
+
+import pytest
+
+from app import crud, models, schemas
+
+HASH = "$2b$04$" + "a" * 53
+# Pure helpers with no database work
+NOT_BENCHMARKED = {"parse_datetime", "user_values", "instructor_values"}
+
+_unique = count()
+
+def _user() -> schemas.UserCreate:
+    n = next(_unique)
+    return schemas.UserCreate(email=f"bench{n}@example.com", first_name="B", last_name=str(n), phone="1", password="x")
+
+def _instructor() -> schemas.InstructorCreate:
+    n = next(_unique)
+    return schemas.InstructorCreate(
+        email=f"bench-cfi{n}@example.com", first_name="B", last_name=str(n), phone="1", rating="CFI", password="x"
+    )
+
+def _aircraft() -> schemas.AircraftCreate:
+    return schemas.AircraftCreate(registration=f"N-B{next(_unique)}", type="single_engine", model="C172", year=2010)
+
+def _flight(data) -> schemas.FlightCreate:
+    # Past the generated schedule and three hours apart, so nothing overlaps
+    start = data.until + timedelta(days=400, hours=3 * next(_unique))
+    return schemas.FlightCreate(
+        student_id=1, instructor_id=1, aircraft_id=1, start_time=start, end_time=start + timedelta(hours=1), duration=1.0
+    )
+
+def _week(data) -> tuple:
+    return data.until - timedelta(days=7), data.until
+
+# crud function -> (db, dataset) -> (target, setup returning the target's arguments for one round)
+CASES = {
+    # Users
+    "get_user": lambda db, data: (crud.get_user, lambda: (db, 1)),
+    "get_user_by_email": lambda db, data: (crud.get_user_by_email, lambda: (db, "student1@example.com")),
+    "get_users": lambda db, data: (crud.get_users, lambda: (db, 0, 100)),
+    "create_user": lambda db, data: (crud.create_user, lambda: (db, _user(), HASH)),
+    "update_user": lambda db, data: (crud.update_user, lambda: (db, 1, schemas.UserUpdate(phone=str(next(_unique))))),
+    "set_password_hash": lambda db, data: (crud.set_password_hash, lambda: (db, crud.get_user(db, 1), HASH)),
+    "delete_user": lambda db, data: (crud.delete_user, lambda: (db, crud.create_user(db, _user(), HASH).id)),
+    # Aircraft
+    "get_aircraft": lambda db, data: (crud.get_aircraft, lambda: (db, 1)),
+    "get_aircraft_by_registration": lambda db, data: (crud.get_aircraft_by_registration, lambda: (db, "N00001B")),
+    "get_aircrafts": lambda db, data: (crud.get_aircrafts, lambda: (db, 0, 100)),
+    "create_aircraft": lambda db, data: (crud.create_aircraft, lambda: (db, _aircraft())),
+    "update_aircraft": lambda db, data: (
+        crud.update_aircraft, lambda: (db, 1, schemas.AircraftUpdate(year=2000 + next(_unique) % 20))
+    ),
+    "delete_aircraft": lambda db, data: (crud.delete_aircraft, lambda: (db, crud.create_aircraft(db, _aircraft()).id)),
+    # Instructors
+    "get_instructor": lambda db, data: (crud.get_instructor, lambda: (db, 1)),
+    "get_instructor_by_email": lambda db, data: (crud.get_instructor_by_email, lambda: (db, "cfi1@example.com")),
+    "get_instructors": lambda db, data: (crud.get_instructors, lambda: (db, 0, 100)),
+    "create_instructor": lambda db, data: (crud.create_instructor, lambda: (db, _instructor(), HASH)),
+    "update_instructor": lambda db, data: (
+        crud.update_instructor, lambda: (db, 1, schemas.InstructorUpdate(phone=str(next(_unique))))
+    ),
+    "delete_instructor": lambda db, data: (
+        crud.delete_instructor, lambda: (db, crud.create_instructor(db, _instructor(), HASH).id)
+    ),
+    # Flights
+    "get_flight": lambda db, data: (crud.get_flight, lambda: (db, data.scale.flights // 2)),
+    "get_flights": lambda db, data: (crud.get_flights, lambda: (db, 0, 100)),
+    "get_flights_in_range": lambda db, data: (
+        lambda *args: crud.get_flights_in_range(*args, aircraft_id=1), lambda: (db, *_week(data))
+    ),
+    "get_scheduled_flights": lambda db, data: (
+        crud.get_scheduled_flights, lambda: (db, data.until, data.until + timedelta(days=1))
+    ),
+    "iter_flight_rows": lambda db, data: (
+        lambda *args: sum(1 for _ in crud.iter_flight_rows(*args)),
+        lambda: (db, [models.Flight.id, models.Flight.start_time], *_week(data)),
+    ),
+    "create_flight": lambda db, data: (crud.create_flight, lambda: (db, _flight(data))),
+    "update_flight": lambda db, data: (
+        crud.update_flight, lambda: (db, data.scale.flights, schemas.FlightUpdate(notes=str(next(_unique))))
+    ),
+    "delete_flight": lambda db, data: (crud.delete_flight, lambda: (db, crud.create_flight(db, _flight(data)).id)),
+    # HTTP caching and delta sync
+    "get_updated_at": lambda db, data: (crud.get_updated_at, lambda: (db, models.Flight, data.scale.flights)),
+    "get_collection_state": lambda db, data: (crud.get_collection_state, lambda: (db, models.Flight)),
+    "get_changed_rows": lambda db, data: (crud.get_changed_rows, lambda: (db, models.Flight, data.until, 5_000)),
+    "get_rows_changed_at": lambda db, data: (crud.get_rows_changed_at, lambda: (db, models.Aircraft, data.until)),
+    "get_deletions": lambda db, data: (crud.get_deletions, lambda: (db, data.until, 5_000)),
+    "get_deletions_at": lambda db, data: (crud.get_deletions_at, lambda: (db, data.until)),
+    # Logbook
+    "get_logbook_totals": lambda db, data: (crud.get_logbook_totals, lambda: (db, 1)),
+    # Utilization
+    "get_fleet": lambda db, data: (crud.get_fleet, lambda: (db,)),
+    "get_aircraft_daily_usage": lambda db, data: (
+        crud.get_aircraft_daily_usage, lambda: (db, (data.until - timedelta(days=28)).date(), data.until.date())
+    ),
+    # Maintenance forecast
+    "get_maintenance_state": lambda db, data: (crud.get_maintenance_state, lambda: (db,)),
+    "get_upcoming_bookings": lambda db, data: (
+        crud.get_upcoming_bookings, lambda: (db, data.until - timedelta(days=7), data.until + timedelta(days=180))
+    ),
+}
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_crud(name, db, dataset, measure):
+    measure(*CASES[name](db, dataset))
+
+def test_every_crud_function_is_benchmarked():
+    functions = {
+        name for name, function in inspect.getmembers(crud, inspect.isfunction)
+        if function.__module__ == crud.__name__ and not name.startswith("_")
+    }
+    assert functions - NOT_BENCHMARKED == CASES.keys()
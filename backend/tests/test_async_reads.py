@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from datetime import datetime, timedelta
+
+from app.api import NEXT_CURSOR_HEADER
+from app.database import get_async_db, get_stream_db
+from app.main import include_routers
+from app.models import User, Aircraft, Instructor, Flight
+from .conftest import TEST_DATABASE_URL, delete_committed
+
+START = datetime(2032, 6, 1, 8, 0)
+
+@pytest.fixture
+def seeded(engine):
+    """Committed rows: the asyncpg connection cannot see the sync test transaction."""
+    with Session(engine, expire_on_commit=False) as db:
+        student = User(email="async@example.com", first_name="A", last_name="S", phone="1")
+        instructor = Instructor(email="async-cfi@example.com", first_name="A", last_name="I", phone="1", rating="CFI")
+        aircraft = Aircraft(registration="N800", type="Cessna", model="172", year=2020)
+        db.add_all([student, instructor, aircraft])
+        db.flush()
+        flights = [
+            Flight(
+                student_id=student.id,
+                instructor_id=instructor.id,
+                aircraft_id=aircraft.id,
+                start_time=START + timedelta(hours=2 * i),
+                end_time=START + timedelta(hours=2 * i + 1),
+                duration=1.0,
+            )
+            for i in range(3)
+        ]
+        db.add_all(flights)
+        db.commit()
+        yield student, instructor, aircraft, flights
+        delete_committed(db, {
+            Flight: [flight.id for flight in flights],
+            User: [student.id],
+            Instructor: [instructor.id],
+            Aircraft: [aircraft.id],
+        })
+        db.commit()
+
+@pytest.fixture
+def async_client(engine):
+    """The API routers as mounted with ASYNC_READ_ROUTES on."""
+    async_engine = create_async_engine(
+        TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+        poolclass=NullPool,
+        connect_args={'server_settings': {'timezone': 'utc'}}
+    )
+    AsyncTestSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestSession() as db:
+            yield db
+
+    def override_get_stream_db():
+        with Session(engine) as db:
+            yield db
+
+    app = FastAPI()
+    include_routers(app, async_reads=True)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_stream_db] = override_get_stream_db
+    with TestClient(app) as test_client:
+        yield test_client
+
+def test_async_flight_reads(async_client: TestClient, seeded):
+    student, instructor, aircraft, flights = seeded
+    response = async_client.get("/api/v1/flights/", params={"aircraft_id": aircraft.id, "limit": 2})
+    assert response.status_code == 200
+    assert [f["id"] for f in response.json()] == [flights[0].id, flights[1].id]
+
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = async_client.get("/api/v1/flights/", params={"aircraft_id": aircraft.id, "after": cursor})
+    assert [f["id"] for f in response.json()] == [flights[2].id]
+
+    response = async_client.get("/api/v1/flights/", params={
+        "student_id": student.id,
+        "start": (START + timedelta(hours=1)).isoformat() + "Z",
+    })
+    assert [f["id"] for f in response.json()] == [flights[1].id, flights[2].id]
+
+    assert async_client.get(f"/api/v1/flights/{flights[0].id}").json()["status"] == "scheduled"
+    assert async_client.get("/api/v1/flights/999999").status_code == 404
+
+def test_static_flight_routes_are_not_shadowed(async_client: TestClient, seeded):
+    student, instructor, aircraft, flights = seeded
+    response = async_client.get("/api/v1/flights/export", params={"aircraft_id": aircraft.id})
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [flight.id for flight in flights]
+
+def test_async_resource_reads(async_client: TestClient, seeded):
+    student, instructor, aircraft, flights = seeded
+    assert async_client.get(f"/api/v1/users/{student.id}").json()["email"] == "async@example.com"
+    assert async_client.get(f"/api/v1/instructors/{instructor.id}").json()["rating"] == "CFI"
+    assert async_client.get(f"/api/v1/aircraft/{aircraft.id}").json()["registration"] == "N800"
+    assert aircraft.id in [a["id"] for a in async_client.get("/api/v1/aircraft/").json()]
+    assert async_client.get("/api/v1/users/", params={"after": "bogus"}).status_code == 400
+
+def test_async_sparse_fieldsets(async_client: TestClient, seeded):
+    student, instructor, aircraft, flights = seeded
+    response = async_client.get("/api/v1/flights/", params={"aircraft_id": aircraft.id, "limit": 2, "fields": "aircraft_id,id"})
+    assert response.json() == [{"id": flight.id, "aircraft_id": aircraft.id} for flight in flights[:2]]
+    assert NEXT_CURSOR_HEADER in response.headers
+
+    response = async_client.get(f"/api/v1/aircraft/{aircraft.id}", params={"fields": "registration"})
+    assert response.json() == {"registration": "N800"}
@@ -0,0 +1,141 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from app import availability
+from app.availability import AvailabilityIndex, Timeline, parse_weekly_availability
+from app.models import Aircraft, Instructor, User, FlightType
+
+MONDAY = datetime(2030, 1, 7, 8, 0)
+
+def _aircraft(id, **extra):
+    return Aircraft(id=id, registration=f"N{id}", type="Cessna", model="172", year=2020, is_active=True, **extra)
+
+def _instructor(id, **extra):
+    fields = {"rating": "CFI", "is_active": True, **extra}
+    return Instructor(id=id, email=f"cfi{id}@example.com", first_name="I", last_name=str(id), phone="1", **fields)
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    availability.invalidate()
+    yield
+    availability.invalidate()
+
+def test_timeline_earliest_fit():
+    timeline = Timeline()
+    timeline.add(MONDAY, MONDAY + timedelta(hours=1))
+    timeline.add(MONDAY + timedelta(hours=2), MONDAY + timedelta(hours=3))
+
+    assert timeline.earliest_fit(MONDAY - timedelta(hours=1), timedelta(hours=1)) == MONDAY - timedelta(hours=1)
+    assert timeline.earliest_fit(MONDAY, timedelta(hours=1)) == MONDAY + timedelta(hours=1)
+    assert timeline.earliest_fit(MONDAY, timedelta(hours=2)) == MONDAY + timedelta(hours=3)
+
+def test_parse_weekly_availability():
+    assert parse_weekly_availability("Mon-Fri 9am-5pm") == {day: [(540, 1020)] for day in range(5)}
+    assert parse_weekly_availability("Sat 08:00-12:30; weekdays 6pm-9pm")[5] == [(480, 750)]
+    assert parse_weekly_availability("Fri-Mon 9am-5pm").keys() == {4, 5, 6, 0}
+    assert parse_weekly_availability("ask me") is None
+    assert parse_weekly_availability(None) is None
+
+def test_check_flags_busy_grounded_and_maintenance_due():
+    index = AvailabilityIndex(
+        aircraft=[
+            _aircraft(1),
+            _aircraft(2),
+            _aircraft(3, status="Maintenance"),
+            _aircraft(4, next_maintenance=MONDAY + timedelta(minutes=30)),
+        ],
+        instructors=[_instructor(1), _instructor(2, availability="Mon-Fri 9am-5pm")],
+        bookings=[(1, None, MONDAY - timedelta(minutes=30), MONDAY + timedelta(minutes=30))],
+    )
+    aircraft, instructors = index.check(MONDAY, timedelta(hours=1))
+    assert [(a.id, free) for a, free in aircraft] == [(1, False), (2, True), (3, False), (4, False)]
+    # Instructor 2 only starts work at 09:00
+    assert [(i.id, free) for i, free in instructors] == [(1, True), (2, False)]
+
+def test_next_slots_skip_busy_time_and_respect_working_hours():
+    index = AvailabilityIndex(
+        aircraft=[_aircraft(1)],
+        instructors=[_instructor(1, availability="Mon-Fri 9am-5pm")],
+        bookings=[(1, 1, MONDAY + timedelta(hours=1), MONDAY + timedelta(hours=3))],
+    )
+    slots = index.next_slots(MONDAY, timedelta(hours=2), MONDAY + timedelta(days=1), count=2)
+    assert [slot["start_time"] for slot in slots] == [
+        MONDAY + timedelta(hours=3),
+        MONDAY + timedelta(hours=3, minutes=15),
+    ]
+    assert slots[0]["aircraft_ids"] == [1]
+    assert slots[0]["instructor_ids"] == [1]
+
+def test_next_slots_by_flight_type():
+    index = AvailabilityIndex(
+        aircraft=[_aircraft(1)],
+        instructors=[_instructor(1), _instructor(2, rating="CFI, CFII")],
+        bookings=[(None, 2, MONDAY, MONDAY + timedelta(hours=4))],
+    )
+    solo = index.next_slots(MONDAY, timedelta(hours=1), MONDAY + timedelta(days=1), count=1, flight_type=FlightType.solo)
+    assert solo[0]["start_time"] == MONDAY
+    assert solo[0]["instructor_ids"] == []
+
+    instrument = index.next_slots(MONDAY, timedelta(hours=1), MONDAY + timedelta(days=1), count=1, flight_type=FlightType.instrument)
+    assert instrument[0]["start_time"] == MONDAY + timedelta(hours=4)
+    assert instrument[0]["instructor_ids"] == [2]
+
+def test_availability_search_at_fleet_scale():
+    # Timed in benchmarks/test_component_benchmarks.py
+    aircraft = [_aircraft(i) for i in range(1, 201)]
+    instructors = [_instructor(i) for i in range(1, 51)]
+    spacing = timedelta(minutes=36)
+    bookings = [
+        (1 + k % 200, 1 + k % 50, MONDAY + k * spacing, MONDAY + k * spacing + timedelta(hours=1, minutes=30))
+        for k in range(50_000)
+    ]
+    index = AvailabilityIndex(aircraft, instructors, bookings)
+
+    for k in range(20):
+        start = MONDAY + timedelta(days=30 * k, minutes=7)
+        aircraft_free, instructors_free = index.check(start, timedelta(hours=2))
+        assert len(aircraft_free) == 200 and len(instructors_free) == 50
+        slots = index.next_slots(start, timedelta(hours=2), start + timedelta(days=7), count=5)
+        assert len(slots) == 5
+        assert all(start <= slot["start_time"] < start + timedelta(days=7) for slot in slots)
+
+def test_read_availability(client: TestClient, db_session):
+    student = User(email="s@example.com", first_name="S", last_name="S", phone="1")
+    instructor = Instructor(email="i@example.com", first_name="I", last_name="I", phone="1", rating="CFI", is_active=True)
+    booked, free = (Aircraft(registration=r, type="Cessna", model="172", year=2020, is_active=True) for r in ("N401", "N402"))
+    db_session.add_all([student, instructor, booked, free])
+    db_session.commit()
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    client.post("/api/v1/flights/", json={
+        "student_id": student.id,
+        "instructor_id": instructor.id,
+        "aircraft_id": booked.id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=2)).isoformat(),
+        "duration": 2.0,
+    })
+
+    response = client.get("/api/v1/availability", params={
+        "start_time": (start + timedelta(hours=1)).isoformat(),
+        "duration": 1,
+        "flight_type": "solo",
+        "slots": 1,
+    })
+    assert response.status_code == 200
+    data = response.json()
+    flags = {a["id"]: a["available"] for a in data["aircraft"]}
+    assert flags[booked.id] is False
+    assert flags[free.id] is True
+    assert data["next_slots"][0]["aircraft_ids"] == [free.id]
+
+def test_legacy_check_availability(client: TestClient, db_session):
+    db_session.add(Aircraft(registration="N501", type="Cessna", model="172", year=2020, is_active=True))
+    db_session.commit()
+    start = datetime.utcnow() + timedelta(days=2)
+    response = client.post("/api/check-availability", json={
+        "start_time": start.isoformat() + "Z",
+        "end_time": (start + timedelta(hours=1)).isoformat() + "Z",
+    })
+    assert response.status_code == 200
+    assert [a["available"] for a in response.json()["aircraft"]] == [True]
@@ -0,0 +1,124 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from app.models import User, Aircraft, Instructor, Flight
+from .conftest import count_statements
+
+START = datetime(2031, 1, 1, 6, 0)
+
+@pytest.fixture
+def people(db_session):
+    student = User(email="bulk@example.com", first_name="S", last_name="S", phone="1")
+    # One instructor per aircraft so each pair can fly concurrently
+    fleet = [Aircraft(registration=f"N7{i:02d}", type="Cessna", model="172", year=2020) for i in range(10)]
+    staff = [
+        Instructor(email=f"bulk-cfi{i}@example.com", first_name="I", last_name=str(i), phone="1", rating="CFI")
+        for i in range(10)
+    ]
+    db_session.add_all([student, *fleet, *staff])
+    db_session.commit()
+    return student, fleet, staff
+
+def _flight(student, pair, start, **extra):
+    aircraft, instructor = pair
+    return {
+        "student_id": student.id,
+        "instructor_id": instructor.id,
+        "aircraft_id": aircraft.id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "duration": 1.0,
+        **extra,
+    }
+
+def test_bulk_create_users_reports_each_item(client: TestClient, db_session):
+    response = client.post("/api/v1/users/bulk", json=[
+        {"email": "a@example.com", "first_name": "A", "last_name": "A", "phone": "1", "password": "pw"},
+        {"email": "b@example.com", "first_name": "B"},
+        {"email": "a@example.com", "first_name": "A", "last_name": "A", "phone": "1", "password": "pw"},
+        {"email": "c@example.com", "first_name": "C", "last_name": "C", "phone": "1", "password": "pw"},
+    ])
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (2, 2)
+    assert [r["status"] for r in data["results"]] == ["created", "failed", "failed", "created"]
+    assert "last_name" in data["results"][1]["error"]
+    assert data["results"][2]["error"] == "Email already registered"
+    created = db_session.get(User, data["results"][0]["id"])
+    assert created.hashed_password and created.hashed_password != "pw"
+
+def test_bulk_create_flights_from_ndjson(client: TestClient, db_session, people):
+    student, fleet, staff = people
+    pairs = list(zip(fleet, staff))
+    lines = [json.dumps(_flight(student, pairs[i], START + timedelta(hours=2 * i))) for i in range(3)]
+    lines.insert(1, "{not json")
+    response = client.post(
+        "/api/v1/flights/bulk",
+        content="\n".join(lines) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["created", "failed", "created", "created"]
+    assert data["results"][1]["error"] == "Invalid JSON"
+    assert db_session.query(Flight).count() == 3
+
+def test_bulk_create_flights_isolates_conflicts(client: TestClient, db_session, people):
+    student, fleet, staff = people
+    pairs = list(zip(fleet, staff))
+    items = [_flight(student, pairs[0], START + timedelta(hours=i)) for i in range(8)]
+    items[5] = _flight(student, pairs[0], START + timedelta(hours=2, minutes=30))
+    items.append(_flight(student, pairs[1], START, aircraft_id=999999))
+    response = client.post("/api/v1/flights/bulk", json=items)
+    results = response.json()["results"]
+    assert [r["index"] for r in results if r["status"] == "failed"] == [5, 8]
+    assert results[5]["error"] == "Aircraft is already booked for this time"
+    assert results[8]["error"] == "Aircraft not found"
+    assert db_session.query(Flight).count() == 7
+
+def test_bulk_update_and_delete(client: TestClient, db_session, people):
+    fleet = people[1]
+    response = client.put("/api/v1/aircraft/bulk", json=[
+        {"id": fleet[0].id, "model": "172S"},
+        {"id": 999999, "model": "152"},
+        {"model": "152"},
+        {"id": fleet[1].id, "registration": fleet[2].registration},
+    ])
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["updated", "failed", "failed", "failed"]
+    assert results[1]["error"] == "Not found"
+    assert results[3]["error"] == "Registration already registered"
+    db_session.expire_all()
+    assert db_session.get(Aircraft, fleet[0].id).model == "172S"
+
+    response = client.request("DELETE", "/api/v1/aircraft/bulk", json=[fleet[0].id, {"id": fleet[1].id}, 999999])
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "deleted", "failed"]
+    assert db_session.query(Aircraft).filter(Aircraft.id == fleet[0].id).first() is None
+
+def test_bulk_delete_keeps_referenced_rows(client: TestClient, db_session, people):
+    student, fleet, staff = people
+    pairs = list(zip(fleet, staff))
+    client.post("/api/v1/flights/bulk", json=[_flight(student, pairs[0], START)])
+    response = client.request("DELETE", "/api/v1/aircraft/bulk", json=[fleet[0].id, fleet[1].id])
+    results = response.json()["results"]
+    assert results[0]["error"] == "Still referenced by flights"
+    assert results[1]["status"] == "deleted"
+
+def test_bulk_rejects_non_array_body(client: TestClient):
+    response = client.post("/api/v1/users/bulk", json={"email": "a@example.com"})
+    assert response.status_code == 400
+
+def test_bulk_create_is_batched(client: TestClient, engine, people):
+    student, fleet, staff = people
+    pairs = list(zip(fleet, staff))
+    items = [
+        _flight(student, pairs[i % len(pairs)], START + timedelta(hours=i // len(pairs)))
+        for i in range(10_000)
+    ]
+    with count_statements(engine) as statements:
+        response = client.post("/api/v1/flights/bulk", json=items)
+    assert response.json()["succeeded"] == 10_000
+    inserts = [statement for statement in statements if statement.startswith("INSERT INTO flights")]
+    # Multi-row INSERT ... VALUES pages rather than a round trip per flight
+    assert 0 < len(inserts) <= 20
@@ -0,0 +1,122 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import crud, entity_cache
+from app.config import settings
+from app.entity_cache import EntityCache
+from app.models import Aircraft, Instructor
+from .conftest import count_statements, delete_committed
+
+@pytest.fixture
+def plane(db_session):
+    aircraft = Aircraft(registration="N-CACHE", type="single_engine", model="C172", year=2010, is_active=True)
+    db_session.add(aircraft)
+    db_session.commit()
+    db_session.expunge_all()
+    return aircraft
+
+def test_reads_are_served_from_the_cache(client: TestClient, engine, plane):
+    url = f"/api/v1/aircraft/{plane.id}"
+    assert client.get(url).json()["registration"] == "N-CACHE"
+    hits = entity_cache.cache.hits
+    with count_statements(engine) as statements:
+        assert client.get(url).json()["registration"] == "N-CACHE"
+    assert statements == []
+    assert entity_cache.cache.hits == hits + 1
+
+def test_local_writes_evict_on_commit(client: TestClient, plane):
+    url = f"/api/v1/aircraft/{plane.id}"
+    client.get(url)
+    payload = {"registration": "N-CACHE", "type": "single_engine", "model": "C172S", "year": 2011}
+    assert client.put(url, json=payload).status_code == 200
+    assert client.get(url).json()["model"] == "C172S"
+
+    assert client.put("/api/v1/aircraft/bulk", json=[{"id": plane.id, "year": 2015}]).status_code == 200
+    assert client.get(url).json()["year"] == 2015
+
+    assert client.delete(url).status_code == 200
+    assert client.get(url).status_code == 404
+
+def test_each_session_gets_its_own_copy(db_session, plane):
+    first = crud.get_aircraft(db_session, plane.id)
+    db_session.expunge_all()
+    cached = crud.get_aircraft(db_session, plane.id)
+    assert cached is not first
+    cached.model = "Changed but not committed"
+    db_session.rollback()
+
+    with Session(bind=db_session.connection()) as other:
+        assert crud.get_aircraft(other, plane.id).model == "C172"
+
+def test_uncommitted_writes_are_not_cached(db_session, plane):
+    db_session.execute(text("UPDATE aircraft SET model = 'Rolled back' WHERE id = :id"), {"id": plane.id})
+    instructor = Instructor(email="cache-cfi@example.com", first_name="C", last_name="F", phone="1", rating="CFI")
+    db_session.add(instructor)
+    db_session.flush()
+    instructor.rating = "CFII"
+    db_session.flush()
+    crud.get_aircraft(db_session, plane.id)
+    assert ("aircraft", plane.id) not in entity_cache.cache._entries
+
+def test_switch_bypasses_the_cache(db_session, plane, monkeypatch):
+    monkeypatch.setattr(settings, "ENTITY_CACHE_ENABLED", False)
+    crud.get_aircraft(db_session, plane.id)
+    assert ("aircraft", plane.id) not in entity_cache.cache._entries
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = EntityCache(max_entries=2, ttl=60)
+    for i in range(3):
+        cache.put(("aircraft", i), i, cache.generation)
+    assert cache.get(("aircraft", 0)) is None
+    assert cache.get(("aircraft", 1)) == 1
+    cache.put(("aircraft", 3), 3, cache.generation)
+    # 1 was used more recently than 2
+    assert cache.get(("aircraft", 2)) is None
+    assert cache.stats()["evictions"] == 2
+
+    clock = time.monotonic()
+    monkeypatch.setattr(entity_cache.time, "monotonic", lambda: clock + 61)
+    assert cache.get(("aircraft", 1)) is None
+    assert cache.stats()["expirations"] == 1
+
+def test_load_racing_an_invalidation_is_dropped():
+    cache = EntityCache(max_entries=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate(("aircraft", 1))
+    cache.put(("aircraft", 1), "stale", generation)
+    assert cache.get(("aircraft", 1)) is None
+
+def test_notify_invalidates_across_workers(engine):
+    """A commit from another connection (another worker) evicts the row through the trigger."""
+    with Session(engine, expire_on_commit=False) as db:
+        aircraft = Aircraft(registration="N-NOTIFY", type="single_engine", model="C182", year=2005)
+        db.add(aircraft)
+        db.commit()
+    listener = entity_cache._Listener(engine)
+    listener.start()
+    try:
+        assert listener.listening.wait(5)
+        with Session(engine) as db:
+            crud.get_aircraft(db, aircraft.id)
+        assert ("aircraft", aircraft.id) in entity_cache.cache._entries
+
+        with engine.begin() as connection:
+            connection.execute(text("UPDATE aircraft SET year = 2006 WHERE id = :id"), {"id": aircraft.id})
+        deadline = time.monotonic() + 5
+        while ("aircraft", aircraft.id) in entity_cache.cache._entries and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ("aircraft", aircraft.id) not in entity_cache.cache._entries
+    finally:
+        listener.stop()
+        listener.join(5)
+        with engine.begin() as connection:
+            delete_committed(connection, {Aircraft: [aircraft.id]})
+
+def test_cache_metrics(client: TestClient):
+    body = client.get("/metrics").text
+    assert "entity_cache_hits_total" in body
+    assert "entity_cache_evictions_total" in body
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import export
+from app.models import Aircraft, Flight, FlightStatus, FlightType, Instructor, User
+
+START = datetime(2032, 1, 10, 9, 0)
+
+@pytest.fixture
+def logbook(db_session):
+    students = [
+        User(email=f"export{i}@example.com", first_name="Export", last_name=str(i), phone="1", is_active=True)
+        for i in range(2)
+    ]
+    plane = Aircraft(registration="N-EXP1", type="single_engine", model="C172", year=2012, is_active=True)
+    teacher = Instructor(
+        email="export-cfi@example.com", first_name="Export", last_name="Cfi", phone="2", rating="CFI", is_active=True
+    )
+    db_session.add_all([*students, plane, teacher])
+    db_session.flush()
+    flights = [
+        Flight(
+            student_id=students[day % 2].id, instructor_id=teacher.id, aircraft_id=plane.id,
+            start_time=START + timedelta(days=day), end_time=START + timedelta(days=day, hours=1, minutes=30),
+            duration=1.5, flight_type=FlightType.cross_country if day % 2 else None,
+            status=FlightStatus.completed if day < 3 else FlightStatus.scheduled,
+            notes='Crosswind, "gusty"' if day == 1 else None
+        )
+        for day in range(5)
+    ]
+    db_session.add_all(flights)
+    db_session.commit()
+    return {"students": [s.id for s in students], "flights": [f.id for f in flights]}
+
+def test_ndjson_export_matches_flight_listing(client: TestClient, logbook):
+    response = client.get("/api/v1/flights/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == client.get("/api/v1/flights/", params={"limit": 1000}).json()
+
+def test_csv_export(client: TestClient, logbook):
+    response = client.get("/api/v1/flights/export", params={"format": "csv", "student_id": logbook["students"][1]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="flights.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == list(export.FIELDS)
+    assert [int(row["id"]) for row in rows] == logbook["flights"][1::2]
+    assert rows[0]["start_time"] == (START + timedelta(days=1)).isoformat()
+    assert rows[0]["flight_type"] == "cross_country"
+    assert rows[0]["status"] == "completed"
+    assert rows[0]["notes"] == 'Crosswind, "gusty"'
+    assert rows[1]["notes"] == ""
+
+def test_export_filters(client: TestClient, logbook):
+    params = {"from": (START + timedelta(days=1)).isoformat(), "to": (START + timedelta(days=4)).isoformat()}
+    ids = [json.loads(line)["id"] for line in client.get("/api/v1/flights/export", params=params).text.splitlines()]
+    assert ids == logbook["flights"][1:4]
+
+    params = {"student_id": logbook["students"][0], "status": "completed"}
+    ids = [json.loads(line)["id"] for line in client.get("/api/v1/flights/export", params=params).text.splitlines()]
+    assert ids == [logbook["flights"][0], logbook["flights"][2]]
+
+def test_export_rejects_unknown_format(client: TestClient):
+    assert client.get("/api/v1/flights/export", params={"format": "xml"}).status_code == 422
+
+def test_export_is_chunked_per_batch(db_session, logbook):
+    chunks = list(export.stream_flights(db_session, "csv", batch_size=2))
+    # Header first, then one chunk per batch of rows
+    assert chunks[0] == (",".join(export.FIELDS) + "\r\n").encode()
+    assert [chunk.count(b"\r\n") for chunk in chunks[1:]] == [2, 2, 1]
@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+from app.models import Aircraft, Flight, Instructor, User
+from .conftest import count_statements
+
+START = datetime(2033, 2, 1, 7, 0)
+
+@pytest.fixture
+def schedule(db_session):
+    student = User(email="sparse@example.com", first_name="Sparse", last_name="Student", phone="1", is_active=True)
+    plane = Aircraft(registration="N-SPRS", type="single_engine", model="C152", year=1979, is_active=True)
+    teacher = Instructor(
+        email="sparse-cfi@example.com", first_name="Sparse", last_name="Cfi", phone="2", rating="CFI", is_active=True
+    )
+    db_session.add_all([student, plane, teacher])
+    db_session.flush()
+    flights = [
+        Flight(
+            student_id=student.id, instructor_id=teacher.id, aircraft_id=plane.id,
+            start_time=START + timedelta(hours=3 * i), end_time=START + timedelta(hours=3 * i + 1),
+            duration=1.0, notes="Long debrief " * 50
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(flights)
+    db_session.commit()
+    return student, plane, flights
+
+def test_flight_list_returns_only_requested_fields(client: TestClient, engine, schedule):
+    student, plane, flights = schedule
+    with count_statements(engine) as statements:
+        response = client.get("/api/v1/flights/", params={
+            "aircraft_id": plane.id, "fields": "start_time,aircraft_id,id,end_time"
+        })
+    assert response.status_code == 200
+    # Schema order, whatever order they were asked for in
+    assert response.json() == [
+        {
+            "aircraft_id": plane.id,
+            "start_time": flight.start_time.isoformat(),
+            "end_time": flight.end_time.isoformat(),
+            "id": flight.id,
+        }
+        for flight in flights
+    ]
+    select = next(statement for statement in statements if "FROM flights" in statement)
+    assert "flights.notes" not in select
+    assert "flights.student_id" not in select
+
+def test_sparse_pages_keep_their_cursor(client: TestClient, schedule):
+    student, plane, flights = schedule
+    params = {"student_id": student.id, "limit": 2, "fields": "duration"}
+    response = client.get("/api/v1/flights/", params=params)
+    assert response.json() == [{"duration": 1.0}, {"duration": 1.0}]
+
+    params["after"] = response.headers["X-Next-Cursor"]
+    assert client.get("/api/v1/flights/", params=params).json() == [{"duration": 1.0}]
+
+def test_sparse_detail(client: TestClient, schedule):
+    student, plane, flights = schedule
+    response = client.get(f"/api/v1/users/{student.id}", params={"fields": "email, last_name"})
+    assert response.json() == {"email": "sparse@example.com", "last_name": "Student"}
+
+    response = client.get(f"/api/v1/aircraft/{plane.id}", params={"fields": "registration,year"})
+    assert response.json() == {"registration": "N-SPRS", "year": 1979}
+
+@pytest.mark.parametrize("fields", ["id,hashed_password", "", "notes,bogus"])
+def test_unknown_fields_are_rejected(client: TestClient, fields):
+    for url in ("/api/v1/users/", "/api/v1/users/1"):
+        response = client.get(url, params={"fields": fields})
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Unknown fields")
+
+def test_instructor_fields_are_validated_against_the_instructor_schema(client: TestClient):
+    assert client.get("/api/v1/instructors/", params={"fields": "rating"}).status_code == 200
+    assert client.get("/api/v1/users/", params={"fields": "rating"}).status_code == 400
@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from app.models import User, Aircraft, Instructor
+
+START = datetime(2030, 3, 1, 9, 0)
+
+@pytest.fixture
+def resources(db_session):
+    students = [User(email=f"s{i}@example.com", first_name="S", last_name=str(i), phone="1") for i in range(2)]
+    instructors = [Instructor(email=f"i{i}@example.com", first_name="I", last_name=str(i), phone="1", rating="CFI") for i in range(2)]
+    aircraft = [Aircraft(registration=f"N30{i}", type="Cessna", model="172", year=2020) for i in range(2)]
+    db_session.add_all(students + instructors + aircraft)
+    db_session.commit()
+    return students, instructors, aircraft
+
+def _flight(student, instructor, aircraft, start=START, hours=2, **extra):
+    return {
+        "student_id": student.id,
+        "instructor_id": instructor.id,
+        "aircraft_id": aircraft.id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=hours)).isoformat(),
+        "duration": float(hours),
+        **extra,
+    }
+
+def test_overlapping_aircraft_booking_conflicts(client: TestClient, resources):
+    students, instructors, aircraft = resources
+    assert client.post("/api/v1/flights/", json=_flight(students[0], instructors[0], aircraft[0])).status_code == 201
+
+    response = client.post(
+        "/api/v1/flights/",
+        json=_flight(students[1], instructors[1], aircraft[0], start=START + timedelta(hours=1)),
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Aircraft is already booked for this time"
+
+def test_overlapping_instructor_booking_conflicts(client: TestClient, resources):
+    students, instructors, aircraft = resources
+    assert client.post("/api/v1/flights/", json=_flight(students[0], instructors[0], aircraft[0])).status_code == 201
+
+    response = client.post(
+        "/api/v1/flights/",
+        json=_flight(students[1], instructors[0], aircraft[1], start=START + timedelta(minutes=30)),
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Instructor is already booked for this time"
+
+def test_back_to_back_and_cancelled_bookings_allowed(client: TestClient, resources):
+    students, instructors, aircraft = resources
+    first = client.post("/api/v1/flights/", json=_flight(students[0], instructors[0], aircraft[0]))
+    assert first.status_code == 201
+    assert first.json()["status"] == "scheduled"
+
+    # Ranges are half-open, so a flight may start exactly when the previous one ends
+    response = client.post(
+        "/api/v1/flights/",
+        json=_flight(students[1], instructors[0], aircraft[0], start=START + timedelta(hours=2)),
+    )
+    assert response.status_code == 201
+
+    cancelled = client.post(
+        "/api/v1/flights/",
+        json=_flight(students[1], instructors[0], aircraft[0], start=START + timedelta(hours=1), status="cancelled"),
+    )
+    assert cancelled.status_code == 201
+
+def test_update_into_overlap_conflicts(client: TestClient, resources):
+    students, instructors, aircraft = resources
+    client.post("/api/v1/flights/", json=_flight(students[0], instructors[0], aircraft[0]))
+    later = _flight(students[1], instructors[1], aircraft[0], start=START + timedelta(hours=4))
+    flight_id = client.post("/api/v1/flights/", json=later).json()["id"]
+
+    moved = dict(later, start_time=(START + timedelta(hours=1)).isoformat(), end_time=(START + timedelta(hours=3)).isoformat())
+    response = client.put(f"/api/v1/flights/{flight_id}", json=moved)
+    assert response.status_code == 409
+
+def test_end_before_start_rejected(client: TestClient, resources):
+    students, instructors, aircraft = resources
+    response = client.post("/api/v1/flights/", json=_flight(students[0], instructors[0], aircraft[0], hours=-1))
+    assert response.status_code == 422
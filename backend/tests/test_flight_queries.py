@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app import crud
+from app.models import User, Aircraft, Instructor, Flight, FlightType, FlightStatus
+
+BASE_TIME = datetime(2030, 1, 1, 9, 0)
+
+@pytest.fixture
+def fleet(db_session):
+    students = [User(email=f"student{i}@example.com", first_name="Student", last_name=str(i)) for i in range(2)]
+    instructors = [Instructor(email=f"cfi{i}@example.com", first_name="Instructor", last_name=str(i)) for i in range(2)]
+    aircraft = [Aircraft(registration=f"N10{i}", type="Cessna", model="172", year=2020) for i in range(2)]
+    db_session.add_all(students + instructors + aircraft)
+    db_session.flush()
+
+    flights = []
+    for day in range(6):
+        start = BASE_TIME + timedelta(days=day)
+        flights.append(Flight(
+            student_id=students[day % 2].id,
+            instructor_id=instructors[day % 2].id,
+            aircraft_id=aircraft[day % 2].id,
+            flight_type=FlightType.training,
+            status=FlightStatus.scheduled if day % 3 else FlightStatus.completed,
+            start_time=start,
+            end_time=start + timedelta(hours=2),
+            duration=2.0,
+        ))
+    db_session.add_all(flights)
+    db_session.commit()
+    return {"students": students, "instructors": instructors, "aircraft": aircraft, "flights": flights}
+
+def test_flight_indexes_declared():
+    index_names = {index.name for index in Flight.__table__.indexes}
+    assert {
+        "ix_flights_aircraft_id_start_time",
+        "ix_flights_instructor_id_start_time",
+        "ix_flights_student_id_start_time",
+        "ix_flights_scheduled_start_time",
+    } <= index_names
+
+def test_get_flights_in_range_by_aircraft(db_session, fleet):
+    aircraft_id = fleet["aircraft"][0].id
+    flights = crud.get_flights_in_range(
+        db_session,
+        start=BASE_TIME,
+        end=BASE_TIME + timedelta(days=4),
+        aircraft_id=aircraft_id,
+    )
+    assert [f.start_time for f in flights] == [BASE_TIME, BASE_TIME + timedelta(days=2)]
+    assert all(f.aircraft_id == aircraft_id for f in flights)
+
+def test_get_flights_in_range_end_is_exclusive(db_session, fleet):
+    flights = crud.get_flights_in_range(
+        db_session,
+        start=BASE_TIME + timedelta(days=1),
+        end=BASE_TIME + timedelta(days=3),
+        student_id=fleet["students"][1].id,
+    )
+    assert [f.start_time for f in flights] == [BASE_TIME + timedelta(days=1)]
+
+def test_get_scheduled_flights(db_session, fleet):
+    flights = crud.get_scheduled_flights(db_session, start=BASE_TIME, end=BASE_TIME + timedelta(days=6))
+    assert len(flights) == 4
+    assert all(f.status == FlightStatus.scheduled for f in flights)
+    assert flights == sorted(flights, key=lambda f: f.start_time)
+
+def test_read_flights_filters(client, fleet):
+    instructor_id = fleet["instructors"][1].id
+    response = client.get(
+        "/api/v1/flights/",
+        params={
+            "instructor_id": instructor_id,
+            "start": (BASE_TIME + timedelta(days=2)).isoformat(),
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert all(f["instructor_id"] == instructor_id for f in data)
@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from app.models import User, Aircraft, Instructor, Flight
+from .conftest import count_statements
+
+START = datetime(2030, 4, 1, 9, 0)
+
+@pytest.fixture
+def flight_data(db_session):
+    student = User(email="writer@example.com", first_name="S", last_name="S", phone="1")
+    instructor = Instructor(email="writer-cfi@example.com", first_name="I", last_name="I", phone="1", rating="CFI")
+    aircraft = Aircraft(registration="N600", type="Cessna", model="172", year=2020)
+    db_session.add_all([student, instructor, aircraft])
+    db_session.commit()
+    return {
+        "student_id": student.id,
+        "instructor_id": instructor.id,
+        "aircraft_id": aircraft.id,
+        "start_time": START.isoformat(),
+        "end_time": (START + timedelta(hours=1)).isoformat(),
+        "duration": 1.0,
+    }
+
+def test_create_flight_is_a_single_statement(client: TestClient, engine, flight_data):
+    with count_statements(engine) as statements:
+        response = client.post("/api/v1/flights/", json=flight_data)
+    assert response.status_code == 201
+    assert response.json()["status"] == "scheduled"
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO flights")
+    assert "RETURNING" in statements[0]
+
+def test_update_flight_is_a_single_statement(client: TestClient, engine, flight_data):
+    flight_id = client.post("/api/v1/flights/", json=flight_data).json()["id"]
+    with count_statements(engine) as statements:
+        response = client.put(f"/api/v1/flights/{flight_id}", json=dict(flight_data, notes="Moved"))
+    assert response.status_code == 200
+    assert response.json()["notes"] == "Moved"
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE flights")
+
+@pytest.mark.parametrize("field,detail", [
+    ("student_id", "Student not found"),
+    ("instructor_id", "Instructor not found"),
+    ("aircraft_id", "Aircraft not found"),
+])
+def test_create_flight_missing_reference(client: TestClient, flight_data, field, detail):
+    response = client.post("/api/v1/flights/", json=dict(flight_data, **{field: 999999}))
+    assert response.status_code == 404
+    assert response.json()["detail"] == detail
+
+def test_update_missing_flight(client: TestClient, flight_data):
+    response = client.put("/api/v1/flights/999999", json=flight_data)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Flight not found"
+
+def test_rolled_back_conflict_keeps_the_tests_earlier_writes(client: TestClient, db_session, flight_data):
+    """The endpoint's rollback only returns to the harness SAVEPOINT, not past the fixture's rows."""
+    first = client.post("/api/v1/flights/", json=flight_data).json()["id"]
+    assert client.post("/api/v1/flights/", json=flight_data).status_code == 409
+    assert db_session.get(Aircraft, flight_data["aircraft_id"]) is not None
+    assert db_session.get(Flight, first) is not None
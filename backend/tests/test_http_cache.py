@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.models import Aircraft, Flight, Instructor, User
+
+@pytest.fixture
+def fleet(db_session):
+    planes = [
+        Aircraft(registration=f"N-ETG{i}", type="single_engine", model="PA-28", year=2001 + i, is_active=True)
+        for i in range(3)
+    ]
+    db_session.add_all(planes)
+    db_session.commit()
+    return planes
+
+def test_collection_revalidates_with_etag(client: TestClient, fleet, query_budget):
+    response = client.get("/api/v1/aircraft/")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert "Last-Modified" in response.headers
+
+    # The 304 is answered from the collection state alone
+    with query_budget(1):
+        cached = client.get("/api/v1/aircraft/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # Each page and fieldset has its own tag
+    assert client.get("/api/v1/aircraft/", params={"limit": 2}).headers["ETag"] != etag
+    assert client.get("/api/v1/aircraft/", params={"fields": "id"}).headers["ETag"] != etag
+
+def test_collection_etag_changes_on_update_and_delete(client: TestClient, db_session, fleet):
+    etag = client.get("/api/v1/aircraft/").headers["ETag"]
+    fleet[0].model = "PA-28-181"
+    db_session.commit()
+    response = client.get("/api/v1/aircraft/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # A delete does not move max(updated_at), but it is logged to deletions
+    db_session.delete(fleet[1])
+    db_session.commit()
+    assert client.get("/api/v1/aircraft/", headers={"If-None-Match": etag}).status_code == 200
+
+def test_filtered_flights_are_validated_against_the_table(client: TestClient, db_session, fleet):
+    student = User(email="etag@example.com", first_name="E", last_name="Tag", phone="1", is_active=True)
+    teacher = Instructor(email="etag-cfi@example.com", first_name="E", last_name="Cfi", phone="1", rating="CFI")
+    db_session.add_all([student, teacher])
+    db_session.flush()
+    start = datetime(2034, 4, 1, 9, 0)
+    db_session.add_all([
+        Flight(
+            student_id=student.id, instructor_id=teacher.id, aircraft_id=plane.id,
+            start_time=start + timedelta(days=i), end_time=start + timedelta(days=i, hours=1), duration=1.0
+        )
+        for i, plane in enumerate(fleet)
+    ])
+    db_session.commit()
+
+    params = {"aircraft_id": fleet[0].id}
+    etag = client.get("/api/v1/flights/", params=params).headers["ETag"]
+    assert client.get("/api/v1/flights/", params=params, headers={"If-None-Match": etag}).status_code == 304
+    # The state covers the whole table: a change to another aircraft's flights revalidates this listing too
+    other = db_session.query(Flight).filter(Flight.aircraft_id == fleet[1].id).one()
+    other.notes = "Rescheduled"
+    db_session.commit()
+    assert client.get("/api/v1/flights/", params=params, headers={"If-None-Match": etag}).status_code == 200
+
+def test_collection_state_is_read_with_the_page(client: TestClient, fleet, query_budget):
+    with query_budget(1):
+        etag = client.get("/api/v1/aircraft/", params={"limit": 2}).headers["ETag"]
+    with query_budget(1):
+        assert client.get("/api/v1/aircraft/", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+    # An empty page has no row to carry the state, so it is read on its own
+    with query_budget(2):
+        empty = client.get("/api/v1/aircraft/", params={"skip": 100})
+    assert empty.json() == []
+    assert client.get("/api/v1/aircraft/", params={"skip": 100}, headers={"If-None-Match": empty.headers["ETag"]}).status_code == 304
+
+def test_resource_revalidation(client: TestClient, db_session, fleet, query_budget):
+    plane = fleet[0]
+    url = f"/api/v1/aircraft/{plane.id}"
+    with query_budget(1):
+        response = client.get(url)
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+    assert last_modified == format_datetime(plane.updated_at.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+
+    with query_budget(1):
+        assert client.get(url, headers={"If-None-Match": f'"{etag[3:-1]}", W/"other"'}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    earlier = format_datetime(plane.updated_at - timedelta(seconds=5), usegmt=False)
+    assert client.get(url, headers={"If-Modified-Since": earlier}).status_code == 200
+
+    plane.year = 1999
+    db_session.commit()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["year"] == 1999
+
+def test_missing_resource_is_still_404(client: TestClient):
+    response = client.get("/api/v1/users/987654", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+def test_cache_control_per_route(client: TestClient, fleet, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_CONTROL_ROUTES", {"/api/v1/aircraft/{aircraft_id}": "public, max-age=60"})
+    assert client.get(f"/api/v1/aircraft/{fleet[0].id}").headers["Cache-Control"] == "public, max-age=60"
+    assert client.get("/api/v1/aircraft/").headers["Cache-Control"] == "private, no-cache"
+
+def test_fast_path_keeps_validators(client: TestClient, fleet, monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    response = client.get(f"/api/v1/aircraft/{fleet[0].id}")
+    etag = response.headers["ETag"]
+    assert client.get(f"/api/v1/aircraft/{fleet[0].id}", headers={"If-None-Match": etag}).status_code == 304
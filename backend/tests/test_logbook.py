@@ -0,0 +1,116 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+from app.models import Aircraft, Flight, Instructor, LogbookTotal, User
+
+JANUARY = datetime(2031, 1, 10, 9, 0)
+FEBRUARY = datetime(2031, 2, 10, 9, 0)
+
+@pytest.fixture
+def fleet(db_session):
+    student = User(email="logbook@example.com", first_name="L", last_name="B", phone="1")
+    instructor = Instructor(email="logbook-cfi@example.com", first_name="L", last_name="I", phone="1", rating="CFI")
+    aircraft = Aircraft(registration="N-LOG", type="single_engine", model="C172", year=2015)
+    db_session.add_all([student, instructor, aircraft])
+    db_session.commit()
+    return student, instructor, aircraft
+
+def _payload(fleet, start: datetime, hours: float, flight_type: str, status: str = "scheduled") -> dict:
+    student, instructor, aircraft = fleet
+    return {
+        "student_id": student.id,
+        "instructor_id": instructor.id,
+        "aircraft_id": aircraft.id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=hours)).isoformat(),
+        "duration": hours,
+        "flight_type": flight_type,
+        "status": status,
+    }
+
+def _book(client: TestClient, payload: dict) -> int:
+    response = client.post("/api/v1/flights/", json=payload)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+def _complete(client: TestClient, flight_id: int, payload: dict) -> None:
+    assert client.put(f"/api/v1/flights/{flight_id}", json=dict(payload, status="completed")).status_code == 200
+
+def test_completed_flights_roll_up_by_type_and_month(client: TestClient, fleet):
+    student = fleet[0]
+    flights = [
+        (JANUARY, 1.5, "training"),
+        (JANUARY + timedelta(days=1), 1.2, "solo"),
+        (FEBRUARY, 2.0, "cross_country"),
+    ]
+    for start, hours, flight_type in flights:
+        payload = _payload(fleet, start, hours, flight_type)
+        _complete(client, _book(client, payload), payload)
+    # Still scheduled, so not in the logbook
+    _book(client, _payload(fleet, FEBRUARY + timedelta(days=1), 1.0, "night"))
+
+    logbook = client.get(f"/api/v1/users/{student.id}/logbook").json()
+    assert logbook["student_id"] == student.id
+    assert logbook["total"] == {"hours": 4.7, "flights": 3}
+    assert logbook["by_type"] == {
+        "training": {"hours": 1.5, "flights": 1},
+        "solo": {"hours": 1.2, "flights": 1},
+        "cross_country": {"hours": 2.0, "flights": 1},
+    }
+    assert [period["period"] for period in logbook["periods"]] == ["2031-01", "2031-02"]
+    assert logbook["periods"][0]["total"] == {"hours": 2.7, "flights": 2}
+    assert logbook["periods"][1]["by_type"] == {"cross_country": {"hours": 2.0, "flights": 1}}
+
+    yearly = client.get(f"/api/v1/users/{student.id}/logbook", params={"period": "year"}).json()
+    assert yearly["periods"] == [{"period": "2031", "total": logbook["total"], "by_type": logbook["by_type"]}]
+
+def test_edits_and_deletes_of_completed_flights_move_their_hours(client: TestClient, db_session, fleet):
+    student = fleet[0]
+    payload = _payload(fleet, JANUARY, 1.0, "night", status="completed")
+    flight_id = _book(client, payload)
+    kept = _payload(fleet, JANUARY + timedelta(days=2), 1.3, "night", status="completed")
+    _book(client, kept)
+
+    # A longer flight in another month
+    moved = dict(payload, start_time=FEBRUARY.isoformat(), end_time=(FEBRUARY + timedelta(hours=2)).isoformat(), duration=2.0)
+    assert client.put(f"/api/v1/flights/{flight_id}", json=moved).status_code == 200
+    logbook = client.get(f"/api/v1/users/{student.id}/logbook").json()
+    assert [(p["period"], p["total"]) for p in logbook["periods"]] == [
+        ("2031-01", {"hours": 1.3, "flights": 1}),
+        ("2031-02", {"hours": 2.0, "flights": 1}),
+    ]
+
+    # Cancelled after all, then deleted: nothing is left behind for February
+    assert client.put(f"/api/v1/flights/{flight_id}", json=dict(moved, status="cancelled")).status_code == 200
+    assert client.delete(f"/api/v1/flights/{flight_id}").status_code == 200
+    logbook = client.get(f"/api/v1/users/{student.id}/logbook").json()
+    assert logbook["total"] == {"hours": 1.3, "flights": 1}
+    assert db_session.query(LogbookTotal).filter(LogbookTotal.student_id == student.id).count() == 1
+
+def test_bulk_completions_are_counted(client: TestClient, fleet):
+    student = fleet[0]
+    ids = [_book(client, _payload(fleet, JANUARY + timedelta(days=day), 1.0, "instrument")) for day in range(3)]
+    response = client.put("/api/v1/flights/bulk", json=[{"id": id, "status": "completed"} for id in ids])
+    assert response.json()["succeeded"] == 3
+    logbook = client.get(f"/api/v1/users/{student.id}/logbook").json()
+    assert logbook["by_type"] == {"instrument": {"hours": 3.0, "flights": 3}}
+
+def test_untyped_flights_count_towards_the_totals_only(client: TestClient, db_session, fleet):
+    student, instructor, aircraft = fleet
+    db_session.add(Flight(
+        student_id=student.id, instructor_id=instructor.id, aircraft_id=aircraft.id, status="completed",
+        start_time=JANUARY, end_time=JANUARY + timedelta(hours=1), duration=1.0,
+    ))
+    db_session.commit()
+    logbook = client.get(f"/api/v1/users/{student.id}/logbook").json()
+    assert logbook["total"] == {"hours": 1.0, "flights": 1}
+    assert logbook["by_type"] == {}
+
+def test_logbook_reads_the_rollups_only(client: TestClient, fleet, query_budget):
+    with query_budget(2) as requests:
+        assert client.get(f"/api/v1/users/{fleet[0].id}/logbook").json()["total"] == {"hours": 0.0, "flights": 0}
+    assert not any("FROM flights" in statement for statement in requests[0].statements)
+
+def test_logbook_of_unknown_user(client: TestClient):
+    assert client.get("/api/v1/users/999999/logbook").status_code == 404
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import maintenance
+from app.models import Instructor, User
+
+NOW = datetime(2031, 5, 1, 8, 0)
+
+def _aircraft(**values) -> SimpleNamespace:
+    state = {
+        "id": 1, "registration": "N-MX", "total_time": 1090.0, "last_maintenance": NOW - timedelta(days=30),
+        "last_maintenance_time": 1000.0, "next_maintenance": None,
+    }
+    return SimpleNamespace(**{**state, **values})
+
+def _bookings(*hours: float) -> list[SimpleNamespace]:
+    starts = [NOW + timedelta(days=day + 1) for day in range(len(hours))]
+    return [
+        SimpleNamespace(id=n + 1, start_time=start, end_time=start + timedelta(hours=h), duration=h)
+        for n, (start, h) in enumerate(zip(starts, hours))
+    ]
+
+def _forecast(aircraft: SimpleNamespace, bookings: list) -> dict:
+    return maintenance.forecast(aircraft, bookings, NOW, 100.0, 365)
+
+def test_bookings_past_the_100_hour_limit_are_flagged():
+    bookings = _bookings(4.0, 4.0, 3.0, 2.0)
+    forecast = _forecast(_aircraft(), bookings)
+    assert (forecast["hours_since_maintenance"], forecast["hours_remaining"], forecast["scheduled_hours"]) == (
+        90.0, 10.0, 13.0
+    )
+    # Two hours into the third booking
+    assert forecast["due_at"] == bookings[2].start_time + timedelta(hours=2)
+    assert forecast["due_reason"] == "hours"
+    assert [(f["flight_id"], f["limits"], f["hours_over"]) for f in forecast["flagged_flights"]] == [
+        (3, ["hours"], 1.0),
+        (4, ["hours"], 3.0),
+    ]
+
+def test_a_booking_ending_on_the_limit_is_not_flagged():
+    forecast = _forecast(_aircraft(total_time=1099.7, last_maintenance_time=1000.4), _bookings(0.3, 0.4))
+    assert forecast["hours_remaining"] == pytest.approx(0.7)
+    assert forecast["flagged_flights"] == []
+    assert forecast["due_reason"] == "calendar"
+
+def test_the_annual_inspection_can_come_first():
+    bookings = _bookings(1.0, 1.0, 1.0)
+    due = bookings[1].start_time
+    forecast = _forecast(_aircraft(next_maintenance=due), bookings)
+    assert (forecast["calendar_due"], forecast["due_at"], forecast["due_reason"]) == (due, due, "calendar")
+    assert [(f["flight_id"], f["limits"]) for f in forecast["flagged_flights"]] == [(2, ["calendar"]), (3, ["calendar"])]
+    # Without next_maintenance, a year after the last inspection
+    assert _forecast(_aircraft(), [])["calendar_due"] == NOW - timedelta(days=30) + timedelta(days=365)
+
+def test_overdue_and_unknown_aircraft():
+    overdue = _forecast(_aircraft(total_time=1100.5), _bookings(1.0))
+    assert (overdue["hours_remaining"], overdue["due_at"], overdue["due_reason"]) == (-0.5, NOW, "hours")
+    assert overdue["flagged_flights"][0]["hours_over"] == 1.5
+
+    unknown = _forecast(_aircraft(last_maintenance=None, last_maintenance_time=None), _bookings(1.0))
+    assert (unknown["hours_remaining"], unknown["due_at"], unknown["flagged_flights"]) == (None, None, [])
+
+@pytest.fixture
+def crew(db_session):
+    student = User(email="mx@example.com", first_name="M", last_name="S", phone="1")
+    instructor = Instructor(email="mx-cfi@example.com", first_name="M", last_name="I", phone="1", rating="CFI")
+    db_session.add_all([student, instructor])
+    db_session.commit()
+    return student, instructor
+
+def _create_aircraft(client: TestClient, registration: str, total_time: float) -> int:
+    response = client.post("/api/v1/aircraft/", json={
+        "registration": registration, "type": "single_engine", "model": "C172", "year": 2015,
+        "total_time": total_time, "last_maintenance_time": 1000.0,
+        "last_maintenance": (datetime.utcnow() - timedelta(days=30)).isoformat(),
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+def _book(client: TestClient, crew, aircraft_id: int, day: int, hours: float) -> dict:
+    student, instructor = crew
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=day)
+    response = client.post("/api/v1/flights/", json={
+        "student_id": student.id, "instructor_id": instructor.id, "aircraft_id": aircraft_id,
+        "start_time": start.isoformat(), "end_time": (start + timedelta(hours=hours)).isoformat(), "duration": hours,
+    })
+    assert response.status_code == 201
+    return response.json()
+
+def _forecasts(client: TestClient, **params) -> dict[int, dict]:
+    response = client.get("/api/v1/reports/maintenance", params=params)
+    assert response.status_code == 200, response.text
+    return {forecast["aircraft_id"]: forecast for forecast in response.json()["aircraft"]}
+
+def test_forecast_follows_bookings_and_completions(client: TestClient, crew):
+    near = _create_aircraft(client, "N-MX1", 1098.0)
+    far = _create_aircraft(client, "N-MX2", 1000.0)
+    assert _forecasts(client)[near]["hours_remaining"] == 2.0
+
+    flight = _book(client, crew, near, 1, 1.5)
+    overrun = _book(client, crew, near, 2, 1.0)
+    _book(client, crew, far, 3, 1.5)
+    forecasts = _forecasts(client, aircraft_id=[near, far])
+    assert [f["flight_id"] for f in forecasts[near]["flagged_flights"]] == [overrun["id"]]
+    assert forecasts[near]["flagged_flights"][0]["hours_over"] == 0.5
+    assert forecasts[far]["flagged_flights"] == []
+    assert list(_forecasts(client, flagged_only=True)) == [near]
+
+    # Completing the first flight moves its hours from scheduled to flown: still due on the same booking
+    assert client.put(f"/api/v1/flights/{flight['id']}", json=dict(flight, status="completed")).status_code == 200
+    forecast = _forecasts(client)[near]
+    assert (forecast["hours_since_maintenance"], forecast["scheduled_hours"]) == (99.5, 1.0)
+    assert [f["flight_id"] for f in forecast["flagged_flights"]] == [overrun["id"]]
+
+    # Recording an inspection clears it
+    inspected = dict(client.get(f"/api/v1/aircraft/{near}").json(), last_maintenance_time=1099.5)
+    assert client.put(f"/api/v1/aircraft/{near}", json=inspected).status_code == 200
+    assert _forecasts(client, flagged_only=True) == {}
+
+def test_a_booking_change_reforecasts_only_its_aircraft(client: TestClient, crew, query_budget):
+    near = _create_aircraft(client, "N-MX3", 1099.0)
+    _create_aircraft(client, "N-MX4", 1000.0)
+    _forecasts(client)
+    with query_budget(0):
+        _forecasts(client)
+
+    _book(client, crew, near, 1, 2.0)
+    with query_budget(2) as requests:
+        assert _forecasts(client)[near]["flagged_flights"][0]["hours_over"] == 1.0
+    statements = list(requests[0].statements)
+    assert any("flights.aircraft_id IN" in statement for statement in statements)
+    assert any("aircraft.id IN" in statement for statement in statements)
+
+def test_bulk_bookings_reforecast_the_fleet(client: TestClient, crew):
+    near = _create_aircraft(client, "N-MX5", 1099.0)
+    _forecasts(client)
+    student, instructor = crew
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=3)
+    response = client.post("/api/v1/flights/bulk", json=[{
+        "student_id": student.id, "instructor_id": instructor.id, "aircraft_id": near,
+        "start_time": start.isoformat(), "end_time": (start + timedelta(hours=2)).isoformat(), "duration": 2.0,
+    }])
+    assert response.json()["succeeded"] == 1
+    assert len(_forecasts(client)[near]["flagged_flights"]) == 1
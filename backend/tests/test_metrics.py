@@ -0,0 +1,35 @@
+import asyncio
+from fastapi.testclient import TestClient
+
+from app import main
+from app.metrics import HttpMetrics, render
+
+def test_metrics_use_route_templates(client: TestClient):
+    client.get("/api/v1/flights/123456")
+    client.get("/api/v1/flights/123457")
+    client.get("/no/such/path")
+    body = client.get("/metrics").text
+
+    assert 'http_requests_total{method="GET",route="/api/v1/flights/{flight_id}",status="404"} 2' in body
+    assert 'route="/api/v1/flights/123456"' not in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/flights/{flight_id}",le="+Inf"} 2' in body
+    assert 'http_response_size_bytes_count{method="GET",route="/api/v1/flights/{flight_id}"} 2' in body
+    assert "http_requests_in_flight 1" in body
+    assert 'db_pool_checked_out{engine="sync"}' in body
+    assert "process_resident_memory_bytes" in body
+    assert 'python_gc_collections_total{generation="0"}' in body
+
+def test_metrics_render_on_the_event_loop():
+    # In the threadpool, render() would race the middleware adding routes to the dicts it iterates
+    assert asyncio.iscoroutinefunction(main.read_metrics)
+
+def test_histogram_buckets_are_cumulative():
+    metrics = HttpMetrics()
+    for seconds in (0.001, 0.02, 0.02, 20):
+        metrics.observe("GET", "/x", 200, seconds, 10)
+    body = render(metrics)
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="0.005"} 1' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="0.025"} 3' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="10.0"} 3' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="+Inf"} 4' in body
@@ -0,0 +1,111 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from app import pagination
+from app.models import User, Aircraft, Instructor, Flight
+
+def _collect_pages(client: TestClient, url: str, limit: int) -> tuple[list[dict], int]:
+    items, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["after"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        items.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return items, pages
+
+def test_cursor_round_trip():
+    start = datetime(2030, 5, 1, 8, 30)
+    assert pagination.decode_id_cursor(pagination.encode_cursor(42)) == 42
+    assert pagination.decode_flight_cursor(pagination.encode_cursor(start, 7)) == (start, 7)
+    assert pagination.decode_flight_cursor(pagination.encode_cursor(None, 7)) == (None, 7)
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", pagination.encode_cursor("x"), pagination.encode_cursor(1, 2)])
+def test_invalid_id_cursor(cursor):
+    with pytest.raises(ValueError):
+        pagination.decode_id_cursor(cursor)
+
+def test_users_cursor_pagination(client: TestClient, db_session):
+    db_session.add_all([
+        User(email=f"page{i}@example.com", first_name="Page", last_name=str(i), phone="1", is_active=True)
+        for i in range(5)
+    ])
+    db_session.commit()
+
+    items, pages = _collect_pages(client, "/api/v1/users/", limit=2)
+    ids = [item["id"] for item in items]
+    assert pages == 3
+    assert len(ids) == 5
+    assert ids == sorted(ids)
+
+def test_flights_cursor_pagination_breaks_ties_on_id(client: TestClient, db_session):
+    student = User(email="student@example.com", first_name="S", last_name="S", phone="1")
+    instructors = [Instructor(email=f"cfi{i}@example.com", first_name="I", last_name=str(i), phone="1", rating="CFI") for i in range(5)]
+    aircraft = [Aircraft(registration=f"N20{i}", type="Cessna", model="172", year=2020) for i in range(5)]
+    db_session.add_all([student, *instructors, *aircraft])
+    db_session.flush()
+    start = datetime(2030, 1, 1, 9, 0)
+    # Three flights share a start time so the cursor must fall back to id
+    starts = [start, start, start, start + timedelta(hours=3), start - timedelta(hours=3)]
+    db_session.add_all([
+        Flight(
+            student_id=student.id,
+            instructor_id=instructors[i].id,
+            aircraft_id=aircraft[i].id,
+            start_time=flight_start,
+            end_time=flight_start + timedelta(hours=1),
+            duration=1.0,
+        )
+        for i, flight_start in enumerate(starts)
+    ])
+    db_session.commit()
+
+    items, _ = _collect_pages(client, "/api/v1/flights/", limit=2)
+    keys = [(item["start_time"], item["id"]) for item in items]
+    assert len(keys) == 5
+    assert keys == sorted(keys)
+
+def test_flights_cursor_pagination_crosses_null_start_times(client: TestClient, db_session):
+    student = User(email="undated@example.com", first_name="U", last_name="S", phone="1")
+    instructor = Instructor(email="undated-cfi@example.com", first_name="U", last_name="I", phone="1", rating="CFI")
+    aircraft = Aircraft(registration="N-UNDT", type="single_engine", model="C172", year=2015)
+    db_session.add_all([student, instructor, aircraft])
+    db_session.flush()
+    start = datetime(2030, 2, 1, 9, 0)
+    # Undated flights sort after the dated ones, among themselves by id
+    starts = [None, start + timedelta(hours=2), None, start, None]
+    db_session.add_all([
+        Flight(
+            student_id=student.id,
+            instructor_id=instructor.id,
+            aircraft_id=aircraft.id,
+            start_time=flight_start,
+            end_time=flight_start and flight_start + timedelta(hours=1),
+            duration=1.0,
+            # An undated period is unbounded, so only a cancelled flight stays clear of the overlap constraints
+            status="scheduled" if flight_start else "cancelled",
+        )
+        for flight_start in starts
+    ])
+    db_session.commit()
+    undated = sorted(flight.id for flight in student.flights if flight.start_time is None)
+    expected = [flight.id for flight in sorted(
+        (flight for flight in student.flights if flight.start_time is not None), key=lambda flight: flight.start_time
+    )] + undated
+
+    for url in ["/api/v1/flights/", f"/api/v1/flights/?student_id={student.id}"]:
+        for limit in (1, 2, 3):
+            items, _ = _collect_pages(client, url, limit=limit)
+            ids = [item["id"] for item in items if item["student_id"] == student.id]
+            assert ids == expected
+
+def test_list_endpoints_reject_invalid_cursor(client: TestClient):
+    for url in ["/api/v1/users/", "/api/v1/aircraft/", "/api/v1/instructors/", "/api/v1/flights/"]:
+        response = client.get(url, params={"after": "garbage"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,73 @@
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from app import security
+from app.config import settings
+from app.models import User
+
+@pytest.fixture(autouse=True)
+def cheap_hashes(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 4)
+    yield
+    security.shutdown()
+
+def _signup(client: TestClient, email="pilot@example.com", password="s3cret"):
+    return client.post("/api/v1/users/", json={
+        "email": email,
+        "first_name": "Pat",
+        "last_name": "Pilot",
+        "phone": "555-0100",
+        "password": password,
+    })
+
+def test_signup_stores_bcrypt_hash(client: TestClient, db_session):
+    user_id = _signup(client).json()["id"]
+    hashed = db_session.get(User, user_id).hashed_password
+    assert hashed.startswith("$2b$04$")
+
+    assert client.post("/api/v1/users/login", json={"email": "pilot@example.com", "password": "s3cret"}).status_code == 200
+    assert client.post("/api/v1/users/login", json={"email": "pilot@example.com", "password": "nope"}).status_code == 401
+    assert client.post("/api/v1/users/login", json={"email": "ghost@example.com", "password": "s3cret"}).status_code == 401
+
+def test_unknown_email_still_verifies_a_hash(client: TestClient, monkeypatch):
+    verified = []
+    verify = CryptContext.verify
+    monkeypatch.setattr(CryptContext, "verify", lambda self, secret, hash, **kwds: (
+        verified.append(hash) or verify(self, secret, hash, **kwds)
+    ))
+    assert client.post("/api/v1/users/login", json={"email": "ghost@example.com", "password": "s3cret"}).status_code == 401
+    assert len(verified) == 1 and verified[0].startswith("$2b$04$")
+
+def test_update_hashes_new_password(client: TestClient):
+    user = _signup(client).json()
+    response = client.put(f"/api/v1/users/{user['id']}", json={
+        "email": user["email"],
+        "first_name": "Pat",
+        "last_name": "Pilot",
+        "phone": "555-0100",
+        "password": "changed",
+    })
+    assert response.status_code == 200
+    assert client.post("/api/v1/users/login", json={"email": user["email"], "password": "s3cret"}).status_code == 401
+    assert client.post("/api/v1/users/login", json={"email": user["email"], "password": "changed"}).status_code == 200
+
+def test_login_rehashes_when_cost_changes(client: TestClient, db_session, monkeypatch):
+    user_id = _signup(client).json()["id"]
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 5)
+
+    assert client.post("/api/v1/users/login", json={"email": "pilot@example.com", "password": "s3cret"}).status_code == 200
+    db_session.expire_all()
+    assert db_session.get(User, user_id).hashed_password.startswith("$2b$05$")
+
+def test_signup_rejected_when_pool_is_saturated(client: TestClient, monkeypatch):
+    security.shutdown()
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    response = _signup(client)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_hash_passwords_in_parallel():
+    hashes = security.hash_passwords(["a", "b", "c"])
+    assert len(set(hashes)) == 3
+    assert all(security.password_context(4).verify(p, h) for p, h in zip("abc", hashes))
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+
+from app.pool import InstrumentedQueuePool, warm_pool
+from .conftest import TEST_DATABASE_URL
+
+@pytest.fixture
+def small_engine():
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+def test_pool_records_overflow_and_timeouts(small_engine):
+    first = small_engine.connect()
+    second = small_engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        small_engine.connect()
+    stats = small_engine.pool.stats()
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["overflow_events"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checkout_wait_seconds_max"] >= 0.05
+    first.close()
+    second.close()
+
+def test_metrics_survive_dispose(small_engine):
+    small_engine.connect().close()
+    small_engine.dispose()
+    assert small_engine.pool.stats()["checkouts"] == 1
+
+def test_warm_pool_opens_connections_up_front(small_engine):
+    assert warm_pool(small_engine, 5) == 1
+    assert small_engine.pool.checkedin() == 1
+
+def test_pool_health(client: TestClient):
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    assert {"size", "checked_out", "overflow", "checkout_wait_seconds_total", "timeouts"} <= response.json()["sync"].keys()
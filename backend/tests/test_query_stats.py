@@ -0,0 +1,73 @@
+import logging
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.database import get_db
+from app.models import User, Aircraft, Instructor, Flight
+from app.query_stats import QueryStatsMiddleware
+
+@pytest.fixture
+def flights(db_session):
+    student = User(email="budget@example.com", first_name="B", last_name="S", phone="1")
+    instructor = Instructor(email="budget-cfi@example.com", first_name="B", last_name="I", phone="1", rating="CFI")
+    aircraft = Aircraft(registration="N900", type="Cessna", model="172", year=2020)
+    db_session.add_all([student, instructor, aircraft])
+    db_session.flush()
+    start = datetime(2033, 1, 1, 8, 0)
+    rows = [
+        Flight(
+            student_id=student.id,
+            instructor_id=instructor.id,
+            aircraft_id=aircraft.id,
+            start_time=start + timedelta(hours=2 * i),
+            end_time=start + timedelta(hours=2 * i + 1),
+            duration=1.0,
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+@pytest.mark.parametrize("path,budget", [
+    ("/api/v1/flights/", 1),
+    ("/api/v1/users/", 1),
+    ("/api/v1/aircraft/", 1),
+    ("/api/v1/instructors/", 1),
+])
+def test_list_endpoints_stay_within_query_budget(client: TestClient, flights, query_budget, path, budget):
+    with query_budget(budget) as requests:
+        assert client.get(path).status_code == 200
+    assert len(requests) == 1
+
+def test_detail_endpoint_query_budget(client: TestClient, flights, query_budget):
+    with query_budget(1):
+        assert client.get(f"/api/v1/flights/{flights[0].id}").status_code == 200
+
+def test_debug_headers(client: TestClient, flights, monkeypatch):
+    assert "X-DB-Queries" not in client.get("/api/v1/flights/").headers
+    monkeypatch.setattr(settings, "DEBUG", True)
+    response = client.get("/api/v1/flights/")
+    assert response.headers["X-DB-Queries"] == "1"
+    assert response.headers["X-DB-Time"].endswith("ms")
+
+def test_repeated_statement_is_logged(db_session, caplog, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_REPEAT_WARN_THRESHOLD", 3)
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/loop")
+    def loop(db: Session = Depends(get_db)):
+        for i in range(4):
+            db.execute(text("SELECT :i"), {"i": i})
+        return {}
+
+    app.dependency_overrides[get_db] = lambda: db_session
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        TestClient(app).get("/loop")
+    assert "Possible N+1: GET /loop ran the same statement 4 times" in caplog.text
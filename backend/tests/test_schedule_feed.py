@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import crud, schedule_feed, schemas
+from app.config import settings
+from app.models import Aircraft, Flight, Instructor, User
+from .conftest import delete_committed
+
+START = datetime(2036, 5, 1, 9, 0)
+
+def _fleet(db: Session) -> dict:
+    student = User(email="feed@example.com", first_name="F", last_name="Eed", phone="1")
+    instructor = Instructor(email="feed-cfi@example.com", first_name="F", last_name="Cfi", phone="1", rating="CFI")
+    planes = [Aircraft(registration=f"N-FEED{i}", type="single_engine", model="C172", year=2010) for i in range(2)]
+    db.add_all([student, instructor, *planes])
+    db.commit()
+    return {"student": student, "instructor": instructor, "planes": planes}
+
+def _flight(fleet: dict, plane: Aircraft, hours: int = 0) -> dict:
+    start = START + timedelta(hours=hours)
+    return {
+        "student_id": fleet["student"].id,
+        "instructor_id": fleet["instructor"].id,
+        "aircraft_id": plane.id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "duration": 1.0,
+    }
+
+def test_websocket_receives_filtered_flight_events(client: TestClient, db_session):
+    fleet = _fleet(db_session)
+    watched, other = fleet["planes"]
+    with client.websocket_connect(f"/api/v1/stream/schedule?aircraft_id={watched.id}") as socket:
+        assert client.post("/api/v1/flights/", json=_flight(fleet, other)).status_code == 201
+        created = client.post("/api/v1/flights/", json=_flight(fleet, watched, hours=2)).json()
+
+        # The flight on the other aircraft was filtered out
+        event = socket.receive_json()
+        assert event["type"] == "created"
+        assert event["flight"]["id"] == created["id"]
+
+        client.put(f"/api/v1/flights/{created['id']}", json=dict(_flight(fleet, watched, hours=2), status="cancelled"))
+        event = socket.receive_json()
+        assert event["type"] == "cancelled"
+        assert event["flight"]["status"] == "cancelled"
+
+        # Moving the flight off the watched aircraft is still reported
+        client.put(f"/api/v1/flights/{created['id']}", json=_flight(fleet, other, hours=4))
+        event = socket.receive_json()
+        assert event["type"] == "updated"
+        assert event["flight"]["aircraft_id"] == other.id
+        assert event["previous"]["aircraft_id"] == watched.id
+
+def test_rolled_back_writes_are_not_published(db_session):
+    async def scenario():
+        subscription = schedule_feed.broker.subscribe()
+        try:
+            fleet = _fleet(db_session)
+            flight = Flight(student_id=fleet["student"].id, aircraft_id=fleet["planes"][0].id, start_time=START)
+            db_session.add(flight)
+            db_session.flush()
+            schedule_feed.emit(db_session, "created", flight)
+            db_session.rollback()
+            assert await subscription.next(0.05) is None
+        finally:
+            schedule_feed.broker.unsubscribe(subscription)
+    asyncio.run(scenario())
+
+def test_slow_subscriber_overflows_and_sse_closes(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULE_STREAM_QUEUE_SIZE", 2)
+
+    async def scenario():
+        subscription = schedule_feed.broker.subscribe()
+        chunks = schedule_feed.sse(subscription, heartbeat=60)
+        assert await chunks.__anext__() == b": subscribed\n\n"
+        for _ in range(3):
+            schedule_feed.broker.publish(schedule_feed.RESYNC)
+        await asyncio.sleep(0)
+        assert subscription.overflowed
+        # The backlog was dropped in favour of the overflow notice, then the stream ends
+        assert await chunks.__anext__() == b'event: overflow\ndata: {"type":"overflow"}\n\n'
+        with pytest.raises(StopAsyncIteration):
+            await chunks.__anext__()
+        assert subscription not in schedule_feed.broker._subscriptions
+    asyncio.run(scenario())
+
+def test_sse_sends_keep_alives_when_idle():
+    async def scenario():
+        chunks = schedule_feed.sse(schedule_feed.broker.subscribe(), heartbeat=0.01)
+        await chunks.__anext__()
+        assert await chunks.__anext__() == b": keep-alive\n\n"
+        await chunks.aclose()
+    asyncio.run(scenario())
+
+def test_notify_bridge_delivers_committed_writes(engine, monkeypatch):
+    """With the bridge on, a commit from any worker reaches subscribers through LISTEN/NOTIFY."""
+    monkeypatch.setattr(settings, "SCHEDULE_STREAM_BRIDGE", True)
+    with Session(engine, expire_on_commit=False) as db:
+        fleet = _fleet(db)
+
+    def write() -> int:
+        with Session(engine) as db:
+            payload = schemas.FlightCreate(**_flight(fleet, fleet["planes"][0]), notes="x" * 10_000)
+            return crud.create_flight(db, payload).id
+
+    async def scenario():
+        subscription = schedule_feed.broker.subscribe(instructor_ids=[fleet["instructor"].id])
+        bridge = schedule_feed.start_bridge(engine)
+        try:
+            assert await asyncio.to_thread(bridge.listening.wait, 5)
+            while (await subscription.next(0.05)) is not None:
+                pass  # the resync sent on connect
+            flight_id = await asyncio.to_thread(write)
+            event = await subscription.next(5)
+            assert event["type"] == "created"
+            # Too long for a notification, so only the key fields were sent
+            assert event["partial"] is True
+            assert event["flight"]["id"] == flight_id
+            assert "notes" not in event["flight"]
+        finally:
+            schedule_feed.stop_bridge()
+            schedule_feed.broker.unsubscribe(subscription)
+    try:
+        asyncio.run(scenario())
+    finally:
+        with engine.begin() as connection:
+            delete_committed(connection, {
+                Flight: connection.scalars(select(Flight.id).where(Flight.student_id == fleet["student"].id)).all(),
+                User: [fleet["student"].id],
+                Instructor: [fleet["instructor"].id],
+                Aircraft: [plane.id for plane in fleet["planes"]],
+            })
+
+def test_feed_metrics(client: TestClient):
+    assert "schedule_stream_subscribers" in client.get("/metrics").text
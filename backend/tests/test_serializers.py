@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+
+from app import schemas, serializers
+from app.config import settings
+from app.models import Aircraft, Flight, FlightStatus, FlightType, Instructor, User
+
+ROWS = 1000
+
+def _rows(resource: str, count: int) -> list:
+    start = datetime(2031, 3, 1, 8, 0)
+    factories = {
+        "users": lambda i: User(
+            id=i, email=f"u{i}@example.com", first_name="Ser", last_name=str(i), phone="555-0100", is_active=True
+        ),
+        "aircraft": lambda i: Aircraft(
+            id=i, registration=f"N{i}SR", type="single_engine", model="C172", year=2000 + i % 20, is_active=True
+        ),
+        "instructors": lambda i: Instructor(
+            id=i, email=f"i{i}@example.com", first_name="Ins", last_name=str(i), phone="555-0101",
+            rating="CFI", is_active=True
+        ),
+        "flights": lambda i: Flight(
+            id=i, student_id=1, instructor_id=1, aircraft_id=1,
+            start_time=start + timedelta(hours=i, microseconds=i), end_time=start + timedelta(hours=i + 1),
+            duration=1.5, flight_type=FlightType.training, status=FlightStatus.scheduled, notes=None
+        ),
+    }
+    return [factories[resource](i) for i in range(1, count + 1)]
+
+RESOURCES = {
+    "users": (schemas.User, serializers.user),
+    "aircraft": (schemas.Aircraft, serializers.aircraft),
+    "instructors": (schemas.Instructor, serializers.instructor),
+    "flights": (schemas.Flight, serializers.flight),
+}
+
+@pytest.fixture
+def seeded(db_session):
+    student = User(email="ser-student@example.com", first_name="Ser", last_name="Student", phone="1", is_active=True)
+    plane = Aircraft(registration="N-SER1", type="single_engine", model="C172", year=2015, is_active=True)
+    teacher = Instructor(
+        email="ser-cfi@example.com", first_name="Ser", last_name="Cfi", phone="2", rating="CFI", is_active=True
+    )
+    db_session.add_all([student, plane, teacher])
+    db_session.flush()
+    start = datetime(2031, 3, 1, 8, 0, 0, 250000)
+    db_session.add_all([
+        Flight(
+            student_id=student.id, instructor_id=teacher.id, aircraft_id=plane.id,
+            start_time=start + timedelta(days=day), end_time=start + timedelta(days=day, hours=2),
+            duration=2.0, flight_type=FlightType.night if day else None, notes='Night "XC" \\ tab\t' if day else None
+        )
+        for day in range(3)
+    ])
+    db_session.commit()
+    return {"users": student.id, "aircraft": plane.id, "instructors": teacher.id, "flights": None}
+
+@pytest.mark.parametrize("resource", RESOURCES)
+def test_fast_path_matches_response_model_output(client: TestClient, seeded, monkeypatch, resource):
+    urls = [f"/api/v1/{resource}/?limit=2"]
+    if seeded[resource]:
+        urls.append(f"/api/v1/{resource}/{seeded[resource]}")
+
+    for url in urls:
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+        expected = client.get(url)
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+        fast = client.get(url)
+        assert fast.status_code == expected.status_code == 200
+        assert fast.content == expected.content
+        assert fast.headers.get("X-Next-Cursor") == expected.headers.get("X-Next-Cursor")
+
+def test_fast_path_keeps_not_found(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    response = client.get("/api/v1/flights/987654")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Flight not found"}
+
+@pytest.mark.parametrize("resource", RESOURCES)
+def test_fast_serialization_matches_default_path(resource):
+    # Throughput is compared in benchmarks/test_component_benchmarks.py
+    schema, serializer = RESOURCES[resource]
+    rows = _rows(resource, ROWS)
+    field = create_response_field(name=f"Response_{resource}", type_=List[schema])
+    # What FastAPI does for response_model=List[schema]: validate, dump, stdlib json
+    content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=False))
+    assert serializers.render(serializer.many(rows)).body == JSONResponse(content).body
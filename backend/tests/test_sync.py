@@ -0,0 +1,91 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.models import Aircraft, Deletion, User
+
+OLD = datetime(2020, 1, 1, 12, 0)
+SINCE = datetime(2021, 1, 1, 12, 0)
+NEW = datetime(2022, 1, 1, 12, 0)
+
+def _plane(registration: str, updated_at: datetime) -> Aircraft:
+    return Aircraft(registration=registration, type="single_engine", model="C172", year=2005, updated_at=updated_at)
+
+def _ids(rows: list) -> set:
+    return {row["id"] for row in rows}
+
+def test_full_sync_returns_every_table(client: TestClient, db_session):
+    plane = _plane("N-SYNC1", OLD)
+    student = User(email="sync@example.com", first_name="S", last_name="Ync", phone="1", updated_at=OLD)
+    db_session.add_all([plane, student])
+    db_session.commit()
+
+    response = client.get("/api/v1/sync")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["changes"]) == set(data["deletions"]) == {"users", "aircraft", "instructors", "flights"}
+    assert plane.id in _ids(data["changes"]["aircraft"])
+    assert student.id in _ids(data["changes"]["users"])
+    assert data["has_more"] is False
+    # The watermark trails the clock so rows from still-open transactions are sent again
+    watermark = datetime.fromisoformat(data["watermark"])
+    assert watermark <= datetime.utcnow() - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+
+def test_sync_returns_only_changes_after_the_watermark(client: TestClient, db_session):
+    unchanged, changed = _plane("N-SYNC2", OLD), _plane("N-SYNC3", NEW)
+    db_session.add_all([unchanged, changed])
+    db_session.commit()
+
+    data = client.get("/api/v1/sync", params={"since": SINCE.isoformat()}).json()
+    ids = _ids(data["changes"]["aircraft"])
+    assert changed.id in ids
+    assert unchanged.id not in ids
+    row = next(row for row in data["changes"]["aircraft"] if row["id"] == changed.id)
+    assert row["registration"] == "N-SYNC3"
+
+    # An aware watermark is compared as UTC
+    aware = SINCE.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=-5)))
+    assert changed.id in _ids(client.get("/api/v1/sync", params={"since": aware.isoformat()}).json()["changes"]["aircraft"])
+
+def test_deletes_leave_tombstones(client: TestClient, db_session):
+    plane = _plane("N-SYNC4", OLD)
+    db_session.add(plane)
+    db_session.commit()
+    since = datetime.utcnow() - timedelta(seconds=1)
+
+    assert client.delete(f"/api/v1/aircraft/{plane.id}").status_code == 200
+    # Other tables' tombstones may share the row id
+    tombstone = db_session.query(Deletion).filter(Deletion.table_name == "aircraft", Deletion.row_id == plane.id).one()
+    assert tombstone.deleted_at >= since
+
+    data = client.get("/api/v1/sync", params={"since": since.isoformat()}).json()
+    assert plane.id in data["deletions"]["aircraft"]
+    assert plane.id not in _ids(data["changes"]["aircraft"])
+
+def test_large_backlogs_are_paged_without_splitting_a_timestamp(client: TestClient, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_MAX_ROWS", 2)
+    first = _plane("N-SYNC5", NEW)
+    tied = [_plane(f"N-SYNC6{i}", NEW + timedelta(seconds=1)) for i in range(2)]
+    last = _plane("N-SYNC7", NEW + timedelta(seconds=2))
+    db_session.add_all([first, *tied, last])
+    db_session.commit()
+
+    # The limit falls inside the tied pair, so the page stops before it
+    data = client.get("/api/v1/sync", params={"since": SINCE.isoformat()}).json()
+    assert data["has_more"] is True
+    assert _ids(data["changes"]["aircraft"]) == {first.id}
+    assert datetime.fromisoformat(data["watermark"]) == NEW
+
+    data = client.get("/api/v1/sync", params={"since": data["watermark"]}).json()
+    assert data["has_more"] is True
+    assert _ids(data["changes"]["aircraft"]) == {plane.id for plane in tied}
+
+    # A group larger than the limit is sent whole
+    monkeypatch.setattr(settings, "SYNC_MAX_ROWS", 1)
+    data = client.get("/api/v1/sync", params={"since": NEW.isoformat()}).json()
+    assert _ids(data["changes"]["aircraft"]) == {plane.id for plane in tied}
+    assert datetime.fromisoformat(data["watermark"]) == NEW + timedelta(seconds=1)
+
+def test_invalid_watermark_is_rejected(client: TestClient):
+    assert client.get("/api/v1/sync", params={"since": "yesterday"}).status_code == 422
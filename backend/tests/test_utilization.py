@@ -0,0 +1,174 @@
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app import crud, schemas, utilization
+from app.models import Aircraft, Flight, Instructor, User
+from .conftest import delete_committed
+
+MONDAY = datetime(2031, 3, 3, 9, 0)
+
+@pytest.fixture
+def fleet(db_session):
+    student = User(email="usage@example.com", first_name="U", last_name="S", phone="1")
+    instructor = Instructor(email="usage-cfi@example.com", first_name="U", last_name="I", phone="1", rating="CFI")
+    aircraft = Aircraft(registration="N-USE", type="single_engine", model="C172", year=2015, total_time=1000.0)
+    db_session.add_all([student, instructor, aircraft])
+    db_session.commit()
+    return student, instructor, aircraft
+
+def _payload(fleet, start: datetime, hours: float, status: str = "scheduled") -> dict:
+    student, instructor, aircraft = fleet
+    return {
+        "student_id": student.id,
+        "instructor_id": instructor.id,
+        "aircraft_id": aircraft.id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=hours)).isoformat(),
+        "duration": hours,
+        "status": status,
+    }
+
+def _book(client: TestClient, payload: dict) -> int:
+    response = client.post("/api/v1/flights/", json=payload)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+def _total_time(client: TestClient, aircraft_id: int) -> float:
+    return client.get(f"/api/v1/aircraft/{aircraft_id}").json()["total_time"]
+
+def _report(client: TestClient, **params) -> dict:
+    response = client.get("/api/v1/reports/utilization", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_completed_flights_roll_forward_into_total_time(client: TestClient, fleet):
+    aircraft = fleet[2]
+    payload = _payload(fleet, MONDAY, 1.5)
+    flight_id = _book(client, payload)
+    # Cached by this read, so the completion below must evict it
+    assert _total_time(client, aircraft.id) == 1000.0
+
+    assert client.put(f"/api/v1/flights/{flight_id}", json=dict(payload, status="completed")).status_code == 200
+    assert _total_time(client, aircraft.id) == 1001.5
+    # A corrected duration moves the difference only
+    shorter = dict(_payload(fleet, MONDAY, 1.2), status="completed")
+    assert client.put(f"/api/v1/flights/{flight_id}", json=shorter).status_code == 200
+    assert _total_time(client, aircraft.id) == 1001.2
+
+    _book(client, _payload(fleet, MONDAY + timedelta(days=1), 0.8, status="completed"))
+    assert _total_time(client, aircraft.id) == 1002.0
+    assert client.delete(f"/api/v1/flights/{flight_id}").status_code == 200
+    assert _total_time(client, aircraft.id) == 1000.8
+
+def test_bulk_completions_roll_forward(client: TestClient, fleet):
+    aircraft = fleet[2]
+    ids = [_book(client, _payload(fleet, MONDAY + timedelta(days=day), 1.0)) for day in range(3)]
+    assert _total_time(client, aircraft.id) == 1000.0
+    response = client.put("/api/v1/flights/bulk", json=[{"id": id, "status": "completed"} for id in ids])
+    assert response.json()["succeeded"] == 3
+    assert _total_time(client, aircraft.id) == 1003.0
+
+def test_concurrent_completions_are_not_lost(engine):
+    # Committed for real, so that each thread's session sees the rows and contends for the aircraft
+    with engine.begin() as connection:
+        student_id = connection.execute(insert(User).values(
+            email="usage-race@example.com", first_name="R", last_name="S", phone="1"
+        ).returning(User.id)).scalar_one()
+        aircraft_id = connection.execute(insert(Aircraft).values(
+            registration="N-RACE", type="single_engine", model="C172", year=2015, total_time=500.0
+        ).returning(Aircraft.id)).scalar_one()
+        flight_ids = list(connection.scalars(insert(Flight).returning(Flight.id, sort_by_parameter_order=True), [
+            {
+                "student_id": student_id, "aircraft_id": aircraft_id, "status": "scheduled", "duration": 0.1,
+                "start_time": MONDAY + timedelta(hours=n), "end_time": MONDAY + timedelta(hours=n, minutes=30),
+            }
+            for n in range(8)
+        ]))
+    barrier = threading.Barrier(len(flight_ids))
+    errors = []
+
+    def complete(flight_id: int) -> None:
+        try:
+            with Session(engine) as db:
+                barrier.wait()
+                crud.update_flight(db, flight_id, schemas.FlightUpdate(status="completed"))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=complete, args=(flight_id,)) for flight_id in flight_ids]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        with engine.connect() as connection:
+            total_time = connection.scalar(text("SELECT total_time FROM aircraft WHERE id = :id"), {"id": aircraft_id})
+            usage = connection.execute(text(
+                "SELECT hours, flights FROM aircraft_daily_usage WHERE aircraft_id = :id"
+            ), {"id": aircraft_id}).one()
+        assert total_time == pytest.approx(500.8)
+        assert (float(usage.hours), usage.flights) == (0.8, 8)
+    finally:
+        with engine.begin() as connection:
+            delete_committed(connection, {Flight: flight_ids, Aircraft: [aircraft_id], User: [student_id]})
+
+def test_report_buckets_idle_gaps_and_utilization(client: TestClient, db_session, fleet):
+    aircraft = fleet[2]
+    idle = Aircraft(registration="N-IDLE", type="single_engine", model="C152", year=1980)
+    db_session.add(idle)
+    db_session.commit()
+    for start, hours in ((MONDAY, 2.0), (MONDAY + timedelta(hours=3), 1.0), (MONDAY + timedelta(days=3), 1.5),
+                         (MONDAY + timedelta(days=7), 0.5)):
+        _book(client, _payload(fleet, start, hours, status="completed"))
+    # Neither counts: not completed, or outside the range
+    _book(client, _payload(fleet, MONDAY + timedelta(days=2), 1.0))
+    _book(client, _payload(fleet, MONDAY + timedelta(days=14), 1.0, status="completed"))
+
+    ids = {"aircraft_id": [aircraft.id, idle.id]}
+    start, end = MONDAY.date().isoformat(), (MONDAY.date() + timedelta(days=10)).isoformat()
+    daily = _report(client, start=start, end=end, **ids)
+    used, unused = daily["aircraft"]
+    assert used["registration"] == "N-USE"
+    assert (used["hours"], used["flights"]) == (5.0, 4)
+    assert used["buckets"] == [
+        {"start": "2031-03-03", "hours": 3.0, "flights": 2},
+        {"start": "2031-03-06", "hours": 1.5, "flights": 1},
+        {"start": "2031-03-10", "hours": 0.5, "flights": 1},
+    ]
+    assert used["idle_gaps"] == [
+        {"start": "2031-03-04", "end": "2031-03-06", "days": 2},
+        {"start": "2031-03-07", "end": "2031-03-10", "days": 3},
+        {"start": "2031-03-11", "end": "2031-03-13", "days": 2},
+    ]
+    assert used["utilization"] == 0.05
+    assert unused["buckets"] == [] and unused["idle_gaps"] == [{"start": start, "end": end, "days": 10}]
+    assert daily["fleet"] == {"aircraft": 2, "hours": 5.0, "flights": 4, "utilization": 0.025}
+
+    weekly = _report(client, start=start, end=end, bucket="week", min_idle_days=3, **ids)
+    assert [bucket["start"] for bucket in weekly["aircraft"][0]["buckets"]] == ["2031-03-03", "2031-03-10"]
+    assert [gap["days"] for gap in weekly["aircraft"][0]["idle_gaps"]] == [3]
+
+def test_report_reads_the_rollups_only(client: TestClient, fleet, query_budget):
+    with query_budget(2) as requests:
+        report = _report(client, start="2031-03-01", end="2031-04-01", aircraft_id=fleet[2].id)
+    assert report["fleet"]["hours"] == 0.0
+    assert not any("FROM flights" in statement for statement in requests[0].statements)
+
+def test_report_range_is_bounded(client: TestClient):
+    assert client.get("/api/v1/reports/utilization", params={"start": "2031-03-02", "end": "2031-03-01"}).status_code == 400
+    assert client.get("/api/v1/reports/utilization", params={"start": "2030-01-01", "end": "2031-03-01"}).status_code == 400
+
+def test_idle_gaps():
+    start, end = date(2031, 1, 1), date(2031, 1, 8)
+    flown = [date(2031, 1, 1), date(2031, 1, 2), date(2031, 1, 5)]
+    assert utilization.idle_gaps(flown, start, end) == [
+        {"start": date(2031, 1, 3), "end": date(2031, 1, 5), "days": 2},
+        {"start": date(2031, 1, 6), "end": date(2031, 1, 8), "days": 2},
+    ]
+    assert utilization.idle_gaps([], start, end, min_days=8) == []